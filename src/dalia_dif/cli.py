@@ -1,10 +1,20 @@
 """Command line interface for :mod:`dalia_dif`."""
 
+from __future__ import annotations
+
 import sys
+from collections.abc import Iterable, Iterator
+from contextlib import ExitStack
+from functools import partial
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 import click
 
+if TYPE_CHECKING:
+    from dalia_dif.dif13.cache import ValidationCache
+    from dalia_dif.dif13.model import EducationalResourceDIF13
+
 __all__ = [
     "main",
 ]
@@ -19,12 +29,32 @@ def main() -> None:
 @click.option("--dif-version", type=click.Choice(["1.3"]), default="1.3")
 @click.option("--ignore-missing-description", is_flag=True)
 @click.option("--communities-path", type=Path)
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of worker processes used to validate a directory of CSVs",
+)
+@click.option(
+    "--no-cache",
+    is_flag=True,
+    help="Re-validate all files in a directory instead of replaying cached results "
+    "for unchanged files",
+)
 @click.argument("location")
 def validate(
-    location: str, dif_version: str, ignore_missing_description: bool, communities_path: Path | None
+    location: str,
+    dif_version: str,
+    ignore_missing_description: bool,
+    communities_path: Path | None,
+    jobs: int,
+    no_cache: bool,
 ) -> None:
     """Validate a local/remote file or local folder of DIF-encoded CSVs."""
     from dalia_dif.dif13 import read_dif13
+    from dalia_dif.dif13.cache import ValidationCache
     from dalia_dif.dif13.community import get_communities_dict
 
     if communities_path is not None:
@@ -38,19 +68,26 @@ def validate(
         p = p.expanduser().resolve()
 
         click.echo(f"validating directory: {p}")
-        for path in p.glob("*.csv"):
-            click.secho(f"\n> {path.relative_to(p)}", fg="green")
-            errors: list[str] = []
-            read_dif13(
-                path,
-                error_accumulator=errors,
+        paths = sorted(p.glob("*.csv"))
+        cache = None if no_cache else ValidationCache()
+        for path, errors in zip(
+            paths,
+            _map_validate(
+                paths,
+                jobs=jobs,
                 ignore_missing_description=ignore_missing_description,
                 custom_community_dict=community_dict,
-            )
+                cache=cache,
+            ),
+            strict=True,
+        ):
+            click.secho(f"\n> {path.relative_to(p)}", fg="green")
             if errors:
                 fail = True
                 for error in errors:
                     click.secho(error, fg="red")
+        if cache is not None:
+            cache.evict()
         if fail:
             click.secho("validation failed", fg="red")
             sys.exit(1)
@@ -66,6 +103,82 @@ def validate(
             sys.exit(1)
 
 
+def _map_validate(
+    paths: list[Path],
+    *,
+    jobs: int,
+    ignore_missing_description: bool,
+    custom_community_dict: dict[str, str],
+    cache: ValidationCache | None = None,
+) -> Iterable[list[str]]:
+    """Validate each path, yielding error lists in the same order as the paths.
+
+    If a cache is given, files whose content hasn't changed since a previous
+    run are not re-parsed and their cached errors are yielded instead.
+    """
+    if cache is None:
+        keys: list[str | None] = [None] * len(paths)
+    else:
+        keys = [
+            cache.get_key(
+                path,
+                ignore_missing_description=ignore_missing_description,
+                custom_community_dict=custom_community_dict,
+            )
+            for path in paths
+        ]
+    cached = [None if cache is None or key is None else cache.get(key) for key in keys]
+    misses = [path for path, errors in zip(paths, cached, strict=True) if errors is None]
+
+    func = partial(
+        _validate_path,
+        ignore_missing_description=ignore_missing_description,
+        custom_community_dict=custom_community_dict,
+    )
+    with ExitStack() as stack:
+        if jobs == 1 or len(misses) <= 1:
+            results: Iterator[list[str]] = map(func, misses)
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+
+            executor = stack.enter_context(ProcessPoolExecutor(max_workers=min(jobs, len(misses))))
+            # executor.map returns results in submission order, so output
+            # stays grouped by file no matter which worker finishes first
+            results = executor.map(func, misses)
+
+        for key, errors in zip(keys, cached, strict=True):
+            if errors is None:
+                errors = next(results)
+                if cache is not None and key is not None:
+                    cache.set(key, errors)
+            yield errors
+
+
+def _validate_path(
+    path: Path, *, ignore_missing_description: bool, custom_community_dict: dict[str, str]
+) -> list[str]:
+    """Validate a single DIF file and return its errors (module-level so it can be pickled)."""
+    from dalia_dif.dif13 import read_dif13
+
+    errors: list[str] = []
+    read_dif13(
+        path,
+        error_accumulator=errors,
+        ignore_missing_description=ignore_missing_description,
+        custom_community_dict=custom_community_dict,
+    )
+    return errors
+
+
+@main.command()
+@click.option("--force", is_flag=True, help="Rebuild lookup tables even if they're cached")
+def vocabularies(force: bool) -> None:
+    """Compile lookup tables for the controlled vocabularies used in validation."""
+    from dalia_dif.dif13.rdf import build_vocabulary_indexes
+
+    build_vocabulary_indexes(force=force)
+
+
 @main.command()
 @click.argument("location", type=Path)
 def lint(location: Path) -> None:
@@ -93,24 +206,217 @@ def lint(location: Path) -> None:
 @click.option("--dif-version", type=click.Choice(["1.3"]), default="1.3")
 @click.option("--format")
 @click.option("-o", "--output", type=Path)
+@click.option(
+    "--deterministic",
+    is_flag=True,
+    help="Use stable blank node labels for authors in RDF, so output can be diffed",
+)
+@click.option(
+    "--sort",
+    is_flag=True,
+    help="Write canonical, sorted, and de-duplicated N-Triples. Implies --deterministic",
+)
 @click.argument("location")
-def convert(location: str, dif_version: str, format: str | None, output: Path | None) -> None:
-    """Validate a DIF file."""
-    from dalia_dif.dif13 import read_dif13, write_dif13_jsonl, write_dif13_rdf
+def convert(
+    location: str,
+    dif_version: str,
+    format: str | None,
+    output: Path | None,
+    deterministic: bool,
+    sort: bool,
+) -> None:
+    """Convert a DIF CSV or JSON lines file to RDF, JSON lines, or Parquet."""
+    from dalia_dif.dif13 import write_dif13_jsonl, write_dif13_rdf
+
+    if sort and (output is None or output.suffix != ".nt"):
+        raise click.UsageError("--sort can only be used when writing N-Triples with -o *.nt")
+    is_rdf = format != "jsonl" if output is None else output.suffix in {".ttl", ".nt", ".nq"}
+    if deterministic and not is_rdf:
+        raise click.UsageError("--deterministic can only be used when writing RDF")
 
-    oers = read_dif13(location)
+    oers = _iter_location(location)
 
     if output is None:
         if format == "jsonl":
             write_dif13_jsonl(oers)
         else:
-            write_dif13_rdf(oers)
+            write_dif13_rdf(oers, deterministic=deterministic)
     elif output.suffix == ".ttl":
-        write_dif13_rdf(oers, path=output, format=format)
+        write_dif13_rdf(oers, path=output, format=format, deterministic=deterministic)
+    elif output.suffix == ".nt" and sort:
+        from dalia_dif.dif13.ntriples import write_dif13_ntriples_sorted
+
+        with output.open("w", encoding="utf-8") as file:
+            write_dif13_ntriples_sorted(oers, file)
+    elif output.suffix == ".nt":
+        write_dif13_rdf(oers, path=output, format="nt", deterministic=deterministic)
+    elif output.suffix == ".nq":
+        write_dif13_rdf(oers, path=output, format="nquads", deterministic=deterministic)
     elif output.suffix == ".jsonl":
         write_dif13_jsonl(oers, path=output)
+    elif output.suffix == ".parquet":
+        from dalia_dif.dif13.export.parquet import write_dif13_parquet
+
+        write_dif13_parquet(oers, output)
     else:
-        click.secho(f"unhandled extension: {output.suffix}. Use .ttl or .jsonl", fg="red")
+        click.secho(
+            f"unhandled extension: {output.suffix}. Use .ttl, .nt, .nq, .jsonl, or .parquet",
+            fg="red",
+        )
+
+
+@main.command()
+@click.option(
+    "-o",
+    "--output",
+    type=Path,
+    multiple=True,
+    required=True,
+    help="A path to save the chart to. Can be given multiple times, e.g., for PNG and SVG",
+)
+@click.option("--title", is_flag=True, help="Add a title to the chart")
+@click.argument("locations", nargs=-1, required=True)
+def chart(locations: tuple[str, ...], output: tuple[Path, ...], title: bool) -> None:
+    """Chart a summary of OERs from DIF files or directories."""
+    from dalia_dif.dif13.export.charts import export_chart
+
+    export_chart(_iter_locations(locations), list(output), include_title=title)
+
+
+@main.group()
+def fti() -> None:
+    """Manage a SQLite full text index of OERs."""
+
+
+@fti.command(name="build")
+@click.option("--trigram", is_flag=True, help="Also build an index for substring and fuzzy search")
+@click.argument("database", type=Path)
+@click.argument("locations", nargs=-1, required=True)
+def fti_build(database: Path, locations: tuple[str, ...], trigram: bool) -> None:
+    """Build an index from DIF files or directories, replacing any existing index."""
+    from dalia_dif.dif13.export.fti import write_sqlite_fti_from_resources
+
+    write_sqlite_fti_from_resources(_iter_locations(locations), database, trigram=trigram)
+
+
+@fti.command(name="similar")
+@click.option("-k", "--top-k", type=click.IntRange(min=1), default=10, show_default=True)
+@click.argument("database", type=Path)
+@click.argument("locations", nargs=-1, required=True)
+def fti_similar(database: Path, locations: tuple[str, ...], top_k: int) -> None:
+    """Precompute similar OERs from DIF files or directories and store them in an index."""
+    from dalia_dif.dif13.export.similarity import write_similar_resources
+
+    n = write_similar_resources(_iter_locations(locations), database, k=top_k)
+    click.echo(f"wrote {n:,} similar OER pairs")
+
+
+@fti.command(name="upsert")
+@click.argument("database", type=Path)
+@click.argument("locations", nargs=-1, required=True)
+def fti_upsert(database: Path, locations: tuple[str, ...]) -> None:
+    """Insert or update OERs from DIF files or directories in an index."""
+    from dalia_dif.dif13.export.fti import upsert_sqlite_fti
+
+    summary = upsert_sqlite_fti(_iter_locations(locations), database)
+    click.echo(
+        f"inserted {summary.inserted:,}, updated {summary.updated:,}, "
+        f"and skipped {summary.unchanged:,} unchanged OERs"
+    )
+
+
+@fti.command(name="delete")
+@click.argument("database", type=Path)
+@click.argument("uuids", nargs=-1, required=True)
+def fti_delete(database: Path, uuids: tuple[str, ...]) -> None:
+    """Delete OERs from an index by UUID."""
+    from dalia_dif.dif13.export.fti import delete_sqlite_fti
+
+    deleted = delete_sqlite_fti(uuids, database)
+    click.echo(f"deleted {deleted:,} OERs")
+
+
+def _iter_locations(locations: Iterable[str]) -> Iterable[EducationalResourceDIF13]:
+    """Iterate over OERs in DIF CSV or JSON lines files, directories of them, or URLs."""
+    for location in _expand_locations(locations):
+        yield from _iter_location(location)
+
+
+def _iter_location(location: str | Path) -> Iterable[EducationalResourceDIF13]:
+    """Iterate over OERs in a DIF CSV or JSON lines file, or a URL for a DIF CSV file."""
+    from dalia_dif.dif13 import iter_dif13, iter_dif13_jsonl
+
+    if str(location).endswith(".jsonl"):
+        return iter_dif13_jsonl(location)
+    return iter_dif13(location)
+
+
+def _expand_locations(locations: Iterable[str]) -> Iterable[str | Path]:
+    """Expand directories into the DIF CSV and JSON lines files they contain."""
+    for location in locations:
+        path = Path(location)
+        if path.is_dir():
+            yield from sorted([*path.glob("*.csv"), *path.glob("*.jsonl")])
+        else:
+            yield location
+
+
+@main.command()
+@click.option(
+    "--threshold",
+    type=click.FloatRange(0, 1),
+    default=0.7,
+    show_default=True,
+    help="The minimum Jaccard similarity between two OERs to report them as duplicates",
+)
+@click.option("--num-perm", type=click.IntRange(min=1), default=128, show_default=True)
+@click.option("--shingle-size", type=click.IntRange(min=1), default=5, show_default=True)
+@click.argument("locations", nargs=-1, required=True)
+def dedupe(locations: tuple[str, ...], threshold: float, num_perm: int, shingle_size: int) -> None:
+    """Find near-duplicate OERs across DIF files or directories."""
+    from dalia_dif.dif13.dedupe import find_duplicates
+
+    sources, oers = [], []
+    for location in _expand_locations(locations):
+        for oer in _iter_location(location):
+            sources.append(Path(location).name)
+            oers.append(oer)
+
+    clusters = find_duplicates(
+        oers, threshold=threshold, num_perm=num_perm, shingle_size=shingle_size
+    )
+    for number, cluster in enumerate(clusters, start=1):
+        click.secho(f"> cluster {number}", fg="yellow")
+        for i in cluster:
+            click.echo(f"{sources[i]}\t{oers[i].uuid}\t{oers[i].title}")
+    if clusters:
+        click.secho(f"found {len(clusters):,} clusters of possible duplicates", fg="red")
+        sys.exit(1)
+
+
+@main.command()
+@click.argument("old")
+@click.argument("new")
+def diff(old: str, new: str) -> None:
+    """Report OERs that were added, removed, or modified between two snapshots.
+
+    OLD and NEW can each be a DIF CSV or JSON lines file, or a directory of them.
+    """
+    from dalia_dif.dif13.diff import diff_dif13
+
+    result = diff_dif13(_iter_locations([old]), _iter_locations([new]))
+    for uuid in result.added:
+        click.secho(f"added\t{uuid}", fg="green")
+    for uuid in result.removed:
+        click.secho(f"removed\t{uuid}", fg="red")
+    for uuid in result.modified:
+        click.secho(f"modified\t{uuid}", fg="yellow")
+    if result:
+        click.echo(
+            f"{len(result.added):,} added, {len(result.removed):,} removed, "
+            f"{len(result.modified):,} modified"
+        )
+        sys.exit(1)
 
 
 if __name__ == "__main__":
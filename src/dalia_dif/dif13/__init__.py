@@ -1,21 +1,66 @@
-"""An implementation of DIF v1.3."""
+"""An implementation of DIF v1.3.
 
-from .model import AuthorDIF13, EducationalResourceDIF13, OrganizationDIF13
-from .reader import (
-    parse_dif13_row,
-    read_dif13,
-    read_dif13_into_rdflib,
-    write_dif13_jsonl,
-    write_dif13_rdf,
-)
+The models and readers are imported lazily on first access, so importing a
+submodule (e.g., :mod:`dalia_dif.dif13.export.fti`) or running the command line
+interface doesn't pull in :mod:`rdflib` and :mod:`pydantic` unless they're used.
+"""
+
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .model import AuthorDIF13, EducationalResourceDIF13, OrganizationDIF13
+    from .reader import (
+        iter_dif13,
+        iter_dif13_jsonl,
+        parse_dif13_row,
+        read_dif13,
+        read_dif13_into_rdflib,
+        read_dif13_jsonl,
+        write_dif13_jsonl,
+        write_dif13_rdf,
+    )
 
 __all__ = [
     "AuthorDIF13",
     "EducationalResourceDIF13",
     "OrganizationDIF13",
+    "iter_dif13",
+    "iter_dif13_jsonl",
     "parse_dif13_row",
     "read_dif13",
     "read_dif13_into_rdflib",
+    "read_dif13_jsonl",
     "write_dif13_jsonl",
     "write_dif13_rdf",
 ]
+
+#: A mapping from the names of lazily imported attributes to their submodules
+_LAZY_IMPORTS: dict[str, str] = {
+    "AuthorDIF13": ".model",
+    "EducationalResourceDIF13": ".model",
+    "OrganizationDIF13": ".model",
+    "iter_dif13": ".reader",
+    "iter_dif13_jsonl": ".reader",
+    "parse_dif13_row": ".reader",
+    "read_dif13": ".reader",
+    "read_dif13_into_rdflib": ".reader",
+    "read_dif13_jsonl": ".reader",
+    "write_dif13_jsonl": ".reader",
+    "write_dif13_rdf": ".reader",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if (module_name := _LAZY_IMPORTS.get(name)) is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    # cache on the module, so the next lookup doesn't go through this function
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *__all__})
@@ -0,0 +1,154 @@
+"""A persistent, content-addressed cache for validation results.
+
+Validating a curation directory re-parses every CSV each time. Since most files don't
+change between runs, the errors produced for each file are stored on disk, keyed by a
+hash of the file's content, the :mod:`dalia_dif` version and source code, the
+community lookup dictionary, and the validation options. Since the version doesn't
+change during development, hashing the source code makes sure changes to the parser
+or validator invalidate cached errors. Files whose key is already in the cache are
+skipped and their errors are replayed.
+
+.. code-block:: python
+
+    from dalia_dif.dif13.cache import ValidationCache
+
+    cache = ValidationCache()
+    key = cache.get_key(path)
+    errors = cache.get(key)
+    if errors is None:
+        errors = ...  # validate the file
+        cache.set(key, errors)
+    cache.evict()
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+
+import pystow
+
+from .community import CommunityDict, get_lookup_dict_communities
+from ..version import get_version
+
+__all__ = [
+    "DEFAULT_MAX_SIZE",
+    "ValidationCache",
+]
+
+#: The default maximum size of the cache directory, in bytes
+DEFAULT_MAX_SIZE = 32 * 1024 * 1024
+
+_CHUNK_SIZE = 1 << 16
+
+#: The root of the :mod:`dalia_dif` package, whose source code is part of cache keys
+_PACKAGE_DIRECTORY = Path(__file__).resolve().parent.parent
+
+
+class ValidationCache:
+    """A size-bounded, on-disk cache of per-file validation errors."""
+
+    def __init__(self, directory: Path | None = None, *, max_size: int = DEFAULT_MAX_SIZE):
+        """Initialize the cache.
+
+        :param directory: The directory in which cache entries are stored. Defaults
+            to ``~/.data/dalia/validation-cache``, which can be configured with
+            :mod:`pystow`.
+        :param max_size: The maximum total size (in bytes) of the cache entries. When
+            :meth:`evict` is called, least recently used entries are removed until the
+            cache fits in this budget.
+        """
+        if directory is None:
+            directory = pystow.join("dalia", "validation-cache")
+        else:
+            directory.mkdir(parents=True, exist_ok=True)
+        self.directory = directory
+        self.max_size = max_size
+
+    def get_key(
+        self,
+        path: Path,
+        *,
+        ignore_missing_description: bool = False,
+        custom_community_dict: CommunityDict | None = None,
+    ) -> str:
+        """Get the cache key for a file, given the options used for validation."""
+        h = hashlib.sha256()
+        with path.open("rb") as file:
+            while chunk := file.read(_CHUNK_SIZE):
+                h.update(chunk)
+        # the file name appears in error messages, so it's part of the key
+        h.update(path.name.encode("utf-8"))
+        h.update(get_version().encode("utf-8"))
+        h.update(_hash_source().encode("utf-8"))
+        h.update(_hash_communities(custom_community_dict).encode("utf-8"))
+        h.update(b"1" if ignore_missing_description else b"0")
+        return h.hexdigest()
+
+    def _get_path(self, key: str) -> Path:
+        return self.directory.joinpath(f"{key}.json")
+
+    def get(self, key: str) -> list[str] | None:
+        """Get the cached errors for a key, or None if it's not cached."""
+        path = self._get_path(key)
+        try:
+            errors: list[str] = json.loads(path.read_text())
+        except (FileNotFoundError, ValueError):
+            return None
+        # bump the modification time so eviction is least recently used
+        path.touch()
+        return errors
+
+    def set(self, key: str, errors: list[str]) -> None:
+        """Store the errors for a key."""
+        path = self._get_path(key)
+        # write then rename so concurrent writers never leave a partial file
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(errors))
+        os.replace(tmp_path, path)
+
+    def evict(self) -> int:
+        """Remove least recently used entries until the cache fits in its size budget.
+
+        :returns: The number of entries that were removed
+        """
+        entries = []
+        for path in self.directory.glob("*.json"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in sorted(entries, key=lambda entry: entry[0]):
+            if total <= self.max_size:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self) -> None:
+        """Remove all entries from the cache."""
+        for path in self.directory.glob("*.json"):
+            path.unlink(missing_ok=True)
+
+
+@lru_cache(1)
+def _hash_source() -> str:
+    """Hash the source code of :mod:`dalia_dif`, which the validation depends on."""
+    h = hashlib.sha256()
+    for path in sorted(_PACKAGE_DIRECTORY.rglob("*.py")):
+        h.update(path.relative_to(_PACKAGE_DIRECTORY).as_posix().encode("utf-8"))
+        h.update(path.read_bytes())
+    return h.hexdigest()
+
+
+def _hash_communities(custom_community_dict: CommunityDict | None) -> str:
+    data = {"default": get_lookup_dict_communities(), "custom": custom_community_dict or {}}
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()
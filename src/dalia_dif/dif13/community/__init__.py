@@ -1,7 +1,10 @@
 """Code for curated DALIA communities."""
 
 import csv
-from collections import Counter
+import unicodedata
+from collections import Counter, defaultdict
+from collections.abc import Mapping
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, TypeAlias
 
@@ -65,7 +68,105 @@ def _read_mapping() -> dict[str, str]:
     return rv
 
 
-LOOKUP_DICT_COMMUNITIES: CommunityDict = get_communities_dict(COMMUNITIES_PATH)
+@lru_cache(1)
+def get_lookup_dict_communities() -> CommunityDict:
+    """Get a mapping from names/synonyms of the curated communities to UUID strings.
+
+    The communities are read on first use rather than at import time, then cached.
+    """
+    return get_communities_dict(COMMUNITIES_PATH)
+
+
+def normalize_community_name(name: str) -> str:
+    """Normalize a community name for lookup.
+
+    >>> normalize_community_name("  NFDI4Chem   Konsortium ")
+    'nfdi4chem konsortium'
+    """
+    return " ".join(unicodedata.normalize("NFKC", name).casefold().split())
+
+
+def _get_ngrams(name: str, n: int = 3) -> set[str]:
+    padded = f" {name} "
+    return {padded[i : i + n] for i in range(max(1, len(padded) - n + 1))}
+
+
+class CommunityIndex:
+    """An index of community names/synonyms that's insensitive to case and whitespace.
+
+    Names are normalized with :func:`normalize_community_name`, so lookups don't
+    depend on case, Unicode compatibility forms, or extra whitespace. Names that
+    can't be found can be matched to the most similar known names using an index
+    of their character trigrams.
+    """
+
+    def __init__(
+        self, communities: Mapping[str, str], custom: Mapping[str, str] | None = None
+    ) -> None:
+        """Build the index.
+
+        :param communities: A mapping from names/synonyms to UUID strings
+        :param custom: Additional names/synonyms to UUID strings, which take
+            precedence over ``communities``
+        """
+        self._lookup: dict[str, str] = {}
+        #: the first name that each normalized name was made from, used for suggestions
+        self._names: dict[str, str] = {}
+        for mapping in [custom or {}, communities]:
+            for name, uuid in mapping.items():
+                key = normalize_community_name(name)
+                self._lookup.setdefault(key, uuid)
+                self._names.setdefault(key, name)
+
+        self._ngrams: defaultdict[str, list[str]] = defaultdict(list)
+        for key in self._lookup:
+            for ngram in _get_ngrams(key):
+                self._ngrams[ngram].append(key)
+
+    def __len__(self) -> int:
+        return len(self._lookup)
+
+    def __contains__(self, name: object) -> bool:
+        return isinstance(name, str) and normalize_community_name(name) in self._lookup
+
+    def get(self, name: str) -> str | None:
+        """Get the UUID string for a community name or synonym, if it's known."""
+        return self._lookup.get(normalize_community_name(name))
+
+    def suggest(self, name: str, *, n: int = 3, cutoff: float = 0.5) -> list[str]:
+        """Suggest known community names similar to a given one.
+
+        :param name: A community name, e.g., one that couldn't be found
+        :param n: The maximum number of suggestions
+        :param cutoff: The minimum similarity (the Sørensen-Dice coefficient of the
+            character trigrams of the normalized names) of suggestions, between 0 and 1
+
+        :returns: Names, most similar first
+        """
+        ngrams = _get_ngrams(normalize_community_name(name))
+        shared: Counter[str] = Counter()
+        for ngram in ngrams:
+            shared.update(self._ngrams.get(ngram, []))
+        scored = []
+        for key, count in shared.items():
+            score = 2 * count / (len(ngrams) + len(_get_ngrams(key)))
+            if score >= cutoff:
+                scored.append((-score, key))
+        return [self._names[key] for _, key in sorted(scored)[:n]]
+
+
+@lru_cache(1)
+def get_community_index() -> CommunityIndex:
+    """Get an index of the curated communities."""
+    return CommunityIndex(get_lookup_dict_communities())
+
+
+def __getattr__(name: str) -> Any:
+    # the lookup dictionary used to be built at import time, so keep it available
+    if name == "LOOKUP_DICT_COMMUNITIES":
+        return get_lookup_dict_communities()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 MISSING_COMMUNITIES: Counter[str] = Counter()
 
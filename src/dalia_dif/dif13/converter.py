@@ -0,0 +1,169 @@
+"""Converters for expanding CURIEs that appear in keywords.
+
+Keywords written as CURIEs (e.g., ``occo:0000000``) are expanded to URIs with a
+:class:`curies.Converter`. By default, this is the converter from :mod:`bioregistry`,
+which is slow to import and construct. It's therefore built once per process, and
+serialized to disk with :mod:`pystow` (keyed by the :mod:`bioregistry` version) so
+later processes can load it without importing :mod:`bioregistry` at all.
+
+A converter can also be trimmed to only the prefixes that appear in a set of curation
+files, then written to disk and passed to :func:`dalia_dif.dif13.read_dif13` by path:
+
+.. code-block:: python
+
+    from dalia_dif.dif13 import read_dif13
+    from dalia_dif.dif13.converter import get_default_converter, get_keyword_prefixes
+    from dalia_dif.dif13.converter import write_converter
+
+    prefixes = get_keyword_prefixes("curation.csv")
+    write_converter(get_default_converter(), "converter.json", prefixes=prefixes)
+    oers = read_dif13("curation.csv", converter="converter.json")
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import weakref
+from collections.abc import Iterable
+from functools import lru_cache
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import TextIO
+
+import curies
+import pystow
+from pystow.utils import safe_open_dict_reader
+
+from .constants import DIF_HEADER_KEYWORDS, DIF_SEPARATOR
+
+__all__ = [
+    "expand_curie",
+    "get_default_converter",
+    "get_keyword_prefixes",
+    "read_converter",
+    "write_converter",
+]
+
+logger = logging.getLogger(__name__)
+
+#: Expansions of CURIEs, memoized for each converter. Keywords like ``occo:...`` are
+#: repeated across many rows, so each is only expanded once.
+_EXPANSIONS: weakref.WeakKeyDictionary[curies.Converter, dict[str, str | None]] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def expand_curie(converter: curies.Converter, curie: str) -> str | None:
+    """Expand a CURIE with a converter, memoizing the result.
+
+    :param converter: A converter
+    :param curie: A compact URI, like ``occo:0000000``
+
+    :returns: The URI, or none if the converter can't expand the CURIE
+    """
+    try:
+        expansions = _EXPANSIONS[converter]
+    except KeyError:
+        expansions = _EXPANSIONS[converter] = {}
+    try:
+        return expansions[curie]
+    except KeyError:
+        rv = expansions[curie] = converter.expand(curie)
+        return rv
+
+
+def get_default_converter(prefixes: Iterable[str] | None = None) -> curies.Converter | None:
+    """Get the converter from :mod:`bioregistry`, building it at most once per process.
+
+    :param prefixes: If given, the converter is trimmed to only these prefixes
+
+    :returns: A converter, or none if :mod:`bioregistry` isn't installed
+    """
+    if prefixes is None:
+        return _get_bioregistry_converter()
+    return _get_trimmed_converter(frozenset(prefixes))
+
+
+@lru_cache(1)
+def _get_bioregistry_converter() -> curies.Converter | None:
+    try:
+        bioregistry_version = version("bioregistry")
+    except PackageNotFoundError:
+        logger.info("no converter given and bioregistry isn't installed")
+        return None
+
+    path = pystow.join("dalia", "converters", name=f"bioregistry-{bioregistry_version}.json")
+    if path.is_file():
+        try:
+            return read_converter(path)
+        except (ValueError, KeyError, TypeError):
+            # e.g., left truncated by an interrupted process, so rebuild it
+            logger.warning("could not read cached converter at %s, rebuilding it", path)
+
+    import bioregistry
+
+    converter: curies.Converter = bioregistry.get_default_converter()
+    write_converter(converter, path)
+    return converter
+
+
+@lru_cache
+def _get_trimmed_converter(prefixes: frozenset[str]) -> curies.Converter | None:
+    converter = _get_bioregistry_converter()
+    if converter is None:
+        return None
+    return converter.get_subconverter(prefixes)
+
+
+def read_converter(path: str | Path) -> curies.Converter:
+    """Read a converter from an extended prefix map, e.g., from :func:`write_converter`.
+
+    Converters are cached, so reading the same file again is free unless it's changed.
+    """
+    path = Path(path).expanduser().resolve()
+    return _read_converter(path, path.stat().st_mtime_ns)
+
+
+@lru_cache
+def _read_converter(path: Path, _mtime: int) -> curies.Converter:
+    return curies.load_extended_prefix_map(path)
+
+
+def write_converter(
+    converter: curies.Converter, path: str | Path, *, prefixes: Iterable[str] | None = None
+) -> None:
+    """Write a converter as an extended prefix map.
+
+    :param converter: A converter
+    :param path: The path to a JSON file
+    :param prefixes: If given, the converter is trimmed to only these prefixes, e.g.,
+        from :func:`get_keyword_prefixes`
+    """
+    if prefixes is not None:
+        converter = converter.get_subconverter(prefixes)
+    path = Path(path)
+    # write then rename so concurrent readers, e.g., parallel validation
+    # workers, never see a partial file
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    curies.write_extended_prefix_map(converter, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def get_keyword_prefixes(path: str | Path | TextIO) -> set[str]:
+    """Get the prefixes of keywords that look like CURIEs in a DIF v1.3 CSV.
+
+    :param path: A local path or file-like object for a DIF v1.3 CSV
+
+    :returns: The parts of keywords before their first colon. Some of these might
+        not be prefixes, since keywords can contain colons, but they're ignored when
+        trimming a converter.
+    """
+    rv: set[str] = set()
+    with safe_open_dict_reader(path, delimiter=",") as reader:
+        for row in reader:
+            for keyword in (row.get(DIF_HEADER_KEYWORDS) or "").split(DIF_SEPARATOR):
+                prefix, sep, _ = keyword.strip().partition(":")
+                if sep and prefix:
+                    rv.add(prefix)
+    return rv
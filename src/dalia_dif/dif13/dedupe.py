@@ -0,0 +1,239 @@
+"""Detect near-duplicate OERs with MinHash and locality-sensitive hashing.
+
+The same resource is sometimes curated more than once, e.g., in different CSV files,
+with slightly different titles or descriptions. Comparing all pairs of OERs is
+quadratic, so instead each OER is reduced to a MinHash signature of the shingles
+(overlapping character sequences) of its title and description, plus its links.
+Signatures are split into bands and hashed into buckets, so only OERs that share a
+bucket are compared. Candidates whose Jaccard similarity is above the threshold are
+grouped into clusters.
+
+.. code-block:: python
+
+    from dalia_dif.dif13 import read_dif13
+    from dalia_dif.dif13.dedupe import find_duplicates
+
+    oers = read_dif13("curation.csv")
+    for cluster in find_duplicates(oers, threshold=0.7):
+        print([oers[i].title for i in cluster])
+"""
+
+from __future__ import annotations
+
+import hashlib
+import random
+import re
+from collections import defaultdict
+from collections.abc import Callable, Iterable, Sequence
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .model import EducationalResourceDIF13
+
+__all__ = [
+    "MinHashLSH",
+    "find_duplicates",
+    "get_optimal_bands",
+    "get_shingles",
+    "jaccard",
+]
+
+#: A Mersenne prime used for universal hashing of shingles
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+_NON_WORD_RE = re.compile(r"[\W_]+")
+
+
+def _normalize_text(text: str) -> str:
+    return " ".join(_NON_WORD_RE.sub(" ", text.casefold()).split())
+
+
+def _normalize_link(link: str) -> str:
+    link = link.casefold().removeprefix("https://").removeprefix("http://")
+    return link.removeprefix("www.").rstrip("/")
+
+
+def get_shingles(oer: EducationalResourceDIF13, *, size: int = 5) -> set[str]:
+    """Get the shingles for an OER.
+
+    :param oer: An OER
+    :param size: The number of characters in each shingle from the title and description
+
+    :returns: Overlapping character sequences from the normalized title and
+        description, plus the normalized links. Links are kept whole, since
+        resources with the same link are very likely the same.
+    """
+    rv: set[str] = set()
+    for text in [oer.title, oer.description or ""]:
+        text = _normalize_text(text)
+        if 0 < len(text) <= size:
+            rv.add(text)
+        rv.update(text[i : i + size] for i in range(len(text) - size + 1))
+    rv.update(f"link:{_normalize_link(str(link))}" for link in oer.links)
+    return rv
+
+
+def jaccard(a: set[str], b: set[str]) -> float:
+    """Calculate the Jaccard similarity between two sets."""
+    if not a and not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def get_optimal_bands(
+    threshold: float, num_perm: int, *, false_negative_weight: float = 0.9
+) -> tuple[int, int]:
+    """Get the number of bands and rows per band for a similarity threshold.
+
+    Two OERs with Jaccard similarity :math:`s` share a bucket in at least one band
+    with probability :math:`1 - (1 - s^r)^b`. The bands are chosen to minimize the
+    weighted areas under this curve below the threshold (false positives) and above
+    it under its complement (false negatives). Since candidates are verified exactly,
+    false positives only cost time, so false negatives are weighted more by default.
+
+    :param threshold: The minimum Jaccard similarity for duplicates
+    :param num_perm: The number of permutations in each signature
+    :param false_negative_weight: The weight of false negatives, between 0 and 1.
+        False positives get the remaining weight.
+
+    :returns: The number of bands and the number of rows in each band
+
+    >>> get_optimal_bands(0.7, 128)
+    (20, 6)
+    """
+
+    def _error(pair: tuple[int, int]) -> float:
+        bands, rows = pair
+        false_positives = _integrate(lambda s: 1 - (1 - s**rows) ** bands, 0.0, threshold)
+        false_negatives = _integrate(lambda s: (1 - s**rows) ** bands, threshold, 1.0)
+        false_positive_weight = 1 - false_negative_weight
+        return false_positive_weight * false_positives + false_negative_weight * false_negatives
+
+    return min(((bands, num_perm // bands) for bands in range(1, num_perm + 1)), key=_error)
+
+
+def _integrate(func: Callable[[float], float], start: float, end: float, steps: int = 100) -> float:
+    """Integrate with the midpoint rule."""
+    width = (end - start) / steps
+    return width * sum(func(start + (i + 0.5) * width) for i in range(steps))
+
+
+class MinHashLSH:
+    """An index of MinHash signatures, bucketed by bands for finding candidate pairs."""
+
+    def __init__(self, *, threshold: float = 0.7, num_perm: int = 128, seed: int = 0) -> None:
+        """Initialize the index.
+
+        :param threshold: The minimum Jaccard similarity for duplicates. Lower
+            thresholds find more candidates, but take longer to verify.
+        :param num_perm: The number of permutations in each signature. More
+            permutations give more accurate estimates, but take longer to calculate.
+            Each signature takes ``num_perm`` times the number of shingles modular
+            multiplications, which are vectorized if :mod:`numpy` is installed.
+        :param seed: The seed for generating permutations, so results are reproducible
+        """
+        self.threshold = threshold
+        self.num_perm = num_perm
+        rng = random.Random(seed)  # noqa:S311
+        # multipliers and shingle hashes are both below 2**32, so their products fit
+        # in 64 bits and can be calculated exactly with numpy's unsigned integers
+        self.permutations = [
+            (rng.randrange(1, 1 << 32), rng.randrange(0, _PRIME)) for _ in range(num_perm)
+        ]
+        self.bands, self.rows = get_optimal_bands(threshold, num_perm)
+        self.buckets: defaultdict[tuple[int, tuple[int, ...]], list[int]] = defaultdict(list)
+
+        try:
+            import numpy as np
+        except ImportError:
+            self._coefficients = None
+        else:
+            self._coefficients = np.array(self.permutations, dtype=np.uint64).T
+
+    def get_signature(self, shingles: Iterable[str]) -> list[int]:
+        """Get the MinHash signature for a set of shingles."""
+        hashes = [
+            int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=4).digest(), "big")
+            for shingle in shingles
+        ]
+        if not hashes:
+            return [_MAX_HASH] * self.num_perm
+        if self._coefficients is not None:
+            return self._get_signature_numpy(hashes)
+        return [
+            min(((a * h) % _PRIME + b) % _PRIME & _MAX_HASH for h in hashes)
+            for a, b in self.permutations
+        ]
+
+    def _get_signature_numpy(self, hashes: list[int]) -> list[int]:
+        """Get the same signature as the pure Python implementation, vectorized."""
+        import numpy as np
+
+        a, b = self._coefficients  # type:ignore[misc]
+        h = np.array(hashes, dtype=np.uint64)
+        values = (np.multiply.outer(a, h) % _PRIME + b[:, None]) % _PRIME & _MAX_HASH
+        return values.min(axis=1).tolist()  # type:ignore[no-any-return]
+
+    def add(self, key: int, signature: list[int]) -> None:
+        """Add a signature to the buckets for each band."""
+        for band in range(self.bands):
+            start = band * self.rows
+            self.buckets[band, tuple(signature[start : start + self.rows])].append(key)
+
+    def get_candidates(self) -> set[tuple[int, int]]:
+        """Get pairs of keys that share at least one bucket."""
+        rv: set[tuple[int, int]] = set()
+        for keys in self.buckets.values():
+            for i, left in enumerate(keys):
+                for right in keys[i + 1 :]:
+                    rv.add((min(left, right), max(left, right)))
+        return rv
+
+
+def find_duplicates(
+    oers: Sequence[EducationalResourceDIF13],
+    *,
+    threshold: float = 0.7,
+    num_perm: int = 128,
+    shingle_size: int = 5,
+    seed: int = 0,
+) -> list[list[int]]:
+    """Find clusters of near-duplicate OERs.
+
+    :param oers: A sequence of OERs, e.g., from several curation files
+    :param threshold: The minimum Jaccard similarity between the shingles of two
+        OERs for them to be considered duplicates
+    :param num_perm: The number of permutations in each MinHash signature
+    :param shingle_size: The number of characters in each shingle
+    :param seed: The seed for generating permutations, so results are reproducible
+
+    :returns: Clusters of indices into ``oers``, each sorted. Clusters are sorted by
+        their first index. Duplicates are transitive, so OERs in a cluster are each
+        similar to at least one other, but not necessarily to all others.
+    """
+    lsh = MinHashLSH(threshold=threshold, num_perm=num_perm, seed=seed)
+    shingles = [get_shingles(oer, size=shingle_size) for oer in oers]
+    for i, oer_shingles in enumerate(shingles):
+        # empty signatures would all share the same buckets
+        if oer_shingles:
+            lsh.add(i, lsh.get_signature(oer_shingles))
+
+    # union-find, with path halving
+    parents = list(range(len(oers)))
+
+    def _find(i: int) -> int:
+        while parents[i] != i:
+            parents[i] = parents[parents[i]]
+            i = parents[i]
+        return i
+
+    for left, right in lsh.get_candidates():
+        # candidates are verified with exact similarity to remove false positives
+        if jaccard(shingles[left], shingles[right]) >= threshold:
+            parents[_find(right)] = _find(left)
+
+    clusters: defaultdict[int, list[int]] = defaultdict(list)
+    for i in range(len(oers)):
+        clusters[_find(i)].append(i)
+    return sorted(cluster for cluster in clusters.values() if len(cluster) > 1)
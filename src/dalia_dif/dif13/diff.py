@@ -0,0 +1,78 @@
+"""Detect which OERs changed between two snapshots of a catalog.
+
+Each OER is reduced to a content digest (see
+:meth:`dalia_dif.dif13.EducationalResourceDIF13.get_digest`), so two snapshots can be
+compared in a single pass by looking up UUIDs in a hash index, without building or
+comparing graphs. This can be used to drive incremental jobs, like reindexing or
+purging caches, for only the resources that changed.
+
+.. code-block:: python
+
+    from dalia_dif.dif13 import iter_dif13
+    from dalia_dif.dif13.diff import diff_dif13
+
+    diff = diff_dif13(iter_dif13("old.csv"), iter_dif13("new.csv"))
+    print(diff.added, diff.removed, diff.modified)
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from typing import TYPE_CHECKING, NamedTuple
+from uuid import UUID
+
+if TYPE_CHECKING:
+    from .model import EducationalResourceDIF13
+
+__all__ = [
+    "DIF13Diff",
+    "diff_dif13",
+    "get_digests",
+]
+
+
+class DIF13Diff(NamedTuple):
+    """The UUIDs of OERs that changed between two snapshots."""
+
+    added: list[UUID]
+    removed: list[UUID]
+    modified: list[UUID]
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.modified)
+
+
+def get_digests(oers: Iterable[EducationalResourceDIF13]) -> dict[UUID, str]:
+    """Get a mapping from the UUIDs of OERs to their content digests.
+
+    :param oers: OERs, e.g., from :func:`dalia_dif.dif13.iter_dif13`. These are
+        consumed lazily, so only the digests are kept in memory.
+    :returns: A dictionary from UUIDs to digests. If a UUID appears more than once,
+        the last OER wins.
+    """
+    return {oer.uuid: oer.get_digest() for oer in oers}
+
+
+def diff_dif13(
+    old: Iterable[EducationalResourceDIF13] | dict[UUID, str],
+    new: Iterable[EducationalResourceDIF13],
+) -> DIF13Diff:
+    """Compare two snapshots of OERs.
+
+    :param old: OERs from the old snapshot, or their digests from :func:`get_digests`,
+        e.g., if they were stored from a previous run
+    :param new: OERs from the new snapshot
+    :returns: The UUIDs of added, removed, and modified OERs. Added and modified UUIDs
+        are in the order they appear in the new snapshot, and removed ones are in the
+        order they appear in the old snapshot.
+    """
+    remaining = dict(old) if isinstance(old, dict) else get_digests(old)
+    added: list[UUID] = []
+    modified: list[UUID] = []
+    for uuid, digest in get_digests(new).items():
+        old_digest = remaining.pop(uuid, None)
+        if old_digest is None:
+            added.append(uuid)
+        elif old_digest != digest:
+            modified.append(uuid)
+    return DIF13Diff(added=added, removed=list(remaining), modified=modified)
@@ -6,25 +6,44 @@ from __future__ import annotations
 
 import datetime
 from collections import Counter, defaultdict
-from collections.abc import Sequence
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass
 from pathlib import Path
 from textwrap import dedent
 from typing import TYPE_CHECKING, Any
 
 import click
 import rdflib
+from rdflib import RDF, URIRef
 
 from dalia_dif.dif13.community import get_community_labels
-from dalia_dif.dif13.predicates import RECOMMENDING_COMMUNITY_PRED, SUPPORTING_COMMUNITY_PRED
+from dalia_dif.dif13.predicates import (
+    DISCIPLINE_PREDICATE,
+    EDUCATIONAL_RESOURCE_CLASS,
+    FILE_FORMAT_PREDICATE,
+    LANGUAGE_PREDICATE,
+    LEARNING_RESOURCE_TYPE_PREDICATE,
+    LICENSE_PREDICATE,
+    MEDIA_TYPES_PREDICATE,
+    PROFICIENCY_LEVEL_PREDICATE,
+    RECOMMENDING_COMMUNITY_PRED,
+    SUPPORTING_COMMUNITY_PRED,
+    TARGET_GROUP_PREDICATE,
+)
 from dalia_dif.dif13.rdf import get_discipline_graph
-from dalia_dif.namespace import CONVERTER
+from dalia_dif.namespace import CONVERTER, ISO639_3
 
 if TYPE_CHECKING:
     import matplotlib.axes
     import matplotlib.patches
 
+    from dalia_dif.dif13.model import EducationalResourceDIF13
+
 __all__ = [
+    "OERStatistics",
     "export_chart",
+    "summarize_graph",
+    "summarize_resources",
 ]
 
 MISSING = "missing"
@@ -61,12 +80,20 @@ def count_languages(graph: rdflib.Graph, *, upper: int = 4) -> tuple[Counter[str
         raise ValueError(f"query returned no results:\n{COUNT_LANGUAGES_SPARQL}")
     dd = defaultdict(list)
     for uuid, lang in res:
-        dd[uuid].append(str(lang).removeprefix("http://lexvo.org/id/iso639-3/"))
+        dd[uuid].append(str(lang))
+    return _summarize_languages(dd.values(), upper=upper)
+
+
+def _summarize_languages(
+    values: Iterable[list[str]], *, upper: int = 4
+) -> tuple[Counter[str], Counter[str]]:
+    """Summarize the language URIs for each OER."""
+    codes = [[lang.removeprefix("http://lexvo.org/id/iso639-3/") for lang in v] for v in values]
     combine: Counter[str] = Counter(
         ", ".join(sorted(v)) if len(v) < upper else f"eng + {len(v) - 1}" if "eng" in v else len(v)
-        for v in dd.values()
+        for v in codes
     )
-    single: Counter[str] = Counter(s for v in dd.values() for s in v)
+    single: Counter[str] = Counter(s for v in codes for s in v)
     return combine, single
 
 
@@ -84,7 +111,11 @@ def count_licenses(graph: rdflib.Graph) -> Counter[str]:
     res = list(graph.query(COUNT_LICENSES_SPARQL))
     if len(res) == 0:
         raise ValueError(f"query returned no results:\n{COUNT_LICENSES_SPARQL}")
-    return Counter(
+    return Counter(_get_license_label(license_uri) for (license_uri,) in res)
+
+
+def _get_license_label(license_uri: str) -> str:
+    return (
         CONVERTER.compress(license_uri, strict=False, passthrough=True)
         .removeprefix("spdx:")
         .removeprefix("spdx.license:")
@@ -93,7 +124,6 @@ def count_licenses(graph: rdflib.Graph) -> Counter[str]:
         .removesuffix("-2.0")
         .removesuffix("-1.0")
         .replace("modalia:ProprietaryLicense", "proprietary")
-        for (license_uri,) in res
     )
 
 
@@ -139,13 +169,14 @@ def count_media_types(graph: rdflib.Graph) -> Counter[str]:
     if len(res) == 0:
         raise ValueError(f"query returned no results:\n{COUNT_MEDIA_TYPE_SPARQL}")
     return Counter(
-        MEDIA_TYPE_LABELS[CONVERTER.compress(media_type, strict=True)].title()
-        if media_type
-        else MISSING
-        for (media_type,) in res
+        _get_media_type_label(media_type) if media_type else MISSING for (media_type,) in res
     )
 
 
+def _get_media_type_label(media_type: str) -> str:
+    return MEDIA_TYPE_LABELS[CONVERTER.compress(media_type, strict=True)].title()
+
+
 COUNT_TARGET_GROUPS_SPARQL = dedent("""\
     SELECT ?o
     WHERE {
@@ -161,17 +192,21 @@ def count_target_groups(graph: rdflib.Graph, total: int) -> Counter[str]:
     if len(res) == 0:
         raise ValueError(f"query returned no results:\n{COUNT_TARGET_GROUPS_SPARQL}")
     rv = Counter(
-        _remap_target_group(CONVERTER.parse_uri(target_group, strict=True).identifier)
-        if target_group
-        else MISSING
+        _get_target_group_label(target_group) if target_group else MISSING
         for (target_group,) in res
     )
-
-    most, count = rv.most_common(1)[0]
-    click.echo(f"The largest target group was {most} ({count:,}/{total:,}; {count / total:.1%})")
+    _echo_largest("target group", rv, total)
     return rv
 
 
+def _echo_largest(name: str, counter: Counter[str], total: int) -> None:
+    if not counter or not total:
+        click.echo(f"The largest {name} was none")
+        return
+    most, count = counter.most_common(1)[0]
+    click.echo(f"The largest {name} was {most} ({count:,}/{total:,}; {count / total:.1%})")
+
+
 TARGET_GROUP_RENAMES = {
     "PhDStudent": "PhD Student",
     "MastersStudent": "Master Student",
@@ -188,6 +223,10 @@ def _remap_target_group(x: str) -> str:
     return TARGET_GROUP_RENAMES.get(x, x)
 
 
+def _get_target_group_label(target_group: str) -> str:
+    return _remap_target_group(CONVERTER.parse_uri(target_group, strict=True).identifier)
+
+
 LRT_MAPPING = {
     "PodcastSeries": "podcast",
     "drill_and_practice": "drill and practice",
@@ -215,7 +254,7 @@ def count_learning_resource_type(graph: rdflib.Graph) -> Counter[str]:
     if len(res) == 0:
         raise ValueError(f"query returned no results:\n{COUNT_LEARNING_TYPE_RESOURCES_SPARQL}")
     return Counter(
-        _remap_lrt(CONVERTER.parse_uri(learning_resource_type, strict=True).identifier)
+        _get_learning_resource_type_label(learning_resource_type)
         if learning_resource_type
         else MISSING
         for (learning_resource_type,) in res
@@ -226,6 +265,10 @@ def _remap_lrt(x: str) -> str:
     return LRT_MAPPING.get(x, x).replace("_", " ").title()
 
 
+def _get_learning_resource_type_label(learning_resource_type: str) -> str:
+    return _remap_lrt(CONVERTER.parse_uri(learning_resource_type, strict=True).identifier)
+
+
 DISCIPLINES_RENAMES = {
     "Cultural Studies in the narrower sense": "Cultural Studies",
     "Archival and Documentation Science": "Archival/Docs",
@@ -285,19 +328,17 @@ def count_proficiency_level(graph: rdflib.Graph, total: int) -> Counter[str]:
     if len(res) == 0:
         raise ValueError(f"query returned no results:\n{COUNT_PROFICIENCY_LEVELS_SPARQL}")
     rv = Counter(
-        CONVERTER.parse_uri(proficiency_level, strict=True).identifier.title()
-        if proficiency_level
-        else MISSING
+        _get_proficiency_level_label(proficiency_level) if proficiency_level else MISSING
         for subj, proficiency_level in res
     )
-
-    most, count = rv.most_common(1)[0]
-    click.echo(
-        f"The largest proficiency level was {most} ({count:,}/{total:,}; {count / total:.1%})"
-    )
+    _echo_largest("proficiency level", rv, total)
     return rv
 
 
+def _get_proficiency_level_label(proficiency_level: str) -> str:
+    return CONVERTER.parse_uri(proficiency_level, strict=True).identifier.title()
+
+
 COUNT_DISCIPLINES_SPARQL = dedent("""\
     SELECT ?o
     WHERE {
@@ -313,9 +354,14 @@ def count_disciplines(graph: rdflib.Graph) -> Counter[str]:
     if len(res) == 0:
         raise ValueError(f"query returned no results:\n{COUNT_DISCIPLINES_SPARQL}")
     names = get_discipline_names()
-    rv = Counter(
-        names[CONVERTER.parse_uri(discipline, strict=True).identifier] for (discipline,) in res
+    return _collapse_disciplines(
+        Counter(
+            names[CONVERTER.parse_uri(discipline, strict=True).identifier] for (discipline,) in res
+        )
     )
+
+
+def _collapse_disciplines(rv: Counter[str]) -> Counter[str]:
     frv: Counter[str] = Counter()
     for k, v in rv.most_common():
         if v > 2:
@@ -342,10 +388,15 @@ def count_communities(graph: rdflib.Graph) -> Counter[str]:
     if len(res) == 0:
         raise ValueError(f"query returned no results:\n{COUNT_COMMUNITIES_SPARQL}")
     # TODO this should be in the graph!
-    rv = Counter(
-        community_labels[str(community).removeprefix("https://id.dalia.education/community/")]
-        for (community,) in res
+    return _collapse_communities(
+        Counter(
+            community_labels[str(community).removeprefix("https://id.dalia.education/community/")]
+            for (community,) in res
+        )
     )
+
+
+def _collapse_communities(rv: Counter[str]) -> Counter[str]:
     for k, v in rv.most_common():
         if v < 3:
             rv["Other"] += v
@@ -353,6 +404,157 @@ def count_communities(graph: rdflib.Graph) -> Counter[str]:
     return rv
 
 
+@dataclass
+class OERStatistics:
+    """Summary statistics over a collection of OERs, calculated in a single pass.
+
+    Each counter is the same as what's returned by the corresponding ``count_*``
+    function, e.g., :attr:`licenses` is the same as :func:`count_licenses`.
+    """
+
+    n_oers: int
+    languages_combined: Counter[str]
+    languages: Counter[str]
+    licenses: Counter[str]
+    file_extensions: Counter[str]
+    media_types: Counter[str]
+    target_groups: Counter[str]
+    learning_resource_types: Counter[str]
+    proficiency_levels: Counter[str]
+    disciplines: Counter[str]
+    communities: Counter[str]
+
+
+class _StatisticsAccumulator:
+    """Collects raw values for all statistics, then labels them all at once."""
+
+    def __init__(self) -> None:
+        self.oers: set[str] = set()
+        self.languages: defaultdict[str, list[str]] = defaultdict(list)
+        self.licenses: Counter[str] = Counter()
+        self.file_formats: Counter[str] = Counter()
+        self.oers_with_file_formats: set[str] = set()
+        self.media_types: Counter[str] = Counter()
+        self.target_groups: Counter[str] = Counter()
+        self.learning_resource_types: Counter[str] = Counter()
+        self.proficiency_levels: Counter[str] = Counter()
+        self.oers_with_proficiency_levels: set[str] = set()
+        self.disciplines: Counter[str] = Counter()
+        self.communities: Counter[str] = Counter()
+
+    def add(self, oer: str, predicate: URIRef, value: str) -> None:
+        """Add a value for a predicate on the given OER."""
+        if predicate == LANGUAGE_PREDICATE:
+            self.languages[oer].append(value)
+        elif predicate == LICENSE_PREDICATE:
+            self.licenses[value] += 1
+        elif predicate == FILE_FORMAT_PREDICATE:
+            self.file_formats[value] += 1
+            self.oers_with_file_formats.add(oer)
+        elif predicate == MEDIA_TYPES_PREDICATE:
+            self.media_types[value] += 1
+        elif predicate == TARGET_GROUP_PREDICATE:
+            self.target_groups[value] += 1
+        elif predicate == LEARNING_RESOURCE_TYPE_PREDICATE:
+            self.learning_resource_types[value] += 1
+        elif predicate == PROFICIENCY_LEVEL_PREDICATE:
+            self.proficiency_levels[value] += 1
+            self.oers_with_proficiency_levels.add(oer)
+        elif predicate == DISCIPLINE_PREDICATE:
+            self.disciplines[value] += 1
+        elif predicate in {SUPPORTING_COMMUNITY_PRED, RECOMMENDING_COMMUNITY_PRED}:
+            self.communities[value] += 1
+
+    def finalize(self) -> OERStatistics:
+        """Apply labels to the raw values."""
+        languages_combined, languages = _summarize_languages(self.languages.values())
+
+        file_extensions = Counter(self.file_formats)
+        if n_missing := len(self.oers - self.oers_with_file_formats):
+            file_extensions[MISSING] += n_missing
+
+        proficiency_levels = _relabel(self.proficiency_levels, _get_proficiency_level_label)
+        if n_missing := len(self.oers - self.oers_with_proficiency_levels):
+            proficiency_levels[MISSING] += n_missing
+
+        if self.disciplines:
+            names = get_discipline_names()
+            disciplines = _collapse_disciplines(
+                _relabel(
+                    self.disciplines,
+                    lambda d: names[CONVERTER.parse_uri(d, strict=True).identifier],
+                )
+            )
+        else:
+            disciplines = Counter()
+
+        community_labels = get_community_labels()
+        communities = _collapse_communities(
+            _relabel(
+                self.communities,
+                lambda c: community_labels[c.removeprefix("https://id.dalia.education/community/")],
+            )
+        )
+
+        return OERStatistics(
+            n_oers=len(self.oers),
+            languages_combined=languages_combined,
+            languages=languages,
+            licenses=_relabel(self.licenses, _get_license_label),
+            file_extensions=file_extensions,
+            media_types=_relabel(self.media_types, _get_media_type_label),
+            target_groups=_relabel(self.target_groups, _get_target_group_label),
+            learning_resource_types=_relabel(
+                self.learning_resource_types, _get_learning_resource_type_label
+            ),
+            proficiency_levels=proficiency_levels,
+            disciplines=disciplines,
+            communities=communities,
+        )
+
+
+def _relabel(counter: Counter[str], func: Callable[[str], str]) -> Counter[str]:
+    rv: Counter[str] = Counter()
+    for key, value in counter.items():
+        rv[func(key)] += value
+    return rv
+
+
+def summarize_graph(graph: rdflib.Graph) -> OERStatistics:
+    """Calculate all statistics with a single pass over the triples in a graph."""
+    oers = {str(oer) for oer in graph.subjects(RDF.type, EDUCATIONAL_RESOURCE_CLASS)}
+    accumulator = _StatisticsAccumulator()
+    accumulator.oers.update(oers)
+    for subject, predicate, obj in graph:
+        if (oer := str(subject)) in oers and isinstance(predicate, URIRef):
+            accumulator.add(oer, predicate, str(obj))
+    return accumulator.finalize()
+
+
+def summarize_resources(oers: Iterable[EducationalResourceDIF13]) -> OERStatistics:
+    """Calculate all statistics in a single pass over OERs, without constructing RDF."""
+    accumulator = _StatisticsAccumulator()
+    for oer in oers:
+        node = str(oer.get_node())
+        accumulator.oers.add(node)
+        # sets mirror the de-duplication that happens when adding to a graph
+        for predicate, values in [
+            (LANGUAGE_PREDICATE, (ISO639_3[language] for language in oer.languages)),
+            (LICENSE_PREDICATE, [oer.license] if oer.license else []),
+            (FILE_FORMAT_PREDICATE, oer.file_formats or []),
+            (MEDIA_TYPES_PREDICATE, oer.media_types),
+            (TARGET_GROUP_PREDICATE, oer.target_groups or []),
+            (LEARNING_RESOURCE_TYPE_PREDICATE, oer.learning_resource_types or []),
+            (PROFICIENCY_LEVEL_PREDICATE, oer.proficiency_levels),
+            (DISCIPLINE_PREDICATE, oer.disciplines or []),
+            (SUPPORTING_COMMUNITY_PRED, oer.supporting_communities),
+            (RECOMMENDING_COMMUNITY_PRED, oer.recommending_communities),
+        ]:
+            for value in dict.fromkeys(str(value) for value in values):
+                accumulator.add(node, predicate, value)
+    return accumulator.finalize()
+
+
 def barplot_counter(
     counter: Counter[str],
     *,
@@ -364,6 +566,18 @@ def barplot_counter(
     """Plot a counter."""
     import seaborn as sns
 
+    if not counter:
+        # e.g., when no OER has target groups, there's nothing to plot
+        if ax is None:
+            import matplotlib.pyplot as plt
+
+            ax = plt.gca()
+        ax.text(0.5, 0.5, "none", ha="center", va="center")
+        ax.set_axis_off()
+        if title:
+            ax.set_title(title)
+        return ax
+
     categories, counts = zip(*counter.most_common(), strict=False)
     ax = sns.barplot(y=categories, x=counts, ax=ax)
 
@@ -409,38 +623,49 @@ def barplot_counter(
 
 
 def export_chart(
-    graph: rdflib.Graph, paths: Path | list[Path], *, include_title: bool = False
+    graph: rdflib.Graph | Iterable[EducationalResourceDIF13],
+    paths: Path | list[Path],
+    *,
+    include_title: bool = False,
 ) -> None:
-    """Export the chart."""
+    """Export the chart.
+
+    :param graph: Either a RDF graph containing OERs encoded in DIF v1.3 or an
+        iterable of OERs, in which case RDF is never constructed
+    :param paths: The path or paths to save the chart to
+    :param include_title: Should a title be added to the chart?
+    """
     import matplotlib.pyplot as plt
 
-    n_oers = count_oers(graph)
+    if isinstance(graph, rdflib.Graph):
+        statistics = summarize_graph(graph)
+    else:
+        statistics = summarize_resources(graph)
+
+    n_oers = statistics.n_oers
     click.secho(f"DALIA has {n_oers:,} OERs")
 
     _fig, axes = plt.subplots(3, 3, figsize=(15, 17))
 
-    _combine_language_counter, single_language_counter = count_languages(graph)
-    barplot_counter(
-        single_language_counter, ax=axes[0][0], title="Language Occurrence", total=n_oers
-    )
-    barplot_counter(count_licenses(graph), ax=axes[0][1], title="Licenses", total=n_oers)
+    barplot_counter(statistics.languages, ax=axes[0][0], title="Language Occurrence", total=n_oers)
+    barplot_counter(statistics.licenses, ax=axes[0][1], title="Licenses", total=n_oers)
     barplot_counter(
-        count_file_extensions(graph), ax=axes[0][2], title="File Extensions", total=n_oers
+        statistics.file_extensions, ax=axes[0][2], title="File Extensions", total=n_oers
     )
-    barplot_counter(count_media_types(graph), ax=axes[1][0], title="Media Types", total=n_oers)
+    barplot_counter(statistics.media_types, ax=axes[1][0], title="Media Types", total=n_oers)
+    _echo_largest("proficiency level", statistics.proficiency_levels, n_oers)
     barplot_counter(
-        count_proficiency_level(graph, n_oers),
+        statistics.proficiency_levels,
         ax=axes[1][1],
         title="Required Proficiency Level",
         total=n_oers,
     )
-    barplot_counter(count_disciplines(graph), ax=axes[1][2], title="Disciplines", total=n_oers)
-    barplot_counter(count_communities(graph), ax=axes[2][0], title="Community", total=n_oers)
-    barplot_counter(
-        count_target_groups(graph, n_oers), ax=axes[2][1], title="Target Groups", total=n_oers
-    )
+    barplot_counter(statistics.disciplines, ax=axes[1][2], title="Disciplines", total=n_oers)
+    barplot_counter(statistics.communities, ax=axes[2][0], title="Community", total=n_oers)
+    _echo_largest("target group", statistics.target_groups, n_oers)
+    barplot_counter(statistics.target_groups, ax=axes[2][1], title="Target Groups", total=n_oers)
     barplot_counter(
-        count_learning_resource_type(graph),
+        statistics.learning_resource_types,
         ax=axes[2][2],
         title="Learning Resource Type",
         total=n_oers,
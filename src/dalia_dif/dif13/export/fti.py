@@ -5,7 +5,11 @@ educational resources encoded in RDF using the DIF v1.3 schema.
 
 .. code-block:: python
 
-    from dalia_ingest.model import dif13_to_sqlite_fti, query_sqlite_fti
+    from dalia_dif.dif13.export.fti import (
+        dif13_to_sqlite_fti,
+        query_sqlite_fti,
+        search_sqlite_fti,
+    )
 
     # give a path or list of paths to TTL files to parse
     ttl_path = ...
@@ -18,71 +22,407 @@ educational resources encoded in RDF using the DIF v1.3 schema.
     # database object. ``*`` can be used as a wildcard at
     # the end (but not the beginning) of the string
     uuids = query_sqlite_fti("chem*", conn)
+
+    # get scores and snippets, one page at a time
+    results = search_sqlite_fti("chem*", conn, limit=20, offset=40, snippet=True)
+
+The index can also be built directly from OERs, which avoids constructing RDF:
+
+.. code-block:: python
+
+    from dalia_dif.dif13 import iter_dif13
+    from dalia_dif.dif13.export.fti import resources_to_sqlite_fti
+
+    conn = resources_to_sqlite_fti(iter_dif13("curation.csv"))
+
+An index that's written to disk can be updated incrementally, e.g., after a
+curation CSV changes. Unchanged OERs are skipped based on a content hash:
+
+.. code-block:: python
+
+    from dalia_dif.dif13 import iter_dif13
+    from dalia_dif.dif13.export.fti import delete_sqlite_fti, upsert_sqlite_fti
+
+    upsert_sqlite_fti(iter_dif13("curation.csv"), "index.db")
+    delete_sqlite_fti(["b3763080-15a4-4de4-b99b-c9b337644904"], "index.db")
+
+A web backend can serve queries from many threads over a read-only index on disk:
+
+.. code-block:: python
+
+    from dalia_dif.dif13.export.fti import FTIndex
+
+    with FTIndex("index.db") as index:
+        results = index.search("chem*", limit=20)
 """
 
 from __future__ import annotations
 
+import hashlib
+import json
 import sqlite3
-from collections import defaultdict
-from contextlib import closing
+import threading
+from collections import OrderedDict, defaultdict
+from collections.abc import Callable, Generator, Hashable, Iterable, Mapping
+from contextlib import closing, contextmanager
 from pathlib import Path
 from textwrap import dedent
-from typing import TYPE_CHECKING
-
-import rdflib
-
-from dalia_dif.namespace import DALIA_OER
+from types import TracebackType
+from typing import TYPE_CHECKING, Any, Literal, NamedTuple, TypeVar, cast, get_args
 
 if TYPE_CHECKING:
     import pandas
+    import rdflib
+    from typing_extensions import Self
+
+    from .similarity import Neighbor
+    from ..model import EducationalResourceDIF13
 
 __all__ = [
+    "FACETS",
+    "SEARCH_MODES",
+    "CacheInfo",
+    "FTIndex",
+    "FacetedSearchResults",
+    "SearchMode",
+    "SearchResult",
+    "UpsertSummary",
+    "connect",
+    "delete_sqlite_fti",
     "dif13_to_sqlite_fti",
+    "faceted_search_sqlite_fti",
+    "get_generation",
+    "get_trigram_query",
     "query_sqlite_fti",
+    "quote_fts_query",
+    "resources_to_sqlite_fti",
+    "search_sqlite_fti",
+    "upsert_sqlite_fti",
     "write_sqlite_fti",
+    "write_sqlite_fti_from_resources",
 ]
 
+T = TypeVar("T")
+
+#: A row in the full text index, containing the UUID, title, description, and keywords
+Row = tuple[str, str, str, str]
 
-def query_sqlite_fti(query: str, db: str | Path | sqlite3.Connection) -> list[str]:
+
+#: How a query is matched against documents:
+#:
+#: - ``word`` uses the stemmed index and supports FTS5 query syntax, like ``chem*``
+#: - ``substring`` finds each word anywhere in a document, even in the middle of
+#:   another word, like ``informatics`` in "cheminformatics". Words must have at least
+#:   three characters.
+#: - ``fuzzy`` ranks documents by how many three-letter sequences they share with the
+#:   query, which tolerates typos
+#:
+#: Both ``substring`` and ``fuzzy`` require an index built with ``trigram=True``.
+SearchMode = Literal["word", "substring", "fuzzy"]
+SEARCH_MODES: tuple[SearchMode, ...] = get_args(SearchMode)
+
+
+def _check_mode(mode: str) -> None:
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"unknown search mode: {mode!r}. Use one of {SEARCH_MODES}")
+
+
+def query_sqlite_fti(
+    query: str, db: str | Path | sqlite3.Connection, *, mode: SearchMode = "word"
+) -> list[str]:
     """Get UUIDs for documents matching the query.
 
     :param query: The query string, like `chem`. Can also include wildcards like in
         `chem*`.
     :param db: Either a path to a SQLite database file or an already-established
         connection
+    :param mode: How the query is matched, see :data:`SearchMode`
 
     :returns: A list of UUIDs for OERs that match the query
     """
-    sql = _get_fts_sql(query)
+    # unpack UUIDs and throw away scores
+    return [result.uuid for result in search_sqlite_fti(query, db, mode=mode)]
+
+
+class SearchResult(NamedTuple):
+    """A document matching a full text query."""
+
+    uuid: str
+    #: The weighted BM25 score. Lower is a better match.
+    score: float
+    #: A fragment of the best matching column, if requested
+    snippet: str | None = None
+    #: The title with matches highlighted, if requested
+    highlight: str | None = None
+
+
+_SEARCH_SQL_TEMPLATE = dedent("""\
+    SELECT
+        uuid,
+        bm25({table}, 0.0, 5.0, 1.0, 0.5) AS score,
+        CASE WHEN :snippet THEN snippet({table}, -1, :open, :close, '…', :tokens) END,
+        CASE WHEN :highlight THEN highlight({table}, 1, :open, :close) END
+    FROM {table}
+    WHERE {table} MATCH :query
+    ORDER BY score
+    LIMIT :limit OFFSET :offset
+""")
+
+#: Query the full text index. The query and all options are bound parameters, so
+#: SQLite's statement cache reuses the same prepared statement for every search.
+FTS_SQL = _SEARCH_SQL_TEMPLATE.format(table="documents")
+
+#: Query the trigram index, for substring and fuzzy search
+TRIGRAM_FTS_SQL = _SEARCH_SQL_TEMPLATE.format(table="documents_trigram")
+
+
+def search_sqlite_fti(
+    query: str,
+    db: str | Path | sqlite3.Connection,
+    *,
+    limit: int | None = None,
+    offset: int = 0,
+    snippet: bool = False,
+    highlight: bool = False,
+    markers: tuple[str, str] = ("<b>", "</b>"),
+    snippet_tokens: int = 16,
+    mode: SearchMode = "word",
+) -> list[SearchResult]:
+    """Search documents, ranked by score.
+
+    :param query: The query string, like `chem`. Can also include wildcards like in
+        `chem*` and other FTS5 query syntax. If the query isn't valid FTS5 syntax
+        (e.g., it has unbalanced quotes), each of its words is searched for literally.
+    :param db: Either a path to a SQLite database file or an already-established
+        connection
+    :param limit: The maximum number of results to return. If none, returns all.
+    :param offset: The number of results to skip, for paging
+    :param snippet: Should a snippet of the best matching column be returned?
+    :param highlight: Should the title be returned with matches highlighted?
+    :param markers: The text inserted before and after matches in snippets and highlights
+    :param snippet_tokens: The maximum number of tokens in a snippet
+    :param mode: How the query is matched, see :data:`SearchMode`
+
+    :returns: A list of results, best match first
+    """
+    parameters = {
+        "limit": -1 if limit is None else limit,
+        "offset": offset,
+        "snippet": snippet,
+        "highlight": highlight,
+        "open": markers[0],
+        "close": markers[1],
+        "tokens": snippet_tokens,
+    }
+    _check_mode(mode)
+    sql = FTS_SQL if mode == "word" else TRIGRAM_FTS_SQL
+    with connect(db) as conn, closing(conn.cursor()) as cursor:
+        rows = _execute_match(cursor, sql, parameters, query, mode)
+    return [SearchResult(*row) for row in rows]
 
-    if isinstance(db, str | Path):
-        db = Path(db).expanduser().resolve()
-        with closing(sqlite3.connect(db.as_posix())) as conn, closing(conn.cursor()) as cursor:
-            results = cursor.execute(sql).fetchall()
-    elif isinstance(db, sqlite3.Connection):
-        with closing(db.cursor()) as cursor:
-            results = cursor.execute(sql).fetchall()
+
+def _execute_match(
+    cursor: sqlite3.Cursor,
+    sql: str,
+    parameters: Mapping[str, object],
+    query: str,
+    mode: SearchMode,
+) -> list[Any]:
+    if mode != "word":
+        trigram_query = get_trigram_query(query, fuzzy=mode == "fuzzy")
+        try:
+            return cursor.execute(sql, {**parameters, "query": trigram_query}).fetchall()
+        except sqlite3.OperationalError as e:
+            if "no such table" not in str(e):
+                raise
+            raise ValueError(
+                f"search mode {mode!r} requires an index built with trigram=True"
+            ) from e
+    try:
+        return cursor.execute(sql, {**parameters, "query": query}).fetchall()
+    except sqlite3.OperationalError:
+        return cursor.execute(sql, {**parameters, "query": quote_fts_query(query)}).fetchall()
+
+
+def quote_fts_query(query: str) -> str:
+    """Quote each word in a query so it's searched literally by FTS5.
+
+    Trailing wildcards are kept, so ``chem*`` still matches by prefix.
+
+    >>> quote_fts_query("chem* AND")
+    '"chem"* "AND"'
+    """
+    terms = []
+    for word in query.split():
+        prefix = word.endswith("*")
+        word = word.rstrip("*")
+        if not word:
+            continue
+        quoted = '"' + word.replace('"', '""') + '"'
+        terms.append(quoted + "*" if prefix else quoted)
+    # an empty phrase matches nothing, rather than raising a syntax error
+    return " ".join(terms) or '""'
+
+
+def get_trigram_query(query: str, *, fuzzy: bool = False) -> str:
+    """Get a query for the trigram index.
+
+    Wildcards are removed, since every word already matches anywhere. Words shorter
+    than three characters are dropped, since the trigram index can't match them.
+
+    :param query: The query string, like ``informatics``
+    :param fuzzy: If true, matches any of the three-letter sequences in each word
+        rather than the whole word, so documents with typos can still be found.
+        Ranking by score puts documents with the most sequences in common first.
+
+    >>> get_trigram_query("*informatics pY")
+    '"informatics"'
+    >>> get_trigram_query("chem", fuzzy=True)
+    '"che" OR "hem"'
+    """
+    words = [word.strip("*") for word in query.split()]
+    words = [word for word in words if len(word) >= 3]
+    if fuzzy:
+        terms = list(
+            dict.fromkeys(
+                word.casefold()[i : i + 3] for word in words for i in range(len(word) - 2)
+            )
+        )
+        separator = " OR "
     else:
-        raise TypeError
+        terms = words
+        separator = " "
+    # an empty phrase matches nothing, rather than raising a syntax error
+    return separator.join('"' + term.replace('"', '""') + '"' for term in terms) or '""'
 
-    # unpack UUIDs and throw away scores
-    return [uuid for uuid, _score in results]
 
+class FacetedSearchResults(NamedTuple):
+    """A page of results from a faceted search, with counts over all matches."""
+
+    #: The requested page of results, best match first
+    results: list[SearchResult]
+    #: The total number of matching documents
+    total: int
+    #: For each facet, a dictionary from values to the number of matching documents
+    #: that have that value, sorted by decreasing count
+    facets: dict[str, dict[str, int]]
+
+
+def faceted_search_sqlite_fti(
+    query: str | None,
+    db: str | Path | sqlite3.Connection,
+    *,
+    filters: Mapping[str, str | Iterable[str]] | None = None,
+    limit: int | None = None,
+    offset: int = 0,
+    mode: SearchMode = "word",
+) -> FacetedSearchResults:
+    """Search documents, filtered by facets, and count facet values over the matches.
+
+    :param query: The query string, like in :func:`search_sqlite_fti`. If none,
+        all documents matching the filters are returned, unranked.
+    :param db: Either a path to a SQLite database file or an already-established
+        connection
+    :param filters: A dictionary from facets (see :data:`FACETS`) to a value or values.
+        Documents must match at least one value for every facet given.
+    :param limit: The maximum number of results to return. If none, returns all.
+    :param offset: The number of results to skip, for paging
+    :param mode: How the query is matched, see :data:`SearchMode`
+
+    :returns: The page of results, the total number of matches, and facet counts
+        calculated in the same query
 
-def _get_fts_sql(query: str) -> str:
-    # Test FTS query (e.g., search all fields for "python") note that the bm25 weights
+    .. code-block:: python
+
+        faceted_search_sqlite_fti(
+            "python",
+            conn,
+            filters={"language": ["eng", "deu"], "license": "http://spdx.org/licenses/CC0-1.0"},
+            limit=20,
+        )
+    """
+    _check_mode(mode)
+    parameters: dict[str, str | int] = {"limit": -1 if limit is None else limit, "offset": offset}
+    for i, (facet, values) in enumerate((filters or {}).items()):
+        if facet not in FACETS:
+            raise ValueError(f"unknown facet: {facet}. Use one of {FACETS}")
+        parameters[f"facet{i}"] = facet
+        parameters[f"values{i}"] = json.dumps([values] if isinstance(values, str) else [*values])
+    table = "documents" if mode == "word" else "documents_trigram"
+    sql = _get_faceted_sql(query is not None, len(filters or {}), table)
+
+    with connect(db) as conn, closing(conn.cursor()) as cursor:
+        if query is None:
+            rows = cursor.execute(sql, parameters).fetchall()
+        else:
+            rows = _execute_match(cursor, sql, parameters, query, mode)
+
+    results: list[SearchResult] = []
+    total = 0
+    facets: defaultdict[str, dict[str, int]] = defaultdict(dict)
+    for kind, facet, value, number, _position in rows:
+        if kind == 0:
+            results.append(SearchResult(value, number))
+        elif kind == 1:
+            total = number
+        else:
+            facets[facet][value] = number
+    return FacetedSearchResults(
+        results=results,
+        total=total,
+        facets={
+            facet: dict(sorted(counts.items(), key=lambda item: (-item[1], item[0])))
+            for facet, counts in facets.items()
+        },
+    )
+
+
+def _get_faceted_sql(has_query: bool, n_filters: int, table: str = "documents") -> str:
+    """Get SQL for a faceted search.
+
+    The SQL only depends on whether there's a query, the number of filters, and the
+    table being searched, so SQLite's statement cache can reuse it. The page of
+    results, the total, and the facet counts all come back from a single statement,
+    distinguished by ``kind``.
+    """
+    if has_query:
+        matches = (
+            f"SELECT uuid, bm25({table}, 0.0, 5.0, 1.0, 0.5) AS score "  # noqa:S608
+            f"FROM {table} WHERE {table} MATCH :query"
+        )
+    else:
+        matches = "SELECT uuid, 0.0 AS score FROM documents WHERE 1"
+    for i in range(n_filters):
+        matches += (
+            f" AND uuid IN (SELECT uuid FROM facets WHERE facet = :facet{i}"  # noqa:S608
+            f" AND value IN (SELECT value FROM json_each(:values{i})))"
+        )
     return dedent(f"""\
-        SELECT uuid, bm25(documents, 0.0, 5.0, 1.0, 0.5)
-        FROM documents
-        WHERE documents MATCH '{query}'
-        ORDER BY rank;
+        WITH
+            matches AS ({matches}),
+            page AS (SELECT uuid, score FROM matches ORDER BY score LIMIT :limit OFFSET :offset)
+        SELECT
+            0 AS kind, NULL AS facet, uuid AS value, score AS number,
+            row_number() OVER (ORDER BY score) AS position
+        FROM page
+        UNION ALL
+        SELECT 1, NULL, NULL, COUNT(*), 0 FROM matches
+        UNION ALL
+        SELECT 2, facet, value, COUNT(*), 0
+        FROM facets
+        WHERE uuid IN (SELECT uuid FROM matches)
+        GROUP BY facet, value
+        ORDER BY kind, position
     """)  # noqa:S608
 
 
-def dif13_to_sqlite_fti(paths: str | Path | list[str | Path]) -> sqlite3.Connection:
+def dif13_to_sqlite_fti(
+    paths: str | Path | list[str | Path], *, trigram: bool = False
+) -> sqlite3.Connection:
     """Construct an in-memory SQLite database with a full-text index over OERs encoded in DIF v1.3.
 
     :param paths: The path or paths to turtle files encoding OERs in DIF v1.3
+    :param trigram: Should a trigram index be built for substring and fuzzy search?
 
     :returns: An in-memory SQLite database object that can be queried
 
@@ -94,6 +434,8 @@ def dif13_to_sqlite_fti(paths: str | Path | list[str | Path]) -> sqlite3.Connect
         conn = dif13_to_sqlite_fti(ttl_path)
         uuids = query_sqlite_fti("chem*", conn)
     """
+    import rdflib
+
     graph = rdflib.Graph()
 
     if isinstance(paths, str | Path):
@@ -104,19 +446,21 @@ def dif13_to_sqlite_fti(paths: str | Path | list[str | Path]) -> sqlite3.Connect
     else:
         raise TypeError(f"`paths` should be a path or list of paths. Got: ({type(paths)}) {paths}")
 
-    return graph_to_conn(graph)
+    return graph_to_conn(graph, trigram=trigram)
 
 
-def graph_to_conn(graph: rdflib.Graph) -> sqlite3.Connection:
+def graph_to_conn(graph: rdflib.Graph, *, trigram: bool = False) -> sqlite3.Connection:
     df = graph_to_df(graph)
     conn = sqlite3.connect(":memory:")
-    _dif13_df_to_sqlite(df, conn)
+    _dif13_df_to_sqlite(df, conn, trigram=trigram)
     return conn
 
 
 def graph_to_df(graph: rdflib.Graph) -> pandas.DataFrame:
     import pandas as pd
 
+    from dalia_dif.namespace import DALIA_OER
+
     titles = defaultdict(set)
     descriptions = defaultdict(set)
     keywords = defaultdict(set)
@@ -160,12 +504,31 @@ WHERE {
 """
 
 
-def _dif13_df_to_sqlite(df: pandas.DataFrame, conn: sqlite3.Connection) -> None:
+def _dif13_df_to_sqlite(
+    df: pandas.DataFrame, conn: sqlite3.Connection, *, trigram: bool = False
+) -> None:
     """Write a dataframe to a SQLite database (which could be in-memory)."""
+    _create_documents_table(conn)
+    df.to_sql("documents", conn, if_exists="append", index=False)
+    if trigram:
+        _create_trigram_table(conn)
+        with conn:
+            conn.execute(
+                "INSERT INTO documents_trigram(rowid, uuid, title, description, keywords) "
+                "SELECT rowid, uuid, title, description, keywords FROM documents"
+            )
+    # facets aren't available from the graph, so they get added by upserting OERs
+    _create_facets_table(conn)
+    _ensure_hash_table(conn)
+    with conn:
+        _bump_generation(conn)
+
+
+def _create_documents_table(conn: sqlite3.Connection) -> None:
     # Enable FTS5 extension (usually built-in with modern SQLite)
     # Create FTS5 virtual table
     query = dedent("""\
-        CREATE VIRTUAL TABLE documents USING fts5(
+        CREATE VIRTUAL TABLE IF NOT EXISTS documents USING fts5(
             uuid,
             title,
             description,
@@ -176,11 +539,573 @@ def _dif13_df_to_sqlite(df: pandas.DataFrame, conn: sqlite3.Connection) -> None:
     """)
     with closing(conn.cursor()) as cursor:
         cursor.execute(query)
-    df.to_sql("documents", conn, if_exists="append", index=False)
 
 
-def write_sqlite_fti(graph: rdflib.Graph, path: Path) -> None:
+def _create_trigram_table(conn: sqlite3.Connection) -> None:
+    """Create a secondary index for substring search, which shares rowids with ``documents``."""
+    query = dedent("""\
+        CREATE VIRTUAL TABLE IF NOT EXISTS documents_trigram USING fts5(
+            uuid UNINDEXED,
+            title,
+            description,
+            keywords,
+            tokenize = 'trigram'
+        )
+    """)
+    with closing(conn.cursor()) as cursor:
+        cursor.execute(query)
+
+
+def _has_trigram_table(conn: sqlite3.Connection) -> bool:
+    with closing(conn.cursor()) as cursor:
+        row = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'documents_trigram'"
+        ).fetchone()
+    return row is not None
+
+
+def write_sqlite_fti(graph: rdflib.Graph, path: Path, *, trigram: bool = False) -> None:
     """Write a SQLite database with a full text index."""
     df = graph_to_df(graph)
     with closing(sqlite3.connect(path.as_posix())) as conn:
-        _dif13_df_to_sqlite(df, conn)
+        _dif13_df_to_sqlite(df, conn, trigram=trigram)
+
+
+def resources_to_sqlite_fti(
+    oers: Iterable[EducationalResourceDIF13], *, trigram: bool = False
+) -> sqlite3.Connection:
+    """Construct an in-memory SQLite database with a full-text index over OERs.
+
+    :param oers: OERs to index, e.g., from :func:`dalia_dif.dif13.iter_dif13`
+    :param trigram: Should a trigram index be built for substring and fuzzy search?
+
+    :returns: An in-memory SQLite database object that can be queried
+    """
+    conn = sqlite3.connect(":memory:")
+    _resources_to_sqlite(oers, conn, trigram=trigram)
+    return conn
+
+
+def write_sqlite_fti_from_resources(
+    oers: Iterable[EducationalResourceDIF13], path: Path, *, trigram: bool = False
+) -> None:
+    """Write a SQLite database with a full text index over OERs, replacing any existing index.
+
+    :param oers: OERs to index, e.g., from :func:`dalia_dif.dif13.iter_dif13`
+    :param path: The path to the SQLite database file
+    :param trigram: Should a trigram index be built for substring and fuzzy search?
+    """
+    with closing(sqlite3.connect(path.as_posix())) as conn:
+        _resources_to_sqlite(oers, conn, trigram=trigram)
+
+
+def _resources_to_sqlite(
+    oers: Iterable[EducationalResourceDIF13], conn: sqlite3.Connection, *, trigram: bool = False
+) -> None:
+    """Bulk insert OERs into a new index in a single transaction."""
+    # if a UUID appears more than once, the last one wins, like with an upsert
+    documents = {str(oer.uuid): (_oer_to_row(oer), _oer_to_facets(oer)) for oer in oers}
+    with conn, closing(conn.cursor()) as cursor:
+        # begin explicitly so the old index is only replaced if the whole build succeeds
+        cursor.execute("BEGIN")
+        cursor.execute("DROP TABLE IF EXISTS documents")
+        cursor.execute("DROP TABLE IF EXISTS document_hashes")
+        cursor.execute("DROP TABLE IF EXISTS facets")
+        cursor.execute("DROP TABLE IF EXISTS documents_trigram")
+        _create_documents_table(conn)
+        _create_hash_table(conn)
+        _create_facets_table(conn)
+        # explicit rowids mean the hashes can be written without reading back
+        cursor.executemany(
+            "INSERT INTO documents(rowid, uuid, title, description, keywords) "
+            "VALUES (?, ?, ?, ?, ?)",
+            ((rowid, *row) for rowid, (row, _) in enumerate(documents.values(), start=1)),
+        )
+        if trigram:
+            _create_trigram_table(conn)
+            cursor.execute(
+                "INSERT INTO documents_trigram(rowid, uuid, title, description, keywords) "
+                "SELECT rowid, uuid, title, description, keywords FROM documents"
+            )
+        cursor.executemany(
+            "INSERT INTO document_hashes VALUES (?, ?, ?)",
+            (
+                (uuid, rowid, _hash_document(row, facets))
+                for rowid, (uuid, (row, facets)) in enumerate(documents.items(), start=1)
+            ),
+        )
+        cursor.executemany(
+            "INSERT INTO facets VALUES (?, ?, ?)",
+            (
+                (uuid, facet, value)
+                for uuid, (_, facets) in documents.items()
+                for facet, value in facets
+            ),
+        )
+        _bump_generation(conn)
+
+
+class UpsertSummary(NamedTuple):
+    """Counts of what happened during an incremental update of the full text index."""
+
+    inserted: int
+    updated: int
+    unchanged: int
+
+
+@contextmanager
+def connect(db: str | Path | sqlite3.Connection) -> Generator[sqlite3.Connection, None, None]:
+    """Yield a connection to the database, closing it afterwards if it was opened here."""
+    if isinstance(db, str | Path):
+        path = Path(db).expanduser().resolve()
+        with closing(sqlite3.connect(path.as_posix())) as conn:
+            yield conn
+    elif isinstance(db, sqlite3.Connection):
+        yield db
+    else:
+        raise TypeError
+
+
+def _oer_to_row(oer: EducationalResourceDIF13) -> Row:
+    return (
+        str(oer.uuid),
+        oer.title,
+        oer.description or "",
+        " ".join(dict.fromkeys(oer.keywords)),
+    )
+
+
+#: The facets that OERs can be filtered by. Languages are ISO 639-3 codes and all
+#: other values are URIs.
+FACETS: tuple[str, ...] = (
+    "language",
+    "license",
+    "discipline",
+    "community",
+    "media_type",
+    "target_group",
+)
+
+
+def _oer_to_facets(oer: EducationalResourceDIF13) -> list[tuple[str, str]]:
+    pairs = [
+        *(("language", str(language)) for language in oer.languages),
+        *(("license", str(oer.license)) for _ in [oer.license] if oer.license),
+        *(("discipline", str(discipline)) for discipline in oer.disciplines or []),
+        *(("community", str(community)) for community in oer.supporting_communities),
+        *(("community", str(community)) for community in oer.recommending_communities),
+        *(("media_type", str(media_type)) for media_type in oer.media_types),
+        *(("target_group", str(target_group)) for target_group in oer.target_groups or []),
+    ]
+    return list(dict.fromkeys(pairs))
+
+
+def _hash_document(row: Row, facets: list[tuple[str, str]]) -> str:
+    return hashlib.sha256(json.dumps([row, facets]).encode("utf-8")).hexdigest()
+
+
+def _ensure_hash_table(conn: sqlite3.Connection) -> None:
+    """Create the table of content hashes, backfilling it from existing documents.
+
+    FTS5 tables can only be efficiently looked up by rowid, so the hash table also
+    maps each UUID to its rowid in the ``documents`` table.
+    """
+    with closing(conn.cursor()) as cursor:
+        exists = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'document_hashes'"
+        ).fetchone()
+        if exists:
+            return
+        _create_hash_table(conn)
+        rows = cursor.execute(
+            "SELECT rowid, uuid, title, description, keywords FROM documents"
+        ).fetchall()
+        cursor.executemany(
+            "INSERT OR REPLACE INTO document_hashes VALUES (?, ?, ?)",
+            (
+                (
+                    uuid,
+                    rowid,
+                    _hash_document((uuid, title or "", description or "", keywords or ""), []),
+                )
+                for rowid, uuid, title, description, keywords in rows
+            ),
+        )
+    conn.commit()
+
+
+def _create_facets_table(conn: sqlite3.Connection) -> None:
+    with closing(conn.cursor()) as cursor:
+        cursor.execute(
+            dedent("""\
+                CREATE TABLE IF NOT EXISTS facets (
+                    uuid TEXT NOT NULL,
+                    facet TEXT NOT NULL,
+                    value TEXT NOT NULL
+                )
+            """)
+        )
+        cursor.execute("CREATE INDEX IF NOT EXISTS facets_facet_value ON facets(facet, value)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS facets_uuid ON facets(uuid)")
+
+
+def _create_hash_table(conn: sqlite3.Connection) -> None:
+    query = dedent("""\
+        CREATE TABLE IF NOT EXISTS document_hashes (
+            uuid TEXT PRIMARY KEY,
+            document_rowid INTEGER NOT NULL,
+            hash TEXT NOT NULL
+        )
+    """)
+    with closing(conn.cursor()) as cursor:
+        cursor.execute(query)
+
+
+def upsert_sqlite_fti(
+    oers: Iterable[EducationalResourceDIF13], db: str | Path | sqlite3.Connection
+) -> UpsertSummary:
+    """Insert or update OERs in an existing full text index.
+
+    :param oers: OERs to add to the index, e.g., from :func:`dalia_dif.dif13.iter_dif13`
+    :param db: Either a path to a SQLite database file or an already-established
+        connection. If the database doesn't already contain an index (e.g., made with
+        :func:`write_sqlite_fti`), one is created.
+
+    :returns: The number of OERs that were inserted, updated, or skipped because
+        their content didn't change
+    """
+    inserted = updated = unchanged = 0
+    with connect(db) as conn:
+        _create_documents_table(conn)
+        _create_facets_table(conn)
+        _ensure_hash_table(conn)
+        trigram = _has_trigram_table(conn)
+        with conn, closing(conn.cursor()) as cursor:
+            for oer in oers:
+                row = _oer_to_row(oer)
+                facets = _oer_to_facets(oer)
+                row_hash = _hash_document(row, facets)
+                existing = cursor.execute(
+                    "SELECT document_rowid, hash FROM document_hashes WHERE uuid = ?", (row[0],)
+                ).fetchone()
+                if existing is None:
+                    inserted += 1
+                else:
+                    document_rowid, existing_hash = existing
+                    if existing_hash == row_hash:
+                        unchanged += 1
+                        continue
+                    cursor.execute("DELETE FROM documents WHERE rowid = ?", (document_rowid,))
+                    cursor.execute("DELETE FROM facets WHERE uuid = ?", (row[0],))
+                    if trigram:
+                        cursor.execute(
+                            "DELETE FROM documents_trigram WHERE rowid = ?", (document_rowid,)
+                        )
+                    updated += 1
+                cursor.execute(
+                    "INSERT INTO documents(uuid, title, description, keywords) VALUES (?, ?, ?, ?)",
+                    row,
+                )
+                document_rowid = cursor.lastrowid
+                if trigram:
+                    cursor.execute(
+                        "INSERT INTO documents_trigram(rowid, uuid, title, description, keywords) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (document_rowid, *row),
+                    )
+                cursor.execute(
+                    "INSERT OR REPLACE INTO document_hashes VALUES (?, ?, ?)",
+                    (row[0], document_rowid, row_hash),
+                )
+                cursor.executemany(
+                    "INSERT INTO facets VALUES (?, ?, ?)",
+                    ((row[0], facet, value) for facet, value in facets),
+                )
+            if inserted or updated:
+                _bump_generation(conn)
+    return UpsertSummary(inserted=inserted, updated=updated, unchanged=unchanged)
+
+
+def delete_sqlite_fti(uuids: Iterable[str], db: str | Path | sqlite3.Connection) -> int:
+    """Delete OERs from an existing full text index.
+
+    :param uuids: The UUIDs of OERs to remove. UUIDs that aren't in the index are ignored.
+    :param db: Either a path to a SQLite database file containing an index made with
+        :func:`write_sqlite_fti` or an already-established connection
+
+    :returns: The number of OERs that were deleted
+    """
+    deleted = 0
+    with connect(db) as conn:
+        _create_documents_table(conn)
+        _create_facets_table(conn)
+        _ensure_hash_table(conn)
+        trigram = _has_trigram_table(conn)
+        with conn, closing(conn.cursor()) as cursor:
+            for uuid in uuids:
+                existing = cursor.execute(
+                    "SELECT document_rowid FROM document_hashes WHERE uuid = ?", (str(uuid),)
+                ).fetchone()
+                if existing is None:
+                    continue
+                cursor.execute("DELETE FROM documents WHERE rowid = ?", existing)
+                if trigram:
+                    cursor.execute("DELETE FROM documents_trigram WHERE rowid = ?", existing)
+                cursor.execute("DELETE FROM document_hashes WHERE uuid = ?", (str(uuid),))
+                cursor.execute("DELETE FROM facets WHERE uuid = ?", (str(uuid),))
+                deleted += 1
+            if deleted:
+                _bump_generation(conn)
+    return deleted
+
+
+def _bump_generation(conn: sqlite3.Connection) -> None:
+    """Increment the generation of the index, which invalidates cached results.
+
+    The metadata table isn't dropped when an index is rebuilt, so generations
+    always increase.
+    """
+    with closing(conn.cursor()) as cursor:
+        cursor.execute(
+            "CREATE TABLE IF NOT EXISTS metadata (key TEXT PRIMARY KEY, value INTEGER NOT NULL)"
+        )
+        cursor.execute(
+            "INSERT INTO metadata VALUES ('generation', 1) "
+            "ON CONFLICT(key) DO UPDATE SET value = value + 1"
+        )
+
+
+def get_generation(db: str | Path | sqlite3.Connection) -> int:
+    """Get the generation of an index, which increases every time it's changed.
+
+    :param db: Either a path to a SQLite database file or an already-established
+        connection
+
+    :returns: The generation, or zero for indexes made before generations were tracked
+    """
+    with connect(db) as conn, closing(conn.cursor()) as cursor:
+        try:
+            row = cursor.execute("SELECT value FROM metadata WHERE key = 'generation'").fetchone()
+        except sqlite3.OperationalError:  # the metadata table doesn't exist
+            return 0
+    return 0 if row is None else int(row[0])
+
+
+class FTIndex:
+    """A read-only full text index on disk that can be queried from many threads.
+
+    Each thread lazily opens its own connection, which is reused for all of its
+    queries, so there's no overhead from reconnecting. All connections are closed
+    together with :meth:`close`, or when exiting the context manager.
+    """
+
+    def __init__(self, path: str | Path, *, immutable: bool = False, cache_size: int = 0) -> None:
+        """Initialize the index.
+
+        :param path: The path to a SQLite database file containing an index, e.g.,
+            made with :func:`write_sqlite_fti_from_resources`
+        :param immutable: Set this if the file is guaranteed not to change while it's
+            being served, which lets SQLite skip locking. Otherwise, the database is
+            opened read-only, so it can still be updated by another process (e.g.,
+            with :func:`upsert_sqlite_fti`), ideally in WAL mode.
+
+        :param cache_size: The maximum number of results to keep in a least recently
+            used cache. By default, results aren't cached. The cache is cleared
+            automatically whenever the index's generation changes, i.e., after it's
+            rebuilt or updated.
+
+        :raises FileNotFoundError: If the file doesn't exist. Otherwise, SQLite would
+            create an empty database.
+        """
+        self.path = Path(path).expanduser().resolve()
+        if not self.path.is_file():
+            raise FileNotFoundError(self.path)
+        self.uri = f"{self.path.as_uri()}?mode=ro"
+        if immutable:
+            self.uri += "&immutable=1"
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: list[sqlite3.Connection] = []
+        self._closed = False
+        self.immutable = immutable
+        self.cache_size = cache_size
+        self._cache: OrderedDict[Hashable, Any] = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._cache_generation: int | None = None
+        self._hits = self._misses = 0
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """Get the connection for the current thread."""
+        conn: sqlite3.Connection | None = getattr(self._local, "connection", None)
+        if conn is not None:
+            return conn
+        with self._lock:
+            if self._closed:
+                raise ValueError("index is closed")
+            # each connection is only ever used by the thread that made it, but it's
+            # closed from whichever thread calls close()
+            conn = sqlite3.connect(self.uri, uri=True, check_same_thread=False)
+            self._connections.append(conn)
+        self._local.connection = conn
+        return conn
+
+    def query(self, query: str, *, mode: SearchMode = "word") -> list[str]:
+        """Get UUIDs for documents matching the query, like :func:`query_sqlite_fti`."""
+        return [result.uuid for result in self.search(query, mode=mode)]
+
+    def search(
+        self,
+        query: str,
+        *,
+        limit: int | None = None,
+        offset: int = 0,
+        snippet: bool = False,
+        highlight: bool = False,
+        mode: SearchMode = "word",
+    ) -> list[SearchResult]:
+        """Search documents, like :func:`search_sqlite_fti`."""
+        key = ("search", _normalize_query(query), limit, offset, snippet, highlight, mode)
+        results: list[SearchResult] = self._cached(
+            key,
+            lambda: search_sqlite_fti(
+                query,
+                self.connection,
+                limit=limit,
+                offset=offset,
+                snippet=snippet,
+                highlight=highlight,
+                mode=mode,
+            ),
+        )
+        return list(results)
+
+    def faceted_search(
+        self,
+        query: str | None,
+        *,
+        filters: Mapping[str, str | Iterable[str]] | None = None,
+        limit: int | None = None,
+        offset: int = 0,
+        mode: SearchMode = "word",
+    ) -> FacetedSearchResults:
+        """Search documents with facets, like :func:`faceted_search_sqlite_fti`."""
+        key = (
+            "faceted_search",
+            None if query is None else _normalize_query(query),
+            _normalize_filters(filters),
+            limit,
+            offset,
+            mode,
+        )
+        rv: FacetedSearchResults = self._cached(
+            key,
+            lambda: faceted_search_sqlite_fti(
+                query, self.connection, filters=filters, limit=limit, offset=offset, mode=mode
+            ),
+        )
+        return FacetedSearchResults(
+            results=list(rv.results),
+            total=rv.total,
+            facets={facet: dict(counts) for facet, counts in rv.facets.items()},
+        )
+
+    def similar(self, uuid: str, *, limit: int | None = None) -> list[Neighbor]:
+        """Get similar OERs from :func:`.similarity.get_similar_resources`."""
+        from .similarity import get_similar_resources
+
+        return get_similar_resources(uuid, self.connection, limit=limit)
+
+    def _cached(self, key: Hashable, func: Callable[[], T]) -> T:
+        """Get a result from the cache, or calculate and store it."""
+        if not self.cache_size:
+            return func()
+        # an immutable index can't change, so its generation is only checked once
+        if not self.immutable or self._cache_generation is None:
+            current = get_generation(self.connection)
+            with self._cache_lock:
+                if current != self._cache_generation:
+                    self._cache.clear()
+                    self._cache_generation = current
+        with self._cache_lock:
+            if key in self._cache:
+                self._hits += 1
+                self._cache.move_to_end(key)
+                return cast(T, self._cache[key])
+            self._misses += 1
+            generation = self._cache_generation
+        # calculate outside the lock so other threads aren't blocked
+        rv = func()
+        with self._cache_lock:
+            # don't store a stale result if the index changed in the meantime
+            if generation != self._cache_generation:
+                return rv
+            self._cache[key] = rv
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return rv
+
+    def cache_info(self) -> CacheInfo:
+        """Get statistics about the result cache, like :func:`functools.lru_cache`."""
+        with self._cache_lock:
+            return CacheInfo(
+                hits=self._hits,
+                misses=self._misses,
+                maxsize=self.cache_size,
+                currsize=len(self._cache),
+            )
+
+    def cache_clear(self) -> None:
+        """Clear the result cache and its statistics."""
+        with self._cache_lock:
+            self._cache.clear()
+            self._hits = self._misses = 0
+
+    def close(self) -> None:
+        """Close the connections for all threads."""
+        with self._lock:
+            self._closed = True
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+            # drop references to closed connections held by other threads
+            self._local = threading.local()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+
+class CacheInfo(NamedTuple):
+    """Statistics about the result cache of a :class:`FTIndex`."""
+
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+def _normalize_query(query: str) -> str:
+    # FTS5 operators like OR are case-sensitive, so only whitespace is normalized
+    return " ".join(query.split())
+
+
+def _normalize_filters(
+    filters: Mapping[str, str | Iterable[str]] | None,
+) -> tuple[tuple[str, tuple[str, ...]], ...]:
+    if not filters:
+        return ()
+    return tuple(
+        sorted(
+            (facet, tuple(sorted({values} if isinstance(values, str) else set(values))))
+            for facet, values in filters.items()
+        )
+    )
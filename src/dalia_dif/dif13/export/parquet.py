@@ -0,0 +1,187 @@
+"""Export OERs to Apache Parquet, e.g., for analysis with :mod:`pandas` or DuckDB.
+
+Each field of :class:`dalia_dif.dif13.EducationalResourceDIF13` becomes a typed
+column, with list columns for multi-valued fields like keywords, languages, and
+disciplines, and lists of structs for authors and related works. OERs are written
+in record batches, so memory is bounded by the batch size rather than the size of
+the catalog. This requires :mod:`pyarrow`, which can be installed with ``pip install
+dalia-dif[parquet]``.
+
+.. code-block:: python
+
+    import pandas as pd
+
+    from dalia_dif.dif13 import iter_dif13
+    from dalia_dif.dif13.export.parquet import write_dif13_parquet
+
+    write_dif13_parquet(iter_dif13("curation.csv"), "catalog.parquet")
+    df = pd.read_parquet("catalog.parquet")
+
+The same file can be queried directly with DuckDB, e.g., ``SELECT title FROM
+'catalog.parquet' WHERE list_contains(languages, 'eng')``.
+"""
+
+from __future__ import annotations
+
+import datetime
+from collections.abc import Iterable
+from itertools import islice
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from ..model import AuthorDIF13
+
+if TYPE_CHECKING:
+    import pyarrow
+
+    from ..model import EducationalResourceDIF13
+
+__all__ = [
+    "get_arrow_schema",
+    "iter_record_batches",
+    "write_dif13_parquet",
+]
+
+#: Fields whose values are lists of URIs or strings
+LIST_FIELDS = [
+    "links",
+    "supporting_communities",
+    "recommending_communities",
+    "disciplines",
+    "file_formats",
+    "keywords",
+    "xrefs",
+    "languages",
+    "learning_resource_types",
+    "media_types",
+    "proficiency_levels",
+    "target_groups",
+]
+
+#: Fields whose values are single strings
+STRING_FIELDS = ["title", "subtitle", "license", "description", "file_size", "version"]
+
+
+def get_arrow_schema() -> pyarrow.Schema:
+    """Get the Arrow schema for OERs.
+
+    Publication dates are split into two columns, since they're sometimes only a
+    year: ``publication_year`` is always filled in if there's a publication date, and
+    ``publication_date`` is only filled in if the full date is known.
+    """
+    import pyarrow as pa
+
+    author = pa.struct(
+        [
+            # either "person" or "organization"
+            ("type", pa.string()),
+            ("name", pa.string()),
+            ("family_name", pa.string()),
+            ("given_name", pa.string()),
+            ("orcid", pa.string()),
+            ("ror", pa.string()),
+            ("wikidata", pa.string()),
+        ]
+    )
+    related_work = pa.struct([("predicate", pa.string()), ("object", pa.string())])
+    return pa.schema(
+        [
+            pa.field("uuid", pa.string(), nullable=False),
+            *(pa.field(name, pa.string()) for name in STRING_FIELDS),
+            pa.field("authors", pa.list_(author)),
+            *(pa.field(name, pa.list_(pa.string())) for name in LIST_FIELDS),
+            pa.field("publication_year", pa.int16()),
+            pa.field("publication_date", pa.date32()),
+            pa.field("related_works", pa.list_(related_work)),
+        ]
+    )
+
+
+def _get_author(author: Any) -> dict[str, str | None]:
+    if isinstance(author, AuthorDIF13):
+        return {
+            "type": "person",
+            "name": author.name,
+            "family_name": author.family_name,
+            "given_name": author.given_name,
+            "orcid": author.orcid,
+        }
+    return {
+        "type": "organization",
+        "name": author.name,
+        "ror": author.ror,
+        "wikidata": author.wikidata,
+    }
+
+
+def _get_publication_date(oer: EducationalResourceDIF13) -> tuple[int | None, datetime.date | None]:
+    match oer.publication_date:
+        case None:
+            return None, None
+        case datetime.datetime() as dt:
+            return dt.year, dt.date()
+        case datetime.date() as date:
+            return date.year, date
+        case year:
+            return int(year), None
+
+
+def iter_record_batches(
+    oers: Iterable[EducationalResourceDIF13], *, batch_size: int = 10_000
+) -> Iterable[pyarrow.RecordBatch]:
+    """Convert OERs to Arrow record batches.
+
+    :param oers: OERs, e.g., from :func:`dalia_dif.dif13.iter_dif13`. These are
+        consumed lazily.
+    :param batch_size: The maximum number of OERs in each batch
+
+    :yields: Record batches with the schema from :func:`get_arrow_schema`
+    """
+    import pyarrow as pa
+
+    schema = get_arrow_schema()
+    oers = iter(oers)
+    while batch := list(islice(oers, batch_size)):
+        columns: dict[str, list[Any]] = {name: [] for name in schema.names}
+        for oer in batch:
+            columns["uuid"].append(str(oer.uuid))
+            for name in STRING_FIELDS:
+                value = getattr(oer, name)
+                columns[name].append(None if value is None else str(value))
+            columns["authors"].append([_get_author(author) for author in oer.authors])
+            for name in LIST_FIELDS:
+                values = getattr(oer, name)
+                columns[name].append(None if values is None else [str(v) for v in values])
+            year, date = _get_publication_date(oer)
+            columns["publication_year"].append(year)
+            columns["publication_date"].append(date)
+            columns["related_works"].append(
+                [
+                    {"predicate": str(related_work.predicate), "object": str(related_work.object)}
+                    for related_work in oer.related_works
+                ]
+            )
+        yield pa.RecordBatch.from_pydict(columns, schema=schema)
+
+
+def write_dif13_parquet(
+    oers: Iterable[EducationalResourceDIF13],
+    path: str | Path,
+    *,
+    batch_size: int = 10_000,
+    compression: str = "zstd",
+) -> None:
+    """Write OERs to a Parquet file, one record batch at a time.
+
+    :param oers: OERs, e.g., from :func:`dalia_dif.dif13.iter_dif13`. These are
+        consumed lazily, so at most ``batch_size`` OERs are held in memory.
+    :param path: The path to the Parquet file
+    :param batch_size: The maximum number of OERs in each record batch, which is
+        also the size of each row group in the file
+    :param compression: The compression codec for the Parquet file
+    """
+    import pyarrow.parquet as pq
+
+    with pq.ParquetWriter(Path(path), get_arrow_schema(), compression=compression) as writer:
+        for batch in iter_record_batches(oers, batch_size=batch_size):
+            writer.write_batch(batch)
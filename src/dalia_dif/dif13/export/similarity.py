@@ -0,0 +1,241 @@
+"""Find related OERs ("more like this") using TF-IDF vectors.
+
+The titles, descriptions, and keywords of OERs are encoded as sparse TF-IDF vectors,
+and the nearest neighbors of each OER by cosine similarity are precomputed in batches,
+then stored in the same SQLite database as the full text index. This requires
+:mod:`numpy` and :mod:`scipy`, which can be installed with ``pip install
+dalia-dif[similarity]``. Looking up neighbors afterwards doesn't.
+
+.. code-block:: python
+
+    from dalia_dif.dif13 import iter_dif13
+    from dalia_dif.dif13.export.similarity import (
+        get_similar_resources,
+        write_similar_resources,
+    )
+
+    write_similar_resources(iter_dif13("curation.csv"), "index.db", k=10)
+    neighbors = get_similar_resources("0f5c9ab3-7a3e-4ab0-9b7c-2f0e4d7c9d51", "index.db")
+
+Neighbors aren't updated by :func:`dalia_dif.dif13.export.fti.upsert_sqlite_fti`, so
+they should be rebuilt when the catalog changes.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+import sqlite3
+from collections import defaultdict
+from collections.abc import Iterable
+from contextlib import closing
+from pathlib import Path
+from textwrap import dedent
+from typing import TYPE_CHECKING, NamedTuple
+
+from .fti import connect
+
+if TYPE_CHECKING:
+    import scipy.sparse
+
+    from ..model import EducationalResourceDIF13
+
+__all__ = [
+    "FIELD_WEIGHTS",
+    "Neighbor",
+    "build_tfidf_matrix",
+    "get_similar_resources",
+    "iter_neighbors",
+    "write_similar_resources",
+]
+
+#: How much each occurrence of a term counts, depending on the field it's in
+FIELD_WEIGHTS: dict[str, float] = {
+    "title": 2.0,
+    "description": 1.0,
+    "keywords": 1.0,
+}
+
+#: Words of at least two letters
+TOKEN_RE = re.compile(r"[^\W\d_]{2,}")
+
+
+class Neighbor(NamedTuple):
+    """A similar OER."""
+
+    uuid: str
+    #: The cosine similarity, between 0 and 1. Higher is more similar.
+    score: float
+
+
+def _get_term_counts(oer: EducationalResourceDIF13) -> defaultdict[str, float]:
+    rv: defaultdict[str, float] = defaultdict(float)
+    for field, text in [
+        ("title", oer.title),
+        ("description", oer.description or ""),
+        ("keywords", " ".join(oer.keywords)),
+    ]:
+        for token in TOKEN_RE.findall(text.casefold()):
+            rv[token] += FIELD_WEIGHTS[field]
+    return rv
+
+
+def build_tfidf_matrix(
+    oers: Iterable[EducationalResourceDIF13],
+) -> tuple[list[str], scipy.sparse.csr_matrix]:
+    """Build a sparse TF-IDF matrix with a row for each OER.
+
+    Term frequencies are sublinear (``1 + log(tf)``), inverse document
+    frequencies are smoothed, and rows are normalized to unit length, so the dot
+    product of two rows is their cosine similarity.
+
+    :param oers: OERs, e.g., from :func:`dalia_dif.dif13.iter_dif13`. If a UUID
+        appears more than once, the last one wins.
+
+    :returns: A list of UUIDs and a matrix whose rows correspond to them
+    """
+    import numpy as np
+    import scipy.sparse
+
+    counts = {str(oer.uuid): _get_term_counts(oer) for oer in oers}
+
+    vocabulary: dict[str, int] = {}
+    indptr = [0]
+    indices: list[int] = []
+    data: list[float] = []
+    for counter in counts.values():
+        for term, count in counter.items():
+            indices.append(vocabulary.setdefault(term, len(vocabulary)))
+            data.append(1.0 + math.log(count))
+        indptr.append(len(indices))
+
+    n_rows, n_columns = len(counts), len(vocabulary)
+    matrix = scipy.sparse.csr_matrix(
+        (np.array(data, dtype=np.float32), np.array(indices), np.array(indptr)),
+        shape=(n_rows, n_columns),
+    )
+    document_frequencies = np.bincount(matrix.indices, minlength=n_columns)
+    idf = np.log((1 + n_rows) / (1 + document_frequencies)) + 1
+    matrix = matrix @ scipy.sparse.diags(idf.astype(np.float32))
+
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    matrix = scipy.sparse.diags(1.0 / norms) @ matrix
+    return list(counts), scipy.sparse.csr_matrix(matrix, dtype=np.float32)
+
+
+def iter_neighbors(
+    uuids: list[str],
+    matrix: scipy.sparse.csr_matrix,
+    *,
+    k: int = 10,
+    batch_size: int = 256,
+    min_score: float = 0.0,
+) -> Iterable[tuple[str, list[Neighbor]]]:
+    """Find the nearest neighbors of each row in a TF-IDF matrix.
+
+    Similarities are calculated for a batch of rows at a time, so memory is bounded
+    by the batch size rather than growing with the square of the number of OERs.
+
+    :param uuids: The UUIDs corresponding to the rows of the matrix
+    :param matrix: A matrix from :func:`build_tfidf_matrix`
+    :param k: The maximum number of neighbors for each OER
+    :param batch_size: The number of rows to compare to all others at once
+    :param min_score: Only keep neighbors with a similarity above this
+
+    :yields: Pairs of UUIDs and their neighbors, most similar first
+    """
+    import numpy as np
+
+    transposed = matrix.T.tocsc()
+    for start in range(0, matrix.shape[0], batch_size):
+        similarities = (matrix[start : start + batch_size] @ transposed).tocsr()
+        for offset in range(similarities.shape[0]):
+            i = start + offset
+            row = slice(similarities.indptr[offset], similarities.indptr[offset + 1])
+            columns, scores = similarities.indices[row], similarities.data[row]
+            mask = (columns != i) & (scores > min_score)
+            columns, scores = columns[mask], scores[mask]
+            if len(scores) > k:
+                top = np.argpartition(-scores, k)[:k]
+                columns, scores = columns[top], scores[top]
+            # break ties by position, so results are deterministic
+            order = np.lexsort((columns, -scores))
+            yield (
+                uuids[i],
+                [
+                    Neighbor(uuids[j], min(float(score), 1.0))
+                    for j, score in zip(columns[order], scores[order], strict=True)
+                ],
+            )
+
+
+def write_similar_resources(
+    oers: Iterable[EducationalResourceDIF13],
+    db: str | Path | sqlite3.Connection,
+    *,
+    k: int = 10,
+    batch_size: int = 256,
+    min_score: float = 0.0,
+) -> int:
+    """Precompute similar OERs and store them in a SQLite database, replacing old ones.
+
+    :param oers: OERs, e.g., from :func:`dalia_dif.dif13.iter_dif13`
+    :param db: Either a path to a SQLite database file (e.g., the same one as the
+        full text index) or an already-established connection
+    :param k: The maximum number of neighbors for each OER
+    :param batch_size: The number of rows to compare to all others at once
+    :param min_score: Only keep neighbors with a similarity above this
+
+    :returns: The number of neighbor pairs that were written
+    """
+    uuids, matrix = build_tfidf_matrix(oers)
+    n = 0
+    with connect(db) as conn, conn, closing(conn.cursor()) as cursor:
+        # begin explicitly so old neighbors are only replaced if the whole build succeeds
+        cursor.execute("BEGIN")
+        cursor.execute("DROP TABLE IF EXISTS neighbors")
+        cursor.execute(
+            dedent("""\
+                CREATE TABLE neighbors (
+                    uuid TEXT NOT NULL,
+                    rank INTEGER NOT NULL,
+                    neighbor TEXT NOT NULL,
+                    score REAL NOT NULL,
+                    PRIMARY KEY (uuid, rank)
+                ) WITHOUT ROWID
+            """)
+        )
+        for uuid, neighbors in iter_neighbors(
+            uuids, matrix, k=k, batch_size=batch_size, min_score=min_score
+        ):
+            cursor.executemany(
+                "INSERT INTO neighbors VALUES (?, ?, ?, ?)",
+                (
+                    (uuid, rank, neighbor.uuid, neighbor.score)
+                    for rank, neighbor in enumerate(neighbors)
+                ),
+            )
+            n += len(neighbors)
+    return n
+
+
+def get_similar_resources(
+    uuid: str, db: str | Path | sqlite3.Connection, *, limit: int | None = None
+) -> list[Neighbor]:
+    """Get OERs similar to the given one, precomputed with :func:`write_similar_resources`.
+
+    :param uuid: The UUID of an OER
+    :param db: Either a path to a SQLite database file or an already-established
+        connection
+    :param limit: The maximum number of neighbors to return. If none, returns all
+        that were precomputed.
+
+    :returns: Similar OERs, most similar first
+    """
+    with connect(db) as conn, closing(conn.cursor()) as cursor:
+        rows = cursor.execute(
+            "SELECT neighbor, score FROM neighbors WHERE uuid = ? ORDER BY rank LIMIT ?",
+            (str(uuid), -1 if limit is None else limit),
+        ).fetchall()
+    return [Neighbor(*row) for row in rows]
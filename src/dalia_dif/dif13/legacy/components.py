@@ -6,7 +6,7 @@ from pathlib import Path
 import click
 from rdflib import XSD, Graph, Literal, Node, URIRef
 
-from ..community import COMMUNITIES_PATH, LOOKUP_DICT_COMMUNITIES, MISSING_COMMUNITIES
+from ..community import COMMUNITIES_PATH, MISSING_COMMUNITIES, get_lookup_dict_communities
 from ..constants import DIF_SEPARATOR
 from ..picklists import (
     COMMUNITY_RELATIONS,
@@ -334,7 +334,7 @@ def add_communities_to_lr(
         name = match.group("name").strip()
         relation = match.group("relation")
 
-        community_id = LOOKUP_DICT_COMMUNITIES.get(name, None)
+        community_id = get_lookup_dict_communities().get(name, None)
         if not community_id:
             if not MISSING_COMMUNITIES[name]:
                 msg = f'unknown community "{name}".\n\tSuggestion: add to {COMMUNITIES_PATH.name}'
@@ -3,10 +3,16 @@
 from __future__ import annotations
 
 import datetime
-from typing import Annotated, ClassVar
+import hashlib
+import uuid as _uuid
+from collections.abc import Callable, Generator, Iterable, Mapping
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Annotated, Any, ClassVar, TypeVar
 
 import rdflib
-from pydantic import UUID4, Field
+from pydantic import UUID4, BaseModel, Field
 from pydantic_extra_types.language_code import ISO639_3
 from pydantic_metamodel.api import (
     Addable,
@@ -62,8 +68,22 @@ __all__ = [
     "AuthorDIF13",
     "EducationalResourceDIF13",
     "OrganizationDIF13",
+    "deterministic_nodes",
 ]
 
+M = TypeVar("M", bound=BaseModel)
+
+
+#: The node to use for the next author or organization added to a graph, if not random
+_AGENT_NODE: ContextVar[Node | None] = ContextVar("agent_node", default=None)
+
+
+def _get_agent_node() -> Node:
+    node = _AGENT_NODE.get()
+    if node is None:
+        return BNode()
+    return node
+
 
 class AuthorDIF13(RDFInstanceBaseModel):
     """Represents an author in DIF v1.3."""
@@ -81,7 +101,7 @@ class AuthorDIF13(RDFInstanceBaseModel):
 
     def get_node(self) -> Node:
         """Get a blank node for the author."""
-        return BNode()
+        return _get_agent_node()
 
 
 class OrganizationDIF13(RDFInstanceBaseModel):
@@ -97,7 +117,42 @@ class OrganizationDIF13(RDFInstanceBaseModel):
 
     def get_node(self) -> Node:
         """Get a blank node for the organization."""
-        return BNode()
+        return _get_agent_node()
+
+
+#: Whether blank nodes for authors and their list should be derived from their content
+_DETERMINISTIC: ContextVar[bool] = ContextVar("deterministic", default=False)
+
+
+@contextmanager
+def deterministic_nodes() -> Generator[None, None, None]:
+    """Derive stable blank node labels for authors while adding resources to graphs.
+
+    By default, each export mints random blank nodes, and each author gets two
+    separate (but identical) subgraphs, one for the ordered author list and one for
+    the ``authorUnordered`` predicate. Inside this context, each author of a resource
+    gets a single blank node, labeled with a hash of the resource's URI and the
+    author's fields, that's used for both. This roughly halves the number of author
+    triples and makes the output the same on every run, so exports can be diffed and
+    cached.
+
+    .. code-block:: python
+
+        from dalia_dif.dif13 import read_dif13
+        from dalia_dif.dif13.model import deterministic_nodes
+
+        with deterministic_nodes():
+            graph = read_dif13("curation.csv")[0].get_graph()
+    """
+    token = _DETERMINISTIC.set(True)
+    try:
+        yield
+    finally:
+        _DETERMINISTIC.reset(token)
+
+
+def _get_label(*parts: str) -> str:
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()[:32]
 
 
 class AuthorAnnotation(PredicateAnnotation):
@@ -108,6 +163,10 @@ class AuthorAnnotation(PredicateAnnotation):
         if not isinstance(value, list):
             raise TypeError
 
+        if _DETERMINISTIC.get():
+            self._add_deterministic(graph, node, value)  # type:ignore[arg-type]
+            return
+
         # the type ignores are fine because we know we're an AddableBase
         author_nodes = [self._handle_object(graph, s) for s in value]  # type:ignore[arg-type]
         if authors_list := create_rdf_collection(graph, author_nodes):
@@ -119,6 +178,26 @@ class AuthorAnnotation(PredicateAnnotation):
         for author in author_nodes:
             graph.add((node, AUTHOR_UNORDERED_PREDICATE, author))
 
+    def _add_deterministic(
+        self, graph: rdflib.Graph, node: Node, value: list[AuthorDIF13 | OrganizationDIF13]
+    ) -> None:
+        author_nodes: list[Node] = []
+        for author in value:
+            # the node is swapped in through get_node(), so authors are still
+            # serialized by pydantic-metamodel, the same as the default mode
+            token = _AGENT_NODE.set(BNode(_get_label(str(node), author.model_dump_json())))
+            try:
+                author_nodes.append(self._handle_object(graph, author))
+            finally:
+                _AGENT_NODE.reset(token)
+
+        if authors_list := create_rdf_collection(
+            graph, author_nodes, prefix=_get_label(str(node), "authors")
+        ):
+            graph.add((node, AUTHOR_PREDICATE, authors_list))
+        for author_node in author_nodes:
+            graph.add((node, AUTHOR_UNORDERED_PREDICATE, author_node))
+
 
 class EducationalResourceDIF13(RDFInstanceBaseModel):
     """Represents an educational resource in DIF v1.3."""
@@ -183,3 +262,143 @@ class EducationalResourceDIF13(RDFInstanceBaseModel):
     def get_node(self) -> URIRef:
         """Get the learning resource URI."""
         return DALIA_OER[str(self.uuid)]
+
+    def get_digest(self) -> str:
+        """Get a SHA-256 digest of the resource's content, e.g., to detect changes.
+
+        The digest is taken over the canonical JSON serialization, which leaves out
+        empty fields, so it only changes when the data does, and it's the same whether
+        the resource was read from CSV, from JSON lines, or constructed directly.
+        """
+        data = self.model_dump_json(exclude_none=True, exclude_defaults=True)
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+    @classmethod
+    def from_trusted(cls, data: Mapping[str, Any]) -> EducationalResourceDIF13:
+        """Construct a resource from pre-validated data, skipping validation.
+
+        This is for data that's already known to be valid, e.g., JSON lines that were
+        written by :func:`dalia_dif.dif13.write_dif13_jsonl`. Values are only
+        converted to the types validation would produce, then passed to
+        :meth:`pydantic.BaseModel.model_construct`, so the result is equal to
+        ``EducationalResourceDIF13.model_validate(data)`` for valid data, but invalid
+        data isn't caught and can lead to errors later. Since validation happens in
+        :mod:`pydantic_core`, this isn't necessarily faster, which can be checked
+        with the benchmark in ``tests/test_dif13/test_trusted.py``.
+
+        :param data: A dictionary of field values, either as Python objects or as
+            JSON-compatible values from ``model_dump(mode="json")``
+
+        :returns: A resource
+        """
+        return _construct(
+            cls,
+            {
+                key: value
+                if value is None or (f := _TRUSTED_CONVERTERS.get(key)) is None
+                else f(value)
+                for key, value in data.items()
+            },
+        )
+
+
+def _construct(cls: type[M], values: dict[str, Any]) -> M:
+    """Construct a model with :meth:`pydantic.BaseModel.model_construct`, filling in defaults.
+
+    :meth:`pydantic.BaseModel.model_construct` inspects the signature of each default
+    factory on every call, so missing fields are filled in first. Only the given
+    fields are marked as set, like when calling it directly.
+    """
+    fields = {}
+    for name, default, factory in _get_defaults(cls):
+        if name in values:
+            fields[name] = values[name]
+        elif factory is not None:
+            fields[name] = factory()
+        else:
+            fields[name] = default
+    return cls.model_construct(_fields_set=set(values), **fields)
+
+
+@lru_cache
+def _get_defaults(cls: type[BaseModel]) -> list[tuple[str, Any, Callable[[], Any] | None]]:
+    """Get the name, default, and default factory for each field of a model."""
+    return [
+        (name, field.default, field.default_factory)  # type:ignore[misc]
+        for name, field in cls.model_fields.items()
+    ]
+
+
+def _to_uriref(value: str) -> URIRef:
+    return value if type(value) is URIRef else URIRef(value)
+
+
+def _to_urirefs(values: Iterable[str]) -> list[URIRef]:
+    return [_to_uriref(value) for value in values]
+
+
+def _to_term(value: str) -> URIRef:
+    return value if type(value) is URIRef else _get_term(value)
+
+
+@lru_cache(maxsize=4096)
+def _get_term(value: str) -> URIRef:
+    """Get a URI from a controlled vocabulary, which are shared between resources."""
+    return URIRef(value)
+
+
+def _to_terms(values: Iterable[str]) -> list[URIRef]:
+    return [_to_term(value) for value in values]
+
+
+def _to_uuid(value: str | _uuid.UUID) -> _uuid.UUID:
+    return value if isinstance(value, _uuid.UUID) else _uuid.UUID(value)
+
+
+def _to_author(value: Any) -> AuthorDIF13 | OrganizationDIF13:
+    if isinstance(value, AuthorDIF13 | OrganizationDIF13):
+        return value
+    if "family_name" in value:
+        return _construct(AuthorDIF13, value)
+    return _construct(OrganizationDIF13, value)
+
+
+def _to_publication_date(value: Any) -> Year | datetime.date | datetime.datetime:
+    if isinstance(value, Year | datetime.date):
+        return value
+    if isinstance(value, int) or value.isdigit():
+        return Year(value)
+    if "T" in value or " " in value:
+        return datetime.datetime.fromisoformat(value)
+    return datetime.date.fromisoformat(value)
+
+
+def _to_related_work(value: Any) -> PredicateObject[RDFResource]:
+    if isinstance(value, PredicateObject):
+        predicate, obj = value.predicate, value.object
+    else:
+        predicate, obj = value["predicate"], value["object"]
+    return _construct(
+        PredicateObject[RDFResource], {"predicate": _to_term(predicate), "object": _to_uriref(obj)}
+    )
+
+
+#: Functions that convert pre-validated values of each field to the types validation
+#: would produce. Fields that aren't listed are already the right type.
+_TRUSTED_CONVERTERS: dict[str, Callable[[Any], Any]] = {
+    "uuid": _to_uuid,
+    "authors": lambda values: [_to_author(value) for value in values],
+    "license": _to_term,
+    "links": _to_urirefs,
+    "supporting_communities": _to_terms,
+    "recommending_communities": _to_terms,
+    "disciplines": _to_terms,
+    "xrefs": _to_urirefs,
+    "languages": lambda values: [ISO639_3(value) for value in values],
+    "learning_resource_types": _to_terms,
+    "media_types": _to_terms,
+    "proficiency_levels": _to_terms,
+    "publication_date": _to_publication_date,
+    "target_groups": _to_terms,
+    "related_works": lambda values: [_to_related_work(value) for value in values],
+}
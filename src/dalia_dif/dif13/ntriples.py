@@ -0,0 +1,240 @@
+"""Streaming N-Triples and N-Quads serialization for DIF v1.3.
+
+Serializing with :mod:`rdflib` requires first merging all resources into a single
+:class:`rdflib.Graph`, so time and memory are dominated by the triple store. The
+writer in this module instead writes the triples for each resource directly to a file
+handle while iterating, so memory stays constant with respect to the number of
+resources.
+
+.. code-block:: python
+
+    from dalia_dif.dif13 import iter_dif13
+    from dalia_dif.dif13.ntriples import write_dif13_ntriples
+
+    with open("catalog.nt", "w") as file:
+        write_dif13_ntriples(iter_dif13("curation.csv"), file)
+
+The order of the triples in the output follows the order of the resources, and the
+labels of blank nodes change on every run. For a canonical export, where unchanged
+data gives byte-identical output (e.g., for committing nightly exports to git), use
+:func:`write_dif13_ntriples_sorted` instead. It writes sorted, de-duplicated lines
+using an external merge sort, so memory is bounded by the chunk size rather than the
+size of the catalog.
+"""
+
+from __future__ import annotations
+
+import heapq
+import logging
+import re
+import tempfile
+from collections.abc import Iterable, Iterator
+from contextlib import ExitStack, nullcontext
+from pathlib import Path
+from typing import TYPE_CHECKING, TextIO
+from urllib.parse import quote
+
+import rdflib
+from rdflib import BNode, Node, URIRef
+
+from .model import deterministic_nodes
+
+if TYPE_CHECKING:
+    from .model import EducationalResourceDIF13
+
+__all__ = [
+    "STREAMING_FORMATS",
+    "NTriplesSink",
+    "format_nt_line",
+    "write_dif13_ntriples",
+    "write_dif13_ntriples_sorted",
+]
+
+logger = logging.getLogger(__name__)
+
+#: Formats that can be streamed, mapped to whether they're quads
+STREAMING_FORMATS: dict[str, bool] = {
+    "nt": False,
+    "nt11": False,
+    "ntriples": False,
+    "nquads": True,
+    "nq": True,
+}
+
+
+class NTriplesSink:
+    """A stand-in for :class:`rdflib.Graph` that writes triples as lines of N-Triples.
+
+    Only :meth:`add` is implemented, which is all that's needed by
+    :meth:`pydantic_metamodel.api.RDFBaseModel.add_to_graph`. Lines are buffered
+    until :meth:`flush` is called so duplicate triples within a single resource
+    are only written once, like they would be in a graph.
+    """
+
+    def __init__(self, file: TextIO, *, graph_name: URIRef | None = None) -> None:
+        """Initialize the sink.
+
+        :param file: The file handle to write to
+        :param graph_name: If given, writes N-Quads with this graph name
+        """
+        self.file = file
+        self.graph_name = graph_name
+        self._lines: dict[str, None] = {}
+
+    def add(self, triple: tuple[Node, Node, Node]) -> None:
+        """Buffer a triple."""
+        self._lines[format_nt_line(triple, self.graph_name)] = None
+
+    def flush(self) -> int:
+        """Write buffered lines to the file and return how many were written."""
+        n = len(self._lines)
+        self.file.writelines(self._lines)
+        self._lines.clear()
+        return n
+
+
+def write_dif13_ntriples(
+    oers: Iterable[EducationalResourceDIF13],
+    file: TextIO,
+    *,
+    quads: bool = False,
+    graph_name: URIRef | None = None,
+    deterministic: bool = False,
+) -> int:
+    """Stream OERs to a file handle as N-Triples or N-Quads.
+
+    :param oers: An iterable of OERs, e.g., from :func:`dalia_dif.dif13.iter_dif13`
+    :param file: The file handle to write to
+    :param quads: Should N-Quads be written? If so, and no graph name is given, each
+        OER's triples are put in a named graph with the same IRI as the OER.
+    :param graph_name: The graph name to use for all quads. Implies ``quads``.
+    :param deterministic: Should stable blank node labels be used for authors? See
+        :func:`dalia_dif.dif13.model.deterministic_nodes`.
+    :returns: The number of lines written
+    """
+    if graph_name is not None:
+        quads = True
+    sink = NTriplesSink(file, graph_name=graph_name)
+    n = 0
+    with deterministic_nodes() if deterministic else nullcontext():
+        for oer in oers:
+            if quads and graph_name is None:
+                sink.graph_name = oer.get_node()
+            # the sink implements the subset of the graph API used by pydantic-metamodel
+            oer.add_to_graph(sink)  # type:ignore[arg-type]
+            n += sink.flush()
+    return n
+
+
+def write_dif13_ntriples_sorted(
+    oers: Iterable[EducationalResourceDIF13],
+    file: TextIO,
+    *,
+    chunk_size: int = 1_000_000,
+) -> int:
+    """Write OERs to a file handle as sorted, de-duplicated N-Triples.
+
+    Lines are collected in chunks of at most ``chunk_size`` unique lines. Each full
+    chunk is sorted and spilled to a temporary file, then the chunks are merged with
+    :func:`heapq.merge` while dropping duplicates. Authors get stable blank node
+    labels (see :func:`dalia_dif.dif13.model.deterministic_nodes`), so unchanged data
+    always gives byte-identical output.
+
+    :param oers: An iterable of OERs, e.g., from :func:`dalia_dif.dif13.iter_dif13`
+    :param file: The file handle to write to
+    :param chunk_size: The maximum number of lines to hold in memory at once
+    :returns: The number of lines written
+    """
+    sink = _LineSink()
+    with tempfile.TemporaryDirectory() as directory, ExitStack() as stack:
+        chunks: list[Path] = []
+        with deterministic_nodes():
+            for oer in oers:
+                # the sink implements the subset of the graph API used by pydantic-metamodel
+                oer.add_to_graph(sink)  # type:ignore[arg-type]
+                if len(sink.lines) >= chunk_size:
+                    chunks.append(_spill(sink.lines, Path(directory), len(chunks)))
+
+        if not chunks:
+            lines: Iterator[str] = iter(sorted(sink.lines))
+        else:
+            if sink.lines:
+                chunks.append(_spill(sink.lines, Path(directory), len(chunks)))
+            # UTF-8 preserves code point order, so text read back from the
+            # chunks merges in the same order as it was sorted
+            lines = heapq.merge(
+                *(stack.enter_context(path.open(encoding="utf-8", newline="")) for path in chunks)
+            )
+
+        n = 0
+        previous = None
+        for line in lines:
+            if line != previous:
+                file.write(line)
+                previous = line
+                n += 1
+    return n
+
+
+class _LineSink:
+    """A stand-in for :class:`rdflib.Graph` that collects unique lines of N-Triples."""
+
+    def __init__(self) -> None:
+        self.lines: set[str] = set()
+
+    def add(self, triple: tuple[Node, Node, Node]) -> None:
+        self.lines.add(format_nt_line(triple))
+
+
+def _spill(lines: set[str], directory: Path, index: int) -> Path:
+    """Write sorted lines to a temporary file and clear them."""
+    path = directory.joinpath(f"chunk-{index}.nt")
+    with path.open("w", encoding="utf-8", newline="") as file:
+        file.writelines(sorted(lines))
+    lines.clear()
+    return path
+
+
+def format_nt_line(triple: tuple[Node, Node, Node], graph_name: Node | None = None) -> str:
+    """Format a triple (or quad, if a graph name is given) as a line of N-Triples/N-Quads."""
+    s, p, o = triple
+    if graph_name is None:
+        return f"{_format_term(s)} {_format_term(p)} {_format_term(o)} .\n"
+    return f"{_format_term(s)} {_format_term(p)} {_format_term(o)} {_format_term(graph_name)} .\n"
+
+
+#: Characters that aren't allowed in IRIs in N-Triples
+_ILLEGAL_IRI_RE = re.compile(r'[\x00-\x20<>"{}|^`\\]')
+
+
+def _format_term(node: Node) -> str:
+    if isinstance(node, URIRef):
+        return _format_iri(node)
+    if isinstance(node, BNode):
+        return node.n3()
+    if isinstance(node, rdflib.Literal):
+        value = (
+            str(node)
+            .replace("\\", "\\\\")
+            .replace("\n", "\\n")
+            .replace('"', '\\"')
+            .replace("\r", "\\r")
+        )
+        if node.language:
+            return f'"{value}"@{node.language}'
+        if node.datatype:
+            return f'"{value}"^^{_format_iri(node.datatype)}'
+        return f'"{value}"'
+    raise TypeError(f"can not serialize node to N-Triples: {node!r}")
+
+
+def _format_iri(iri: str) -> str:
+    """Format an IRI, percent-encoding characters that would make the line invalid.
+
+    These can come from free text, e.g., a link with a space or a keyword that was
+    expanded as a CURIE.
+    """
+    if _ILLEGAL_IRI_RE.search(iri):
+        logger.warning("percent-encoding illegal characters in IRI: %r", iri)
+        iri = _ILLEGAL_IRI_RE.sub(lambda match: quote(match.group(), safe=""), iri)
+    return f"<{iri}>"
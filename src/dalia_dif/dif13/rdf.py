@@ -1,41 +1,86 @@
-"""RDF utilities for DIF v1.3."""
+"""RDF utilities for DIF v1.3.
+
+Looking up terms in the controlled vocabularies (HSFS, SPDX, Lexvo, and HCRT) is done
+against compact lookup tables that are compiled once from each vocabulary at its pinned
+version and stored as JSON with :mod:`pystow`. This avoids parsing the (sometimes very
+large) RDF graphs and running a SPARQL query for every term. The lookup tables can be
+built ahead of time with :func:`build_vocabulary_indexes` or ``dalia_dif vocabularies``.
+
+The same approach is used for enriching graphs with :func:`add_background_triples`.
+Merging in the full vocabularies adds far more triples than the resources themselves
+(mostly from Lexvo), so with ``selective=True``, only the label and hierarchy triples
+for terms that are referenced in the graph are added, looked up in a per-term index of
+each vocabulary.
+"""
 
 from __future__ import annotations
 
+import json
+import os
+from collections.abc import Callable, Iterable, Sequence
 from functools import lru_cache
+from typing import Any
 
 import pystow
 import rdflib
-from rdflib import SDO, SKOS, XSD, Literal, URIRef
-from rdflib.plugins.sparql import prepareQuery
+from rdflib import RDF, RDFS, SDO, SKOS, Literal, URIRef
+from rdflib.util import from_n3
 from tqdm import tqdm
 
+from ..namespace import LEXVO, SPDX_TERM
+
 __all__ = [
     "add_background_triples",
+    "build_vocabulary_indexes",
     "check_discipline_exists",
     "check_resource_type_exists",
+    "get_background_indexes",
+    "get_discipline_background_index",
     "get_discipline_graph",
+    "get_discipline_index",
     "get_discipline_label",
+    "get_language_background_index",
     "get_language_graph",
+    "get_language_index",
     "get_language_uriref",
+    "get_license_background_index",
+    "get_license_index",
     "get_license_uriref",
     "get_licenses_graph",
     "get_modalia_graph",
+    "get_resource_type_background_index",
     "get_resource_type_graph",
+    "get_resource_type_index",
 ]
 
+
+def _ensure_index(name: str, url: str, build: Callable[[], Any]) -> Any:
+    """Load a vocabulary lookup table, compiling and caching it first if necessary.
+
+    :param name: The name of the index, used for the file name
+    :param url: The (pinned) URL of the source vocabulary. If this doesn't
+        match the URL the cached index was compiled from, the index is rebuilt.
+    :param build: A function that compiles the index into a JSON-serializable object
+    :returns: The index
+    """
+    path = pystow.join("dalia", "indexes", name=f"{name}.json")
+    try:
+        index = json.loads(path.read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        # a corrupt file, e.g., from an interrupted run, is rebuilt
+        pass
+    else:
+        if isinstance(index, dict) and index.get("source") == url and "data" in index:
+            return index["data"]
+    data = build()
+    # write then rename so concurrent readers never see a partial file
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp_path.write_text(json.dumps({"source": url, "data": data}, ensure_ascii=False))
+    os.replace(tmp_path, path)
+    return data
+
+
 HOCHSCHULFAECHERSYSTEMATIK_TTL = "https://github.com/dini-ag-kim/hochschulfaechersystematik/raw/refs/tags/v2024-02-08/hochschulfaechersystematik.ttl"
-HFS_EXISTS_QUERY = prepareQuery("""\
-    PREFIX skos: <http://www.w3.org/2004/02/skos/core#>
-    ASK { ?discipline a skos:Concept . }
-""")
-HFS_LABEL_QUERY = prepareQuery("""\
-    PREFIX skos: <http://www.w3.org/2004/02/skos/core#>
-    SELECT ?label {
-        ?discipline skos:prefLabel ?label .
-        FILTER(LANG(?label) = 'en') .
-    }
-""")
 
 
 @lru_cache(1)
@@ -53,44 +98,48 @@ def _rewire_predicate(graph: rdflib.Graph, old: URIRef, new: URIRef) -> None:
         graph.add((s, new, o))
 
 
-@lru_cache
+def _build_discipline_index(graph: rdflib.Graph) -> dict[str, str | None]:
+    """Build a mapping from HSFS concept URIs to their English labels."""
+    rv: dict[str, str | None] = {
+        str(concept): None
+        for concept in graph.subjects(RDF.type, SKOS.Concept)
+        if isinstance(concept, URIRef)
+    }
+    for concept, label in graph.subject_objects(SKOS.prefLabel):
+        if str(concept) in rv and isinstance(label, Literal) and label.language == "en":
+            rv[str(concept)] = str(label)
+    return rv
+
+
+@lru_cache(1)
+def get_discipline_index() -> dict[str, str | None]:
+    """Get a mapping from HSFS discipline URIs to their English labels."""
+    return _ensure_index(  # type:ignore[no-any-return]
+        "hochschulfaechersystematik", HOCHSCHULFAECHERSYSTEMATIK_TTL, _compile_discipline_index
+    )
+
+
+def _compile_discipline_index() -> dict[str, str | None]:
+    return _build_discipline_index(get_discipline_graph())
+
+
 def check_discipline_exists(discipline_uriref: URIRef) -> bool:
     """Check if the discipline exists."""
-    result = get_discipline_graph().query(
-        HFS_EXISTS_QUERY,
-        initBindings={"discipline": discipline_uriref},
-    )
-    if result.askAnswer is None:
-        raise RuntimeError
-    return result.askAnswer
+    return str(discipline_uriref) in get_discipline_index()
 
 
 def get_discipline_label(discipline_uriref: URIRef) -> str | None:
     """Get the discipline label."""
-    result = get_discipline_graph().query(
-        HFS_LABEL_QUERY,
-        initBindings={"discipline": discipline_uriref},
-    )
-    rows = list(result)
-    if rows:
-        return str(rows[0][0])  # type:ignore[index]
-    else:
+    label = get_discipline_index().get(str(discipline_uriref))
+    if label is None:
         tqdm.write(f"unable to look up name for ({type(discipline_uriref)}) {discipline_uriref}")
-        return None
+    return label
 
 
 LICENSES_TTL = (
     "https://github.com/spdx/license-list-data/raw/refs/tags/v3.25.0/rdfturtle/licenses.ttl"
 )
 
-GET_LICENSE_URI_FROM_SPDX_QUERY = prepareQuery(
-    """\
-    SELECT ?license
-    WHERE { ?license spdx:licenseId ?identifier }
-    """,
-    initNs={"spdx": "http://spdx.org/rdf/terms#"},
-)
-
 
 @lru_cache(1)
 def get_licenses_graph() -> rdflib.Graph:
@@ -100,29 +149,42 @@ def get_licenses_graph() -> rdflib.Graph:
     return graph
 
 
-@lru_cache
-def get_license_uriref(identifier: str) -> URIRef | None:
-    """Get the reference for a license."""
-    results = get_licenses_graph().query(
-        GET_LICENSE_URI_FROM_SPDX_QUERY, initBindings={"identifier": Literal(identifier)}
+def _build_license_index(graph: rdflib.Graph) -> dict[str, str]:
+    """Build a mapping from SPDX license identifiers to license URIs."""
+    rv: dict[str, str] = {}
+    for license_uri, identifier in graph.subject_objects(SPDX_TERM.licenseId):
+        rv.setdefault(str(identifier), str(license_uri))
+    return rv
+
+
+@lru_cache(1)
+def get_license_index() -> dict[str, str]:
+    """Get a mapping from SPDX license identifiers to license URIs."""
+    return _ensure_index(  # type:ignore[no-any-return]
+        "spdx-licenses", LICENSES_TTL, _compile_license_index
     )
 
-    if not results:
-        return None
 
-    first_result = next(results.__iter__())
-    return first_result.license  # type:ignore[union-attr,return-value]
+def _compile_license_index() -> dict[str, str]:
+    return _build_license_index(get_licenses_graph())
 
 
-LEXVO_RDF = "http://www.lexvo.org/resources/lexvo_2013-02-09.rdf.gz"
-LANGUAGE_URI_QUERY = prepareQuery("""
-    PREFIX lexvo: <http://lexvo.org/ontology#>
+def get_license_uriref(identifier: str) -> URIRef | None:
+    """Get the reference for a license."""
+    uri = get_license_index().get(identifier)
+    if uri is None:
+        return None
+    return URIRef(uri)
 
-    SELECT ?language_uri
-    WHERE {
-        ?language_uri lexvo:iso6392BCode|lexvo:iso6392TCode|lexvo:iso639P1Code|lexvo:iso639P3PCode ?language .
-    }
-""")  # noqa:E501
+
+LEXVO_RDF = "http://www.lexvo.org/resources/lexvo_2013-02-09.rdf.gz"
+#: Predicates in Lexvo that connect a language to one of its codes
+LANGUAGE_CODE_PREDICATES = [
+    LEXVO.iso6392BCode,
+    LEXVO.iso6392TCode,
+    LEXVO.iso639P1Code,
+    LEXVO.iso639P3PCode,
+]
 
 
 @lru_cache(1)
@@ -134,25 +196,36 @@ def get_language_graph() -> rdflib.Graph:
     return graph
 
 
-@lru_cache
-def get_language_uriref(language: str) -> URIRef | None:
-    """Get a URI ref based on a language."""
-    results = get_language_graph().query(
-        LANGUAGE_URI_QUERY, initBindings={"language": Literal(language, datatype=XSD.string)}
+def _build_language_index(graph: rdflib.Graph) -> dict[str, str]:
+    """Build a mapping from ISO 639 codes to Lexvo language URIs."""
+    rv: dict[str, str] = {}
+    for predicate in LANGUAGE_CODE_PREDICATES:
+        for language_uri, code in graph.subject_objects(predicate):
+            rv.setdefault(str(code), str(language_uri))
+    return rv
+
+
+@lru_cache(1)
+def get_language_index() -> dict[str, str]:
+    """Get a mapping from ISO 639 codes to Lexvo language URIs."""
+    return _ensure_index(  # type:ignore[no-any-return]
+        "lexvo", LEXVO_RDF, _compile_language_index
     )
 
-    if not results:
-        return None
 
-    first_result = next(results.__iter__())
-    return first_result.language_uri  # type:ignore[union-attr,return-value]
+def _compile_language_index() -> dict[str, str]:
+    return _build_language_index(get_language_graph())
+
+
+def get_language_uriref(language: str) -> URIRef | None:
+    """Get a URI ref based on a language."""
+    uri = get_language_index().get(language)
+    if uri is None:
+        return None
+    return URIRef(uri)
 
 
 HCRT_TTL = "https://raw.githubusercontent.com/dini-ag-kim/hcrt/3fa0effce8b07ece585c1564f047cea18eec4cad/hcrt.ttl"
-HCRT_TERM_EXISTS_QUERY = prepareQuery("""\
-    PREFIX skos: <http://www.w3.org/2004/02/skos/core#>
-    ASK { ?term a skos:Concept . }
-""")
 
 
 @lru_cache(1)
@@ -164,15 +237,145 @@ def get_resource_type_graph() -> rdflib.Graph:
     return pystow.ensure_rdf("dalia", url=HCRT_TTL)
 
 
-@lru_cache
+def _build_resource_type_index(graph: rdflib.Graph) -> list[str]:
+    """Build a sorted list of the HCRT concept URIs."""
+    return sorted(
+        str(term) for term in graph.subjects(RDF.type, SKOS.Concept) if isinstance(term, URIRef)
+    )
+
+
+@lru_cache(1)
+def get_resource_type_index() -> frozenset[str]:
+    """Get the set of learning resource type URIs in DINI-KIM's HCRT resource."""
+    return frozenset(_ensure_index("hcrt", HCRT_TTL, _compile_resource_type_index))
+
+
+def _compile_resource_type_index() -> list[str]:
+    return _build_resource_type_index(get_resource_type_graph())
+
+
 def check_resource_type_exists(hcrt_term: URIRef) -> bool:
     """Check if the resource type exists in DINI-KIM's HCRT resource."""
-    result = get_resource_type_graph().query(
-        HCRT_TERM_EXISTS_QUERY, initBindings={"term": hcrt_term}
+    return str(hcrt_term) in get_resource_type_index()
+
+
+#: Predicates whose triples are kept in the background indexes. These are the
+#: labels and hierarchy of each term, which are needed for display and faceting.
+BACKGROUND_PREDICATES = [
+    RDF.type,
+    RDFS.label,
+    RDFS.subClassOf,
+    SKOS.prefLabel,
+    SKOS.altLabel,
+    SKOS.broader,
+    SPDX_TERM.name,
+]
+#: Predicates whose objects are also enriched, so the full hierarchy above a
+#: referenced term is included
+HIERARCHY_PREDICATES = [RDFS.subClassOf, SKOS.broader]
+_HIERARCHY_PREDICATES = frozenset(str(predicate) for predicate in HIERARCHY_PREDICATES)
+
+#: A mapping from terms to pairs of predicates and objects (in N3 syntax)
+BackgroundIndex = dict[str, list[tuple[str, str]]]
+
+
+def _build_background_index(
+    graph: rdflib.Graph, subjects: Iterable[str] | None = None
+) -> BackgroundIndex:
+    """Build a mapping from terms to their label and hierarchy triples.
+
+    :param graph: A vocabulary
+    :param subjects: If given, only these terms are indexed. Otherwise, all terms
+        with at least one of the :data:`BACKGROUND_PREDICATES` are indexed.
+    :returns: A mapping from term URIs to pairs of predicate URIs and objects, where
+        objects are serialized in N3 syntax so literals keep their language and datatype
+    """
+    keep = None if subjects is None else set(subjects)
+    rv: BackgroundIndex = {}
+    for predicate in BACKGROUND_PREDICATES:
+        for subject, obj in graph.subject_objects(predicate):
+            if not isinstance(subject, URIRef) or not isinstance(obj, URIRef | Literal):
+                continue
+            if keep is not None and str(subject) not in keep:
+                continue
+            rv.setdefault(str(subject), []).append((str(predicate), obj.n3()))
+    return rv
+
+
+@lru_cache(1)
+def get_discipline_background_index() -> BackgroundIndex:
+    """Get the label and hierarchy triples for each discipline in HSFS."""
+    return _ensure_index(  # type:ignore[no-any-return]
+        "hochschulfaechersystematik-background",
+        HOCHSCHULFAECHERSYSTEMATIK_TTL,
+        lambda: _build_background_index(get_discipline_graph()),
     )
-    if result.askAnswer is None:
-        raise RuntimeError
-    return result.askAnswer
+
+
+@lru_cache(1)
+def get_license_background_index() -> BackgroundIndex:
+    """Get the label triples for each license in SPDX."""
+    return _ensure_index(  # type:ignore[no-any-return]
+        "spdx-licenses-background",
+        LICENSES_TTL,
+        lambda: _build_background_index(get_licenses_graph(), get_license_index().values()),
+    )
+
+
+@lru_cache(1)
+def get_language_background_index() -> BackgroundIndex:
+    """Get the label triples for each language in Lexvo.
+
+    Lexvo also describes scripts, regions, and words, so only languages are indexed.
+    """
+    return _ensure_index(  # type:ignore[no-any-return]
+        "lexvo-background",
+        LEXVO_RDF,
+        lambda: _build_background_index(get_language_graph(), get_language_index().values()),
+    )
+
+
+@lru_cache(1)
+def get_resource_type_background_index() -> BackgroundIndex:
+    """Get the label and hierarchy triples for each learning resource type in HCRT."""
+    return _ensure_index(  # type:ignore[no-any-return]
+        "hcrt-background",
+        HCRT_TTL,
+        lambda: _build_background_index(get_resource_type_graph()),
+    )
+
+
+def get_background_indexes() -> list[BackgroundIndex]:
+    """Get the background indexes for all vocabularies."""
+    return [
+        get_discipline_background_index(),
+        get_license_background_index(),
+        get_language_background_index(),
+        get_resource_type_background_index(),
+    ]
+
+
+def build_vocabulary_indexes(*, force: bool = False) -> None:
+    """Compile the lookup tables for all vocabularies used during parsing.
+
+    :param force: Should the lookup tables be rebuilt even if they're already cached?
+    """
+    getters = [
+        get_discipline_index,
+        get_license_index,
+        get_language_index,
+        get_resource_type_index,
+        get_discipline_background_index,
+        get_license_background_index,
+        get_language_background_index,
+        get_resource_type_background_index,
+    ]
+    if force:
+        for path in pystow.join("dalia", "indexes").glob("*.json"):
+            path.unlink()
+    for getter in getters:
+        getter.cache_clear()
+        getter()
 
 
 MODALIA_TTL = "https://git.rwth-aachen.de/dalia/dalia-ontology/-/raw/main/MoDalia.ttl"
@@ -184,10 +387,44 @@ def get_modalia_graph(*, force: bool = False) -> rdflib.Graph:
     return graph
 
 
-def add_background_triples(graph: rdflib.Graph, force: bool = False) -> None:
-    """Enrich graph."""
+def add_background_triples(
+    graph: rdflib.Graph, force: bool = False, *, selective: bool = False
+) -> None:
+    """Enrich graph.
+
+    :param graph: The graph to enrich
+    :param force: Should the MoDalia graph be downloaded again?
+    :param selective: If true, only the label and hierarchy triples for vocabulary
+        terms referenced in the graph (i.e., languages, licenses, disciplines, and
+        learning resource types) and the terms above them are added, instead of
+        merging in the full vocabularies. These are looked up in the indexes from
+        :func:`get_background_indexes`.
+    """
+    if selective:
+        _add_referenced_triples(graph, get_background_indexes())
+        return
     graph += get_modalia_graph(force=force)
     graph += get_resource_type_graph()
     graph += get_language_graph()
     graph += get_licenses_graph()
     graph += get_discipline_graph()
+
+
+def _add_referenced_triples(graph: rdflib.Graph, indexes: Sequence[BackgroundIndex]) -> None:
+    """Add triples from the indexes for terms in the graph, and the terms above them."""
+    queue = list({str(node) for triple in graph for node in triple if isinstance(node, URIRef)})
+    seen = set(queue)
+    while queue:
+        term = queue.pop()
+        subject = URIRef(term)
+        for index in indexes:
+            for predicate, value in index.get(term, []):
+                obj = from_n3(value)
+                graph.add((subject, URIRef(predicate), obj))  # type:ignore[arg-type]
+                if (
+                    predicate in _HIERARCHY_PREDICATES
+                    and isinstance(obj, URIRef)
+                    and str(obj) not in seen
+                ):
+                    seen.add(str(obj))
+                    queue.append(str(obj))
@@ -4,9 +4,12 @@ from __future__ import annotations
 
 import logging
 import re
-from collections import ChainMap, Counter
+import sys
+from collections import Counter
+from collections.abc import Iterable
+from contextlib import nullcontext
 from pathlib import Path
-from typing import TextIO
+from typing import Any, TextIO
 
 import click
 import curies
@@ -17,12 +20,20 @@ from pystow.utils import safe_open_dict_reader
 from rdflib import URIRef
 from tqdm import tqdm
 
-from .community import LOOKUP_DICT_COMMUNITIES, CommunityDict
+from .community import (
+    CommunityDict,
+    CommunityIndex,
+    get_community_index,
+    get_lookup_dict_communities,
+)
+from .converter import expand_curie, get_default_converter, read_converter
 from .model import (
     AuthorDIF13,
     EducationalResourceDIF13,
     OrganizationDIF13,
+    deterministic_nodes,
 )
+from .ntriples import STREAMING_FORMATS, write_dif13_ntriples
 from .picklists import (
     LEARNING_RESOURCE_TYPES,
     MEDIA_TYPES,
@@ -35,9 +46,12 @@ from ..namespace import DALIA_COMMUNITY, SPDX_LICENSE, bind, get_base_graph
 from ..utils import cleanup_languages
 
 __all__ = [
+    "iter_dif13",
+    "iter_dif13_jsonl",
     "parse_dif13_row",
     "read_dif13",
     "read_dif13_into_rdflib",
+    "read_dif13_jsonl",
     "write_dif13_jsonl",
     "write_dif13_rdf",
 ]
@@ -61,18 +75,36 @@ UNPROCESSED: Counter[str] = Counter()
 
 
 def write_dif13_rdf(
-    oers: EducationalResourceDIF13 | list[EducationalResourceDIF13],
+    oers: EducationalResourceDIF13 | Iterable[EducationalResourceDIF13],
     *,
     path: Path | None = None,
     format: str | None = None,
+    deterministic: bool = False,
 ) -> None:
-    """Write OERs as DIF v1.3 RDF."""
+    """Write OERs as DIF v1.3 RDF.
+
+    If the format is ``nt`` (N-Triples) or ``nquads`` (N-Quads), triples are
+    streamed to the output as each OER is consumed instead of building a graph
+    first. See :func:`dalia_dif.dif13.ntriples.write_dif13_ntriples`.
+
+    If ``deterministic`` is true, authors get stable blank node labels that are
+    shared between the author list and the ``authorUnordered`` predicate. See
+    :func:`dalia_dif.dif13.model.deterministic_nodes`.
+    """
     if isinstance(oers, EducationalResourceDIF13):
         oers = [oers]
+    if format is not None and (quads := STREAMING_FORMATS.get(format.lower())) is not None:
+        if path is None:
+            write_dif13_ntriples(oers, sys.stdout, quads=quads, deterministic=deterministic)
+        else:
+            with path.open("w", encoding="utf-8") as file:
+                write_dif13_ntriples(oers, file, quads=quads, deterministic=deterministic)
+        return
     graph = rdflib.Graph()
     bind(graph)
-    for er in oers:
-        graph += er.get_graph()
+    with deterministic_nodes() if deterministic else nullcontext():
+        for er in oers:
+            graph += er.get_graph()
     if format is None:
         format = "turtle"
     if path is None:
@@ -82,9 +114,15 @@ def write_dif13_rdf(
 
 
 def write_dif13_jsonl(
-    oers: EducationalResourceDIF13 | list[EducationalResourceDIF13], *, path: Path | None = None
+    oers: EducationalResourceDIF13 | Iterable[EducationalResourceDIF13],
+    *,
+    path: Path | None = None,
 ) -> None:
-    """Write OERs as DIF v1.3 JSON lines."""
+    """Write OERs as DIF v1.3 JSON lines.
+
+    OERs are consumed lazily, so this can be combined with :func:`iter_dif13`
+    to convert files without holding all records in memory.
+    """
     if isinstance(oers, EducationalResourceDIF13):
         oers = [oers]
     lines = (o.model_dump_json(exclude_none=True, exclude_defaults=True) for o in oers)
@@ -93,18 +131,63 @@ def write_dif13_jsonl(
             click.echo(line)
     else:
         with path.open("w") as file:
-            file.write("\n".join(lines))
+            for i, line in enumerate(lines):
+                if i:
+                    file.write("\n")
+                file.write(line)
 
 
 def read_dif13(
     path: str | Path | TextIO,
     *,
     error_accumulator: list[str] | None = None,
-    converter: curies.Converter | None = None,
+    converter: curies.Converter | str | Path | None = None,
     ignore_missing_description: bool = False,
     custom_community_dict: CommunityDict | None = None,
+    trusted: bool = False,
 ) -> list[EducationalResourceDIF13]:
     """Parse DALIA records."""
+    return list(
+        iter_dif13(
+            path,
+            error_accumulator=error_accumulator,
+            converter=converter,
+            ignore_missing_description=ignore_missing_description,
+            custom_community_dict=custom_community_dict,
+            trusted=trusted,
+        )
+    )
+
+
+def iter_dif13(
+    path: str | Path | TextIO,
+    *,
+    error_accumulator: list[str] | None = None,
+    converter: curies.Converter | str | Path | None = None,
+    ignore_missing_description: bool = False,
+    custom_community_dict: CommunityDict | None = None,
+    trusted: bool = False,
+) -> Iterable[EducationalResourceDIF13]:
+    """Lazily parse DALIA records, row by row.
+
+    :param path: A local path, URL, or file-like object for a DIF v1.3 CSV
+    :param error_accumulator: A list that errors get appended to as the
+        corresponding rows are consumed. If not given, errors are written
+        to the console.
+    :param converter: A converter used to expand CURIEs appearing in keywords, or a
+        path to one written with :func:`dalia_dif.dif13.converter.write_converter`.
+        If not given, the :mod:`bioregistry` converter is used if it's installed.
+    :param ignore_missing_description: Should resources missing a description be kept?
+    :param custom_community_dict: Additional community names/synonyms to UUIDs
+    :param trusted: Is the file already known to be valid? If so, resources are
+        constructed without validation using
+        :meth:`EducationalResourceDIF13.from_trusted`.
+
+    :yields: Educational resources, one for each row that could be parsed
+
+    Unlike :func:`read_dif13`, this never holds more than one row in memory,
+    so it can be chained with :func:`write_dif13_jsonl` or :func:`write_dif13_rdf`.
+    """
     if isinstance(path, str) and (path.startswith("http://") or path.startswith("https://")):
         from io import StringIO
 
@@ -113,7 +196,15 @@ def read_dif13(
         with requests.get(path, timeout=5) as res:
             sio = StringIO(res.text)
             sio.name = path.split("/")[-1]
-            return read_dif13(sio)
+        yield from iter_dif13(
+            sio,
+            error_accumulator=error_accumulator,
+            converter=converter,
+            ignore_missing_description=ignore_missing_description,
+            custom_community_dict=custom_community_dict,
+            trusted=trusted,
+        )
+        return
 
     if isinstance(path, (str, Path)):
         file_name = Path(path).name
@@ -121,30 +212,71 @@ def read_dif13(
         file_name = path.name
 
     if converter is None:
-        try:
-            import bioregistry
-        except ImportError:
-            logger.info("no converter given and bioregistry couldn't be imported")
-        else:
-            converter = bioregistry.get_default_converter()
+        converter = get_default_converter()
+    elif isinstance(converter, str | Path):
+        converter = read_converter(converter)
+
+    community_index = _get_community_index(custom_community_dict)
 
     with safe_open_dict_reader(path, delimiter=",") as reader:
-        return [
-            oer
-            for idx, record in enumerate(reader, start=2)
-            if (
-                oer := parse_dif13_row(
-                    file_name,
-                    idx,
-                    record,
-                    error_accumulator=error_accumulator,
-                    converter=converter,
-                    ignore_missing_description=ignore_missing_description,
-                    custom_community_dict=custom_community_dict,
-                )
+        for idx, record in enumerate(reader, start=2):
+            oer = parse_dif13_row(
+                file_name,
+                idx,
+                record,
+                error_accumulator=error_accumulator,
+                converter=converter,
+                ignore_missing_description=ignore_missing_description,
+                community_index=community_index,
+                trusted=trusted,
             )
-            is not None
-        ]
+            if oer is not None:
+                yield oer
+
+
+def read_dif13_jsonl(
+    path: str | Path | TextIO, *, trusted: bool = False
+) -> list[EducationalResourceDIF13]:
+    """Read OERs from DIF v1.3 JSON lines, e.g., written by :func:`write_dif13_jsonl`."""
+    return list(iter_dif13_jsonl(path, trusted=trusted))
+
+
+def iter_dif13_jsonl(
+    path: str | Path | TextIO, *, trusted: bool = False
+) -> Iterable[EducationalResourceDIF13]:
+    """Lazily read OERs from DIF v1.3 JSON lines, e.g., written by :func:`write_dif13_jsonl`.
+
+    :param path: A local path or file-like object for a JSON lines file
+    :param trusted: Is the file already known to be valid, e.g., because it was
+        written by :func:`write_dif13_jsonl`? If so, resources are constructed
+        without validation using :meth:`EducationalResourceDIF13.from_trusted`.
+
+    :yields: Educational resources, one for each non-empty line
+
+    Lines are parsed with :mod:`orjson` if it's installed, which can be done with
+    ``pip install dalia-dif[jsonl]``. Either way, this skips the vocabulary checks
+    done when reading CSVs, so JSON lines can be used as a fast intermediate format.
+    """
+    if isinstance(path, str | Path):
+        with open(path, encoding="utf-8") as file:
+            yield from iter_dif13_jsonl(file, trusted=trusted)
+        return
+
+    try:
+        from orjson import loads
+    except ImportError:
+        from json import loads  # type:ignore[assignment]
+
+    # model_validate_json() can't be used, since it parses years (which are
+    # serialized as strings) as timestamps
+    construct = (
+        EducationalResourceDIF13.from_trusted
+        if trusted
+        else EducationalResourceDIF13.model_validate
+    )
+    for line in path:
+        if line.strip():
+            yield construct(loads(line))
 
 
 def read_dif13_into_rdflib(
@@ -152,7 +284,7 @@ def read_dif13_into_rdflib(
 ) -> rdflib.Graph:
     """Read DALIA DIF v1.3 records into a RDFlib graph."""
     graph = get_base_graph()
-    for record in read_dif13(path, error_accumulator=error_accumulator):
+    for record in iter_dif13(path, error_accumulator=error_accumulator):
         record.add_to_graph(graph)
     return graph
 
@@ -167,8 +299,15 @@ def parse_dif13_row(  # noqa:C901
     converter: curies.Converter | None = None,
     ignore_missing_description: bool = False,
     custom_community_dict: CommunityDict | None = None,
+    community_index: CommunityIndex | None = None,
+    trusted: bool = False,
 ) -> EducationalResourceDIF13 | None:
-    """Convert a row in a DALIA curation file to a resource, or return none if unable."""
+    """Convert a row in a DALIA curation file to a resource, or return none if unable.
+
+    When parsing many rows, pass a ``community_index`` that's built once, rather than
+    a ``custom_community_dict``, which is indexed for every row. If ``trusted`` is
+    true, the resource is constructed without validation.
+    """
     if isinstance(file_name, Path):
         file_name = file_name.name
 
@@ -177,7 +316,11 @@ def parse_dif13_row(  # noqa:C901
         idx,
         row,
         error_accumulator=error_accumulator,
-        custom_community_dict=custom_community_dict,
+        community_index=(
+            community_index
+            if community_index is not None
+            else _get_community_index(custom_community_dict)
+        ),
     )
 
     external_uris = _pop_split(row, "Link")
@@ -199,7 +342,7 @@ def parse_dif13_row(  # noqa:C901
         elif converter is None:
             raise ValueError("CURIE given in keyword without specifying a converter")
         else:
-            uri = converter.expand(keyword)
+            uri = expand_curie(converter, keyword)
             if uri:
                 xrefs.append(URIRef(uri))
             else:
@@ -216,8 +359,9 @@ def parse_dif13_row(  # noqa:C901
         if not ignore_missing_description:
             return None
 
+    factory = _construct_trusted if trusted else EducationalResourceDIF13
     try:
-        rv = EducationalResourceDIF13(
+        rv = factory(
             uuid=uuid,
             title=title,
             subtitle=subtitle or None,
@@ -265,6 +409,10 @@ def parse_dif13_row(  # noqa:C901
     return rv
 
 
+def _construct_trusted(**kwargs: Any) -> EducationalResourceDIF13:
+    return EducationalResourceDIF13.from_trusted(kwargs)
+
+
 def _pop_split(d: dict[str, str], key: str) -> list[str]:
     s = d.pop(key, None)
     if not s:
@@ -475,16 +623,21 @@ def _process_media_types(
 MISSING_COMMUNITIES: Counter[str] = Counter()
 
 
+def _get_community_index(custom_community_dict: CommunityDict | None) -> CommunityIndex:
+    if not custom_community_dict:
+        return get_community_index()
+    return CommunityIndex(get_lookup_dict_communities(), custom_community_dict)
+
+
 def _process_communities(
     file_name: str,
     line: int,
     row: dict[str, str],
     *,
     error_accumulator: list[str] | None = None,
-    custom_community_dict: CommunityDict | None = None,
+    community_index: CommunityIndex,
 ) -> tuple[list[URIRef], list[URIRef]]:
     supporting, recommending = [], []
-    community_dict = ChainMap(custom_community_dict or {}, LOOKUP_DICT_COMMUNITIES)
     for community in _pop_split(row, "Community"):
         match = COMMUNITY_RELATION_RE.search(community)
         if not match:
@@ -499,15 +652,13 @@ def _process_communities(
         name = match.group("name").strip()
         relation = match.group("relation")
 
-        community_uuid = community_dict.get(name, None)
+        community_uuid = community_index.get(name)
         if not community_uuid:
             if not MISSING_COMMUNITIES[name]:
-                _log(
-                    file_name,
-                    line,
-                    f"unknown community: {name}",
-                    error_accumulator=error_accumulator,
-                )
+                msg = f"unknown community: {name}"
+                if suggestions := community_index.suggest(name):
+                    msg += f". Did you mean: {', '.join(suggestions)}?"
+                _log(file_name, line, msg, error_accumulator=error_accumulator)
             MISSING_COMMUNITIES[name] += 1
             continue
 
@@ -9,21 +9,35 @@ __all__ = [
 ]
 
 
-def create_rdf_collection(g: Graph, elements: list[Node]) -> Node | None:
-    """Create an RDF collection and return the first node, or None if the list is empty."""
+def create_rdf_collection(
+    g: Graph, elements: list[Node], *, prefix: str | None = None
+) -> Node | None:
+    """Create an RDF collection and return the first node, or None if the list is empty.
+
+    :param g: The graph to add the collection to
+    :param elements: The nodes in the collection
+    :param prefix: If given, the blank nodes for the cells of the list are labeled with
+        this prefix and their position instead of being random
+    """
     # Note: RDFLib's Collection class implementation seems to be broken. Thus, we will
     # care for the low-level triple encoding of the linked list.
 
     if not elements:
         return None
 
-    list_first_node = head = BNode()
-    for node in elements[0:-1]:
+    list_first_node = head = _get_cell(prefix, 0)
+    for i, node in enumerate(elements[0:-1], start=1):
         g.add((head, RDF.first, node))
-        rest = BNode()
+        rest = _get_cell(prefix, i)
         g.add((head, RDF.rest, rest))
         head = rest
     g.add((head, RDF.first, elements[-1]))
     g.add((head, RDF.rest, RDF.nil))
 
     return list_first_node
+
+
+def _get_cell(prefix: str | None, position: int) -> BNode:
+    if prefix is None:
+        return BNode()
+    return BNode(f"{prefix}l{position}")
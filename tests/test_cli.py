@@ -0,0 +1,189 @@
+"""Tests for the command line interface."""
+
+import shutil
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from dalia_dif.cli import main
+from tests.util import EXAMPLE_CSV, RESOURCES
+
+
+def _make_directory(directory: Path) -> Path:
+    for name in ["example.csv", "invalid.csv"]:
+        shutil.copy(RESOURCES.joinpath(name), directory.joinpath(name))
+    return directory
+
+
+@pytest.fixture(autouse=True)
+def _isolate_pystow(
+    tmp_path_factory: pytest.TempPathFactory, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("DALIA_HOME", tmp_path_factory.mktemp("dalia_home").as_posix())
+
+
+def test_validate_directory_parallel(tmp_path: Path) -> None:
+    directory = _make_directory(tmp_path)
+    runner = CliRunner()
+
+    serial = runner.invoke(main, ["validate", "--no-cache", directory.as_posix()])
+    parallel = runner.invoke(main, ["validate", "--no-cache", "--jobs", "2", directory.as_posix()])
+
+    assert serial.exit_code == 1
+    assert parallel.exit_code == serial.exit_code
+    assert parallel.output == serial.output
+
+    # output is grouped by file, in sorted order
+    assert serial.output.index("> example.csv") < serial.output.index("> invalid.csv")
+    assert "unable to lookup target group: astronaut" in serial.output
+
+
+def test_validate_directory_parallel_passes(tmp_path: Path) -> None:
+    shutil.copy(RESOURCES.joinpath("example.csv"), tmp_path.joinpath("example.csv"))
+    result = CliRunner().invoke(main, ["validate", "--jobs", "2", tmp_path.as_posix()])
+    assert result.exit_code == 0
+
+
+def test_validate_directory_cached(tmp_path: Path) -> None:
+    directory = _make_directory(tmp_path)
+    runner = CliRunner()
+
+    first = runner.invoke(main, ["validate", directory.as_posix()])
+    second = runner.invoke(main, ["validate", directory.as_posix()])
+    assert first.exit_code == second.exit_code == 1
+    assert first.output == second.output
+
+    # fixing the invalid file invalidates its cache entry
+    shutil.copy(RESOURCES.joinpath("example.csv"), directory.joinpath("invalid.csv"))
+    third = runner.invoke(main, ["validate", directory.as_posix()])
+    assert third.exit_code == 0
+
+
+def test_fti(tmp_path: Path) -> None:
+    database = tmp_path.joinpath("index.db")
+    runner = CliRunner()
+
+    build = runner.invoke(main, ["fti", "build", database.as_posix(), EXAMPLE_CSV.as_posix()])
+    assert build.exit_code == 0, build.output
+
+    first = runner.invoke(main, ["fti", "upsert", database.as_posix(), EXAMPLE_CSV.as_posix()])
+    assert first.exit_code == 0, first.output
+    assert "inserted 0, updated 0, and skipped 2" in first.output
+
+    second = runner.invoke(main, ["fti", "upsert", database.as_posix(), RESOURCES.as_posix()])
+    # the valid row in invalid.csv is new, the rows in example.csv are still skipped
+    assert "inserted 1, updated 0, and skipped 2" in second.output
+
+    delete = runner.invoke(
+        main, ["fti", "delete", database.as_posix(), "b3763080-15a4-4de4-b99b-c9b337644904"]
+    )
+    assert "deleted 1 OERs" in delete.output
+
+
+def test_dedupe(tmp_path: Path) -> None:
+    shutil.copy(EXAMPLE_CSV, tmp_path.joinpath("example.csv"))
+    runner = CliRunner()
+
+    unique = runner.invoke(main, ["dedupe", tmp_path.as_posix()])
+    assert unique.exit_code == 0, unique.output
+
+    shutil.copy(EXAMPLE_CSV, tmp_path.joinpath("copy.csv"))
+    duplicated = runner.invoke(main, ["dedupe", tmp_path.as_posix()])
+    assert duplicated.exit_code == 1
+    assert "found 2 clusters" in duplicated.output
+    assert (
+        "copy.csv\t0f5c9ab3-7a3e-4ab0-9b7c-2f0e4d7c9d51\tPython for Chemists" in duplicated.output
+    )
+
+
+def test_jsonl(tmp_path: Path) -> None:
+    jsonl = tmp_path.joinpath("example.jsonl")
+    runner = CliRunner()
+
+    convert = runner.invoke(main, ["convert", EXAMPLE_CSV.as_posix(), "-o", jsonl.as_posix()])
+    assert convert.exit_code == 0, convert.output
+
+    # JSON lines can be converted further, or indexed, without re-parsing the CSV
+    turtle = tmp_path.joinpath("example.ttl")
+    convert = runner.invoke(main, ["convert", jsonl.as_posix(), "-o", turtle.as_posix()])
+    assert convert.exit_code == 0, convert.output
+    assert "Python for Chemists" in turtle.read_text()
+
+    database = tmp_path.joinpath("index.db")
+    build = runner.invoke(main, ["fti", "build", database.as_posix(), tmp_path.as_posix()])
+    assert build.exit_code == 0, build.output
+    upsert = runner.invoke(main, ["fti", "upsert", database.as_posix(), jsonl.as_posix()])
+    assert "inserted 0, updated 0, and skipped 2" in upsert.output
+
+
+def test_chart(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    pytest.importorskip("matplotlib")
+    from dalia_dif.dif13.export import charts
+    from tests.test_dif13.test_charts import DISCIPLINE_NAMES
+
+    # avoid downloading the discipline vocabulary
+    monkeypatch.setattr(charts, "get_discipline_names", lambda: DISCIPLINE_NAMES)
+
+    jsonl = tmp_path.joinpath("example.jsonl")
+    runner = CliRunner()
+    runner.invoke(main, ["convert", EXAMPLE_CSV.as_posix(), "-o", jsonl.as_posix()])
+
+    path = tmp_path.joinpath("chart.png")
+    result = runner.invoke(main, ["chart", jsonl.as_posix(), "-o", path.as_posix()])
+    assert result.exit_code == 0, result.output
+    assert "DALIA has 2 OERs" in result.output
+    assert path.is_file()
+
+
+def test_parquet(tmp_path: Path) -> None:
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = tmp_path.joinpath("catalog.parquet")
+    result = CliRunner().invoke(main, ["convert", EXAMPLE_CSV.as_posix(), "-o", path.as_posix()])
+    assert result.exit_code == 0, result.output
+    assert pq.read_table(path).num_rows == 2
+
+
+def test_sorted(tmp_path: Path) -> None:
+    outputs = []
+    for name in ["a.nt", "b.nt"]:
+        path = tmp_path.joinpath(name)
+        result = CliRunner().invoke(
+            main, ["convert", EXAMPLE_CSV.as_posix(), "-o", path.as_posix(), "--sort"]
+        )
+        assert result.exit_code == 0, result.output
+        outputs.append(path.read_bytes())
+    assert outputs[0] == outputs[1]
+
+
+def test_diff(tmp_path: Path) -> None:
+    runner = CliRunner()
+    unchanged = runner.invoke(main, ["diff", EXAMPLE_CSV.as_posix(), EXAMPLE_CSV.as_posix()])
+    assert unchanged.exit_code == 0, unchanged.output
+    assert unchanged.output == ""
+
+    path = tmp_path.joinpath("new.csv")
+    path.write_text(EXAMPLE_CSV.read_text().replace("Python for Chemists", "Python for Chemistry"))
+    changed = runner.invoke(main, ["diff", EXAMPLE_CSV.as_posix(), path.as_posix()])
+    assert changed.exit_code == 1
+    assert "modified\t0f5c9ab3-7a3e-4ab0-9b7c-2f0e4d7c9d51" in changed.output
+    assert "0 added, 0 removed, 1 modified" in changed.output
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        ["--sort"],
+        ["--sort", "-o", "out.ttl"],
+        ["--sort", "-o", "out.jsonl"],
+        ["--deterministic", "-o", "out.parquet"],
+        ["--deterministic", "--format", "jsonl"],
+    ],
+)
+def test_convert_usage(tmp_path: Path, args: list[str]) -> None:
+    """Test options that don't apply to the output are rejected."""
+    with CliRunner().isolated_filesystem(temp_dir=tmp_path):
+        result = CliRunner().invoke(main, ["convert", EXAMPLE_CSV.as_posix(), *args])
+        assert result.exit_code == 2, result.output
+        assert "can only be used" in result.output
+        assert not list(Path().iterdir())
@@ -0,0 +1 @@
+"""Tests for the DIF v1.3 implementation."""
@@ -0,0 +1,70 @@
+"""Tests for the validation cache."""
+
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+from dalia_dif.dif13 import cache as cache_module
+from dalia_dif.dif13.cache import ValidationCache
+from tests.util import EXAMPLE_CSV
+
+
+def test_cache_roundtrip(tmp_path: Path) -> None:
+    cache = ValidationCache(tmp_path.joinpath("cache"))
+    key = cache.get_key(EXAMPLE_CSV)
+    assert cache.get(key) is None
+    cache.set(key, ["an error"])
+    assert cache.get(key) == ["an error"]
+
+
+def test_cache_key(tmp_path: Path) -> None:
+    cache = ValidationCache(tmp_path.joinpath("cache"))
+    path = tmp_path.joinpath(EXAMPLE_CSV.name)
+    shutil.copy(EXAMPLE_CSV, path)
+
+    key = cache.get_key(path)
+    assert key == cache.get_key(EXAMPLE_CSV), "key should only depend on content and name"
+    assert key != cache.get_key(path, ignore_missing_description=True)
+    assert key != cache.get_key(path, custom_community_dict={"Community": "uuid"})
+
+    with path.open("a") as file:
+        file.write("\n")
+    assert key != cache.get_key(path)
+
+
+def test_cache_evict(tmp_path: Path) -> None:
+    cache = ValidationCache(tmp_path.joinpath("cache"), max_size=100)
+    for i in range(5):
+        key = f"key{i}"
+        cache.set(key, [f"error {i}" * 3])
+        # make modification times strictly increasing
+        os.utime(cache.directory.joinpath(f"{key}.json"), (i, i))
+
+    # reading an old entry marks it as recently used
+    assert cache.get("key0") is not None
+
+    assert cache.evict() > 0
+    remaining = {path.stem for path in cache.directory.glob("*.json")}
+    assert "key0" in remaining
+    assert "key1" not in remaining
+    assert sum(path.stat().st_size for path in cache.directory.glob("*.json")) <= 100
+
+
+def test_cache_key_source(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test changing the source code invalidates cache keys, even with the same version."""
+    cache = ValidationCache(tmp_path.joinpath("cache"))
+    key = cache.get_key(EXAMPLE_CSV)
+
+    source = tmp_path.joinpath("source")
+    shutil.copytree(cache_module._PACKAGE_DIRECTORY, source)
+    monkeypatch.setattr(cache_module, "_PACKAGE_DIRECTORY", source)
+    cache_module._hash_source.cache_clear()
+    assert cache.get_key(EXAMPLE_CSV) == key
+
+    with source.joinpath("dif13", "reader.py").open("a") as file:
+        file.write("\n# a change to the parser\n")
+    cache_module._hash_source.cache_clear()
+    assert cache.get_key(EXAMPLE_CSV) != key
+    cache_module._hash_source.cache_clear()
@@ -0,0 +1,62 @@
+"""Tests for the single-pass statistics used for charts."""
+
+import pytest
+import rdflib
+
+from dalia_dif.dif13 import read_dif13
+from dalia_dif.dif13.export import charts
+from dalia_dif.dif13.export.charts import summarize_graph, summarize_resources
+from dalia_dif.namespace import get_base_graph
+from tests.util import EXAMPLE_CSV
+
+DISCIPLINE_NAMES = {"n0": "Interdisciplinary", "n4": "Mathematics, Natural Sciences"}
+
+
+@pytest.fixture(autouse=True)
+def _offline_disciplines(monkeypatch: pytest.MonkeyPatch) -> None:
+    # avoid downloading the discipline vocabulary
+    monkeypatch.setattr(charts, "get_discipline_names", lambda: DISCIPLINE_NAMES)
+
+
+def _get_graph() -> rdflib.Graph:
+    graph = get_base_graph()
+    for oer in read_dif13(EXAMPLE_CSV):
+        oer.add_to_graph(graph)
+    return graph
+
+
+def test_summarize_graph() -> None:
+    """Test the single-pass statistics are the same as the SPARQL-based counts."""
+    graph = _get_graph()
+    statistics = summarize_graph(graph)
+
+    assert statistics.n_oers == charts.count_oers(graph) == 2
+    assert (statistics.languages_combined, statistics.languages) == charts.count_languages(graph)
+    assert statistics.licenses == charts.count_licenses(graph)
+    assert statistics.file_extensions == charts.count_file_extensions(graph)
+    assert statistics.media_types == charts.count_media_types(graph)
+    assert statistics.target_groups == charts.count_target_groups(graph, 2)
+    assert statistics.learning_resource_types == charts.count_learning_resource_type(graph)
+    assert statistics.proficiency_levels == charts.count_proficiency_level(graph, 2)
+    assert statistics.disciplines == charts.count_disciplines(graph)
+    assert statistics.communities == charts.count_communities(graph)
+
+
+def test_summarize_resources() -> None:
+    """Test statistics calculated from models are the same as from RDF."""
+    assert summarize_resources(read_dif13(EXAMPLE_CSV)) == summarize_graph(_get_graph())
+
+
+def test_summarize_empty(capsys: pytest.CaptureFixture[str]) -> None:
+    """Test summarizing resources that don't have some fields."""
+    oers = [
+        oer.model_copy(update={"target_groups": [], "media_types": []})
+        for oer in read_dif13(EXAMPLE_CSV)
+    ]
+    statistics = summarize_resources(oers)
+    assert not statistics.target_groups
+    assert not statistics.media_types
+
+    charts._echo_largest("target group", statistics.target_groups, statistics.n_oers)
+    charts._echo_largest("target group", statistics.target_groups, 0)
+    assert capsys.readouterr().out == "The largest target group was none\n" * 2
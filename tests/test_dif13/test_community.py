@@ -0,0 +1,57 @@
+"""Tests for looking up communities."""
+
+import csv
+from io import StringIO
+
+from dalia_dif.dif13 import parse_dif13_row, read_dif13
+from dalia_dif.dif13.community import CommunityIndex, get_community_index
+from dalia_dif.namespace import DALIA_COMMUNITY
+from tests.util import EXAMPLE_CSV
+
+NFDI4CHEM = "bead62a8-c3c2-46d6-9eb1-ffeaba38d5bf"
+
+
+def test_community_index() -> None:
+    """Test lookups are insensitive to case, Unicode forms, and whitespace."""
+    index = get_community_index()
+    assert index.get("NFDI4Chem") == NFDI4CHEM
+    assert index.get("  nfdi4chem ") == NFDI4CHEM
+    assert index.get("\uff2e\uff26\uff24\uff29\uff14chem") == NFDI4CHEM  # fullwidth NFDI4
+    assert "NFDI4CHEM" in index
+    assert index.get("NFDI4Nope") is None
+
+    assert index.suggest("NFDI4Chme")[0] == "NFDI4Chem"
+    assert index.suggest("completely different") == []
+
+    # custom names take precedence
+    custom = CommunityIndex({"NFDI4Chem": NFDI4CHEM}, {"nfdi4chem": "custom"})
+    assert custom.get("NFDI4Chem") == "custom"
+    assert len(custom) == 1
+
+
+def test_read_communities() -> None:
+    """Test reading communities with variant spellings and typos."""
+    text = EXAMPLE_CSV.read_text().replace(
+        "NFDI4Chem (S) * NFDI4Culture (R)", "nfdi4chem  (S) * NFDI4Cultrue (R)"
+    )
+    sio = StringIO(text)
+    sio.name = EXAMPLE_CSV.name
+
+    errors: list[str] = []
+    chem = read_dif13(sio, error_accumulator=errors)[1]
+    assert chem.supporting_communities == [DALIA_COMMUNITY[NFDI4CHEM]]
+    assert chem.recommending_communities == []
+    assert any("unknown community: NFDI4Cultrue. Did you mean: NFDI4Culture" in e for e in errors)
+
+
+def test_empty_community_index() -> None:
+    """Test an empty index passed by the caller is used instead of the default one."""
+    with EXAMPLE_CSV.open() as file:
+        row = list(csv.DictReader(file))[1]
+    errors: list[str] = []
+    oer = parse_dif13_row(
+        EXAMPLE_CSV, 1, row, error_accumulator=errors, community_index=CommunityIndex({})
+    )
+    assert oer is not None
+    assert oer.supporting_communities == []
+    assert any("unknown community: NFDI4Chem" in e for e in errors)
@@ -0,0 +1,69 @@
+"""Tests for expanding CURIEs in keywords."""
+
+from io import StringIO
+from pathlib import Path
+
+import curies
+import pytest
+from rdflib import URIRef
+
+from dalia_dif.dif13 import read_dif13
+from dalia_dif.dif13.converter import (
+    _EXPANSIONS,
+    expand_curie,
+    get_keyword_prefixes,
+    read_converter,
+    write_converter,
+)
+from tests.util import EXAMPLE_CSV
+
+OCCO_URI_PREFIX = "http://purl.obolibrary.org/obo/OCCO_"
+
+
+def _get_converter() -> curies.Converter:
+    return curies.Converter.from_prefix_map(
+        {"occo": OCCO_URI_PREFIX, "go": "http://purl.obolibrary.org/obo/GO_"}
+    )
+
+
+def _get_csv() -> StringIO:
+    text = EXAMPLE_CSV.read_text().replace("python * cheminformatics", "python * occo:123")
+    sio = StringIO(text)
+    sio.name = EXAMPLE_CSV.name
+    return sio
+
+
+def test_expand_curie() -> None:
+    """Test expansions are memoized for each converter."""
+    converter = _get_converter()
+    assert expand_curie(converter, "occo:123") == f"{OCCO_URI_PREFIX}123"
+    assert expand_curie(converter, "nope:123") is None
+    assert _EXPANSIONS[converter] == {"occo:123": f"{OCCO_URI_PREFIX}123", "nope:123": None}
+
+
+def test_trimmed_converter(tmp_path: Path) -> None:
+    """Test trimming a converter to the prefixes used in keywords, then reading with it."""
+    assert get_keyword_prefixes(_get_csv()) == {"occo"}
+
+    path = tmp_path.joinpath("converter.json")
+    write_converter(_get_converter(), path, prefixes=get_keyword_prefixes(_get_csv()))
+    converter = read_converter(path)
+    assert converter.prefix_map == {"occo": OCCO_URI_PREFIX}
+    # converters are only read once
+    assert read_converter(path) is converter
+
+    chem = read_dif13(_get_csv(), converter=path)[1]
+    assert chem.keywords == ["python", "RDKit"]
+    assert chem.xrefs == [URIRef(f"{OCCO_URI_PREFIX}123")]
+
+
+def test_write_converter_atomic(tmp_path: Path) -> None:
+    """Test converters are written through a temporary file."""
+    path = tmp_path.joinpath("converter.json")
+    path.write_text('[{"prefix": "occo", "uri_pre')  # e.g., from an interrupted write
+    with pytest.raises(ValueError):
+        read_converter(path)
+
+    write_converter(_get_converter(), path)
+    assert [p.name for p in tmp_path.iterdir()] == ["converter.json"]
+    assert read_converter(path).prefix_map == _get_converter().prefix_map
@@ -0,0 +1,59 @@
+"""Tests for near-duplicate detection."""
+
+from uuid import uuid4
+
+import pytest
+
+from dalia_dif.dif13 import read_dif13
+from dalia_dif.dif13.dedupe import MinHashLSH, find_duplicates, get_shingles, jaccard
+from tests.util import EXAMPLE_CSV
+
+
+def test_shingles() -> None:
+    """Test shingles are normalized."""
+    fdm, chem = read_dif13(EXAMPLE_CSV)
+    shingles = get_shingles(chem)
+    assert "pytho" in shingles
+    assert "link:github.com/cthoyt/chemistry-tutorial" in shingles
+
+    variant = chem.model_copy(update={"title": "PYTHON  for chemists!", "links": []})
+    assert get_shingles(variant) == {s for s in shingles if not s.startswith("link:")}
+    assert jaccard(shingles, get_shingles(fdm)) < 0.1
+
+
+def test_signature() -> None:
+    """Test MinHash signatures estimate Jaccard similarity."""
+    lsh = MinHashLSH(num_perm=256)
+    a = {f"shingle{i}" for i in range(100)}
+    b = {f"shingle{i}" for i in range(50, 150)}
+    signature_a, signature_b = lsh.get_signature(a), lsh.get_signature(b)
+    estimate = sum(x == y for x, y in zip(signature_a, signature_b, strict=True)) / 256
+    assert abs(estimate - jaccard(a, b)) < 0.1
+    assert lsh.get_signature(a) == signature_a
+
+
+def test_signature_numpy() -> None:
+    """Test the vectorized signature is the same as the pure Python one."""
+    pytest.importorskip("numpy")
+    lsh = MinHashLSH()
+    shingles = {f"shingle{i}" for i in range(300)}
+    signature = lsh.get_signature(shingles)
+    lsh._coefficients = None
+    assert lsh.get_signature(shingles) == signature
+    assert all(isinstance(value, int) for value in signature)
+
+
+def test_find_duplicates() -> None:
+    """Test finding clusters of near-duplicates."""
+    fdm, chem = read_dif13(EXAMPLE_CSV)
+    oers = [
+        chem,
+        fdm,
+        chem.model_copy(update={"uuid": uuid4(), "title": "Python for Chemists (2nd edition)"}),
+        fdm.model_copy(update={"uuid": uuid4(), "description": fdm.description + "."}),
+        chem.model_copy(update={"uuid": uuid4(), "title": "Python for chemists", "links": []}),
+    ]
+    assert find_duplicates(oers) == [[0, 2, 4], [1, 3]]
+    assert find_duplicates(oers[:2]) == []
+    # a very high threshold only allows exact duplicates of the text and links
+    assert find_duplicates(oers, threshold=0.99) == [[1, 3]]
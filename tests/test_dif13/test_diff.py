@@ -0,0 +1,36 @@
+"""Tests for detecting changes between snapshots."""
+
+from uuid import uuid4
+
+from dalia_dif.dif13 import EducationalResourceDIF13, read_dif13
+from dalia_dif.dif13.diff import diff_dif13, get_digests
+from tests.util import EXAMPLE_CSV
+
+
+def test_digest() -> None:
+    """Test digests only depend on content."""
+    fdm, chem = read_dif13(EXAMPLE_CSV)
+    trusted = read_dif13(EXAMPLE_CSV, trusted=True)[0]
+    assert fdm.get_digest() == trusted.get_digest()
+    assert (
+        fdm.get_digest()
+        == EducationalResourceDIF13.model_validate_json(fdm.model_dump_json()).get_digest()
+    )
+    assert fdm.get_digest() != chem.get_digest()
+    assert fdm.get_digest() != fdm.model_copy(update={"version": "2"}).get_digest()
+
+
+def test_diff() -> None:
+    """Test comparing snapshots."""
+    fdm, chem = read_dif13(EXAMPLE_CSV)
+    assert not diff_dif13([fdm, chem], [chem, fdm])
+
+    new = fdm.model_copy(update={"uuid": uuid4()})
+    changed = chem.model_copy(update={"title": "Python for Chemists, 2nd Edition"})
+    diff = diff_dif13([fdm, chem], [changed, new])
+    assert diff.added == [new.uuid]
+    assert diff.removed == [fdm.uuid]
+    assert diff.modified == [chem.uuid]
+
+    # digests from a previous run can be used instead of the old OERs
+    assert diff_dif13(get_digests([fdm, chem]), [changed, new]) == diff
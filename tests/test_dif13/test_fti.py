@@ -0,0 +1,258 @@
+"""Tests for the SQLite full text index."""
+
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from dalia_dif.dif13 import read_dif13
+from dalia_dif.dif13.export.fti import (
+    CacheInfo,
+    FacetedSearchResults,
+    FTIndex,
+    UpsertSummary,
+    delete_sqlite_fti,
+    faceted_search_sqlite_fti,
+    get_generation,
+    query_sqlite_fti,
+    resources_to_sqlite_fti,
+    search_sqlite_fti,
+    upsert_sqlite_fti,
+    write_sqlite_fti_from_resources,
+)
+from tests.util import EXAMPLE_CSV
+
+UUID_CHEM = "0f5c9ab3-7a3e-4ab0-9b7c-2f0e4d7c9d51"
+UUID_FDM = "b3763080-15a4-4de4-b99b-c9b337644904"
+
+
+def test_upsert(tmp_path: Path) -> None:
+    """Test incrementally updating an index on disk."""
+    path = tmp_path.joinpath("index.db")
+    oers = read_dif13(EXAMPLE_CSV)
+
+    assert upsert_sqlite_fti(oers, path) == UpsertSummary(inserted=2, updated=0, unchanged=0)
+    assert query_sqlite_fti("chem*", path) == [UUID_CHEM]
+
+    # nothing changed, so nothing gets rewritten
+    assert upsert_sqlite_fti(oers, path) == UpsertSummary(inserted=0, updated=0, unchanged=2)
+
+    changed = oers[1].model_copy(update={"title": "Python for Astronomers"})
+    assert upsert_sqlite_fti([changed], path) == UpsertSummary(inserted=0, updated=1, unchanged=0)
+    assert query_sqlite_fti("astronom*", path) == [UUID_CHEM]
+    assert query_sqlite_fti("python", path) == [UUID_CHEM]
+
+    assert delete_sqlite_fti([UUID_CHEM, "not-a-uuid"], path) == 1
+    assert query_sqlite_fti("python", path) == []
+    assert query_sqlite_fti("studierende", path) == [UUID_FDM]
+
+
+def test_upsert_backfill() -> None:
+    """Test content hashes are backfilled for an index made without them."""
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE VIRTUAL TABLE documents USING fts5(uuid, title, description, keywords)")
+    oers = read_dif13(EXAMPLE_CSV)
+    conn.executemany(
+        "INSERT INTO documents VALUES (?, ?, ?, ?)",
+        [(str(oer.uuid), oer.title, oer.description or "", " ".join(oer.keywords)) for oer in oers],
+    )
+    # the documents are the same, but they get updated to add their facets
+    assert upsert_sqlite_fti(oers, conn) == UpsertSummary(inserted=0, updated=2, unchanged=0)
+    assert faceted_search_sqlite_fti(None, conn, filters={"language": "eng"}).total == 1
+
+
+def test_build_from_resources(tmp_path: Path) -> None:
+    """Test building an index directly from OERs."""
+    oers = read_dif13(EXAMPLE_CSV)
+    conn = resources_to_sqlite_fti(oers)
+    assert query_sqlite_fti("chem*", conn) == [UUID_CHEM]
+    assert query_sqlite_fti("studierende", conn) == [UUID_FDM]
+    # content hashes are written during the build
+    assert upsert_sqlite_fti(oers, conn) == UpsertSummary(inserted=0, updated=0, unchanged=2)
+
+    # building over an existing index replaces it
+    path = tmp_path.joinpath("index.db")
+    write_sqlite_fti_from_resources(oers, path)
+    write_sqlite_fti_from_resources(oers[:1], path)
+    assert query_sqlite_fti("chem*", path) == []
+    assert query_sqlite_fti("studierende", path) == [UUID_FDM]
+
+
+def test_search() -> None:
+    """Test searching with paging, snippets, and malformed queries."""
+    conn = resources_to_sqlite_fti(read_dif13(EXAMPLE_CSV))
+
+    results = search_sqlite_fti("python", conn, snippet=True, highlight=True)
+    assert len(results) == 1
+    assert results[0].uuid == UUID_CHEM
+    assert results[0].highlight == "<b>Python</b> for Chemists"
+    assert results[0].snippet is not None and "<b>Python</b>" in results[0].snippet
+
+    everything = search_sqlite_fti("python OR studierende", conn)
+    assert {result.uuid for result in everything} == {UUID_CHEM, UUID_FDM}
+    assert [result.score for result in everything] == sorted(r.score for r in everything)
+    assert search_sqlite_fti("python OR studierende", conn, limit=1) == everything[:1]
+    assert search_sqlite_fti("python OR studierende", conn, limit=1, offset=1) == everything[1:]
+
+    # malformed FTS5 syntax is searched literally instead of raising an error
+    for query in ["it's", '"chem', "python AND", "", "NEAR("]:
+        search_sqlite_fti(query, conn)
+    assert [r.uuid for r in search_sqlite_fti('"python', conn)] == [UUID_CHEM]
+
+
+def test_faceted_search() -> None:
+    """Test combining full text search with facet filters and counts."""
+    oers = read_dif13(EXAMPLE_CSV)
+    conn = resources_to_sqlite_fti(oers)
+
+    everything = faceted_search_sqlite_fti(None, conn)
+    assert everything.total == 2
+    assert everything.facets["language"] == {"deu": 1, "eng": 1}
+    # FDM-BB is both supporting and recommending, but only counted once
+    assert sum(everything.facets["community"].values()) == 3
+
+    results = faceted_search_sqlite_fti(
+        "python OR studierende", conn, filters={"language": ["eng", "fra"]}
+    )
+    assert [result.uuid for result in results.results] == [UUID_CHEM]
+    assert results.total == 1
+    assert results.facets["license"] == {"http://spdx.org/licenses/CC0-1.0": 1}
+
+    # filters on different facets are combined with AND
+    none = faceted_search_sqlite_fti(
+        None, conn, filters={"language": "eng", "license": "http://spdx.org/licenses/CC-BY-4.0"}
+    )
+    assert none == FacetedSearchResults(results=[], total=0, facets={})
+
+    # paging doesn't change the total or facet counts
+    page = faceted_search_sqlite_fti("python OR studierende", conn, limit=1, offset=1)
+    assert len(page.results) == 1
+    assert page.total == 2
+    assert page.facets == everything.facets
+
+    # facets are kept up-to-date by incremental updates
+    changed = oers[1].model_copy(update={"languages": ["fra"]})
+    upsert_sqlite_fti([changed], conn)
+    assert faceted_search_sqlite_fti(None, conn).facets["language"] == {"deu": 1, "fra": 1}
+    delete_sqlite_fti([UUID_CHEM], conn)
+    assert faceted_search_sqlite_fti(None, conn).facets["language"] == {"deu": 1}
+
+    with pytest.raises(ValueError):
+        faceted_search_sqlite_fti(None, conn, filters={"color": "red"})
+
+
+def test_index_threads(tmp_path: Path) -> None:
+    """Test querying a read-only index from several threads."""
+    path = tmp_path.joinpath("index.db")
+    write_sqlite_fti_from_resources(read_dif13(EXAMPLE_CSV), path)
+
+    with pytest.raises(FileNotFoundError):
+        FTIndex(tmp_path.joinpath("missing.db"))
+
+    with FTIndex(path) as index:
+        barrier = threading.Barrier(4)
+
+        def _search(query: str) -> tuple[list[str], int]:
+            barrier.wait()  # make sure all threads are running at once
+            conn = index.connection
+            assert index.connection is conn  # connections are reused within a thread
+            return index.query(query), id(conn)
+
+        with ThreadPoolExecutor(4) as executor:
+            results = list(executor.map(_search, ["python", "chem*", "studierende", "python"]))
+
+        assert [uuids for uuids, _ in results] == [
+            [UUID_CHEM],
+            [UUID_CHEM],
+            [UUID_FDM],
+            [UUID_CHEM],
+        ]
+        assert len({conn_id for _, conn_id in results}) == 4
+        assert index.faceted_search(None, filters={"language": "deu"}).total == 1
+
+        with pytest.raises(sqlite3.OperationalError):
+            index.connection.execute("DELETE FROM documents")
+
+    with pytest.raises(ValueError):
+        index.search("python")
+
+
+def test_index_cache(tmp_path: Path) -> None:
+    """Test caching results and invalidating them when the index changes."""
+    path = tmp_path.joinpath("index.db")
+    oers = read_dif13(EXAMPLE_CSV)
+    write_sqlite_fti_from_resources(oers, path)
+    assert get_generation(path) == 1
+
+    with FTIndex(path, cache_size=2) as index:
+        assert index.query("python") == [UUID_CHEM]
+        # whitespace is normalized, so this is a hit
+        assert index.query("  python ") == [UUID_CHEM]
+        assert index.cache_info() == CacheInfo(hits=1, misses=1, maxsize=2, currsize=1)
+
+        index.faceted_search(None, filters={"language": ["eng", "deu"]})
+        index.faceted_search(None, filters={"language": ["deu", "eng"]})
+        assert index.cache_info() == CacheInfo(hits=2, misses=2, maxsize=2, currsize=2)
+
+        # the least recently used entry is evicted
+        assert index.query("rust") == []
+        index.query("python")
+        assert index.cache_info() == CacheInfo(hits=2, misses=4, maxsize=2, currsize=2)
+        assert index.query("rust") == []
+        assert index.cache_info().hits == 3
+
+        # updating the index bumps its generation, which clears the cache
+        upsert_sqlite_fti([oers[1].model_copy(update={"title": "Rust for Chemists"})], path)
+        assert get_generation(path) == 2
+        assert index.query("rust") == [UUID_CHEM]
+        assert index.cache_info().currsize == 1
+
+        # unchanged upserts don't bump the generation
+        upsert_sqlite_fti(oers[:1], path)
+        assert get_generation(path) == 2
+
+        index.cache_clear()
+        assert index.cache_info() == CacheInfo(hits=0, misses=0, maxsize=2, currsize=0)
+
+
+def test_trigram(tmp_path: Path) -> None:
+    """Test substring and fuzzy search with the trigram index."""
+    oers = read_dif13(EXAMPLE_CSV)
+    path = tmp_path.joinpath("index.db")
+    write_sqlite_fti_from_resources(oers, path, trigram=True)
+
+    # infix matches aren't possible with the stemmed index
+    assert query_sqlite_fti("*informatics", path) == []
+    assert query_sqlite_fti("*informatics", path, mode="substring") == [UUID_CHEM]
+    assert query_sqlite_fti("datenmanage", path, mode="substring") == [UUID_FDM]
+    # a typo
+    assert query_sqlite_fti("chemsts", path) == []
+    assert query_sqlite_fti("chemsts", path, mode="fuzzy")[0] == UUID_CHEM
+
+    results = faceted_search_sqlite_fti("informatic", path, mode="substring")
+    assert [result.uuid for result in results.results] == [UUID_CHEM]
+    assert results.facets["language"] == {"eng": 1}
+
+    # the trigram index is kept in sync by incremental updates
+    upsert_sqlite_fti([oers[1].model_copy(update={"title": "Python for Biologists"})], path)
+    assert query_sqlite_fti("hemists", path, mode="substring") == []
+    assert query_sqlite_fti("ologist", path, mode="substring") == [UUID_CHEM]
+    delete_sqlite_fti([UUID_CHEM], path)
+    assert query_sqlite_fti("informatics", path, mode="substring") == []
+
+    # the trigram index is optional
+    conn = resources_to_sqlite_fti(oers)
+    with pytest.raises(ValueError, match="trigram=True"):
+        query_sqlite_fti("informatics", conn, mode="substring")
+
+
+@pytest.mark.parametrize("mode", ["substr", "Word", ""])
+def test_invalid_mode(mode: str) -> None:
+    """Test that unknown search modes are rejected instead of running a trigram search."""
+    conn = resources_to_sqlite_fti(read_dif13(EXAMPLE_CSV))
+    with pytest.raises(ValueError, match="unknown search mode"):
+        search_sqlite_fti("chemistry", conn, mode=mode)  # type:ignore[arg-type]
+    with pytest.raises(ValueError, match="unknown search mode"):
+        faceted_search_sqlite_fti("chemistry", conn, mode=mode)  # type:ignore[arg-type]
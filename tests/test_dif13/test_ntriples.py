@@ -0,0 +1,147 @@
+"""Tests for streaming N-Triples serialization."""
+
+from io import StringIO
+from pathlib import Path
+from typing import Any
+
+from rdflib import BNode, Dataset, Graph, Literal, Node, URIRef
+from rdflib.collection import Collection
+
+from dalia_dif.dif13 import iter_dif13, read_dif13, write_dif13_rdf
+from dalia_dif.dif13.model import deterministic_nodes
+from dalia_dif.dif13.ntriples import (
+    format_nt_line,
+    write_dif13_ntriples,
+    write_dif13_ntriples_sorted,
+)
+from dalia_dif.dif13.predicates import AUTHOR_PREDICATE, AUTHOR_UNORDERED_PREDICATE
+from tests.util import EXAMPLE_CSV, same_graphs
+
+
+def _get_expected() -> Graph:
+    graph = Graph()
+    for oer in read_dif13(EXAMPLE_CSV):
+        graph += oer.get_graph()
+    return graph
+
+
+def test_write_ntriples(tmp_path: Path) -> None:
+    path = tmp_path.joinpath("out.nt")
+    write_dif13_rdf(iter_dif13(EXAMPLE_CSV), path=path, format="nt")
+    graph = Graph().parse(path, format="nt")
+    assert same_graphs(graph, _get_expected())
+
+
+def test_write_nquads() -> None:
+    sio = StringIO()
+    n = write_dif13_ntriples(iter_dif13(EXAMPLE_CSV), sio, quads=True)
+    assert n == len(sio.getvalue().splitlines())
+
+    dataset = Dataset()
+    dataset.parse(data=sio.getvalue(), format="nquads")
+    graph_names = {str(g.identifier) for g in dataset.graphs() if len(g)}
+    assert graph_names == {
+        "https://id.dalia.education/learning-resource/b3763080-15a4-4de4-b99b-c9b337644904",
+        "https://id.dalia.education/learning-resource/0f5c9ab3-7a3e-4ab0-9b7c-2f0e4d7c9d51",
+    }
+
+
+def test_format_literal() -> None:
+    line = format_nt_line(
+        (URIRef("https://example.org/s"), URIRef("https://example.org/p"), Literal('a "b"\nc'))
+    )
+    assert line == '<https://example.org/s> <https://example.org/p> "a \\"b\\"\\nc" .\n'
+
+
+def test_deterministic() -> None:
+    """Test deterministic output is stable and shares author nodes."""
+    outputs = []
+    for _ in range(2):
+        sio = StringIO()
+        write_dif13_ntriples(iter_dif13(EXAMPLE_CSV), sio, deterministic=True)
+        outputs.append(sio.getvalue())
+    assert outputs[0] == outputs[1]
+
+    sio = StringIO()
+    write_dif13_ntriples(iter_dif13(EXAMPLE_CSV), sio)
+    assert len(outputs[0].splitlines()) < len(sio.getvalue().splitlines())
+
+    graph = Graph().parse(data=outputs[0], format="nt")
+    for oer in graph.subjects(AUTHOR_UNORDERED_PREDICATE, None):
+        ordered = set(Collection(graph, graph.value(oer, AUTHOR_PREDICATE)))
+        assert ordered == set(graph.objects(oer, AUTHOR_UNORDERED_PREDICATE))
+
+
+def _describe(graph: Graph) -> tuple[set[tuple[Node, Node, Node]], dict[Node, Any]]:
+    """Summarize a graph so that it can be compared regardless of blank node labels."""
+    ground = {triple for triple in graph if not any(isinstance(node, BNode) for node in triple)}
+    authors = {}
+    for oer in set(graph.subjects(AUTHOR_UNORDERED_PREDICATE, None)):
+        ordered = [
+            frozenset(graph.predicate_objects(author))
+            for author in Collection(graph, graph.value(oer, AUTHOR_PREDICATE))
+        ]
+        unordered = sorted(
+            (
+                frozenset(graph.predicate_objects(author))
+                for author in graph.objects(oer, AUTHOR_UNORDERED_PREDICATE)
+            ),
+            key=sorted,
+        )
+        authors[oer] = ordered, unordered
+    return ground, authors
+
+
+def test_deterministic_same_triples() -> None:
+    """Test the deterministic mode serializes the same triples as the default mode."""
+    default, deterministic = Graph(), Graph()
+    for oer in read_dif13(EXAMPLE_CSV):
+        oer.add_to_graph(default)
+        with deterministic_nodes():
+            oer.add_to_graph(deterministic)
+    assert _describe(default) == _describe(deterministic)
+
+    # the only other triples link each OER to its author list and authors, make up
+    # the cells of the list, and describe each author once
+    ground, authors = _describe(deterministic)
+    n_author_triples = sum(
+        1 + 3 * len(ordered) + sum(map(len, unordered)) for ordered, unordered in authors.values()
+    )
+    assert len(deterministic) == len(ground) + n_author_triples
+
+
+def test_write_sorted() -> None:
+    """Test sorted output is the same regardless of chunking and input order."""
+    sio = StringIO()
+    n = write_dif13_ntriples_sorted(iter_dif13(EXAMPLE_CSV), sio)
+    lines = sio.getvalue().splitlines(keepends=True)
+    assert n == len(lines)
+    assert lines == sorted(set(lines))
+
+    expected = Graph()
+    with deterministic_nodes():
+        for oer in read_dif13(EXAMPLE_CSV):
+            oer.add_to_graph(expected)
+    assert same_graphs(Graph().parse(data=sio.getvalue(), format="nt"), expected)
+
+    # spill to many chunks, read resources in reverse order, and include duplicates
+    oers = read_dif13(EXAMPLE_CSV)
+    chunked = StringIO()
+    write_dif13_ntriples_sorted([*reversed(oers), oers[0]], chunked, chunk_size=5)
+    assert chunked.getvalue() == sio.getvalue()
+
+
+def test_format_illegal_iri() -> None:
+    """Test characters that aren't allowed in IRIs are percent-encoded."""
+    line = format_nt_line(
+        (
+            URIRef("https://example.org/s"),
+            URIRef("https://example.org/p"),
+            URIRef('https://example.org/a b<c>"d'),
+        )
+    )
+    assert line == (
+        "<https://example.org/s> <https://example.org/p> <https://example.org/a%20b%3Cc%3E%22d> .\n"
+    )
+    graph = Graph().parse(data=line, format="nt")
+    assert len(graph) == 1
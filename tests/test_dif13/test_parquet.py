@@ -0,0 +1,59 @@
+"""Tests for exporting OERs to Parquet."""
+
+import datetime
+from pathlib import Path
+
+import pytest
+
+from dalia_dif.dif13 import read_dif13
+from dalia_dif.dif13.export.parquet import iter_record_batches, write_dif13_parquet
+from tests.util import EXAMPLE_CSV
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def test_record_batches() -> None:
+    """Test OERs are split into record batches."""
+    oers = read_dif13(EXAMPLE_CSV)
+    batches = list(iter_record_batches(oers * 3, batch_size=4))
+    assert [batch.num_rows for batch in batches] == [4, 2]
+    assert list(iter_record_batches([])) == []
+
+
+def test_write_parquet(tmp_path: Path) -> None:
+    """Test writing typed and list columns."""
+    path = tmp_path.joinpath("catalog.parquet")
+    write_dif13_parquet(read_dif13(EXAMPLE_CSV), path)
+
+    table = pq.read_table(path)
+    assert table.num_rows == 2
+    assert str(table.schema.field("publication_date").type) == "date32[day]"
+    fdm, chem = table.to_pylist()
+
+    assert fdm["uuid"] == "b3763080-15a4-4de4-b99b-c9b337644904"
+    assert fdm["languages"] == ["deu"]
+    assert fdm["keywords"] == ["research data management", "certificate course", "training"]
+    assert fdm["disciplines"] == ["https://w3id.org/kim/hochschulfaechersystematik/n0"]
+    assert (fdm["publication_year"], fdm["publication_date"]) == (2024, datetime.date(2024, 7, 1))
+    assert fdm["authors"][0] == {
+        "type": "person",
+        "name": "Daniela Mertzen",
+        "family_name": "Mertzen",
+        "given_name": "Daniela",
+        "orcid": "https://orcid.org/0000-0003-4471-9255",
+        "ror": None,
+        "wikidata": None,
+    }
+    assert fdm["related_works"] == []
+
+    # only the year is known
+    assert (chem["publication_year"], chem["publication_date"]) == (2023, None)
+    assert chem["authors"][1]["type"] == "organization"
+    assert chem["authors"][1]["ror"] == "https://ror.org/05wwzbv21"
+    assert chem["related_works"] == [
+        {
+            "predicate": "https://purl.org/ontology/modalia#isPartOf",
+            "object": "https://doi.org/10.5281/zenodo.1234",
+        }
+    ]
+    assert chem["subtitle"] is None
@@ -0,0 +1,115 @@
+"""Tests for the vocabulary lookup tables."""
+
+from pathlib import Path
+
+import pytest
+from rdflib import RDF, SKOS, Graph, Literal, URIRef
+
+from dalia_dif.dif13.predicates import DISCIPLINE_PREDICATE
+from dalia_dif.dif13.rdf import (
+    _add_referenced_triples,
+    _build_background_index,
+    _build_discipline_index,
+    _build_language_index,
+    _build_license_index,
+    _build_resource_type_index,
+    _ensure_index,
+)
+
+VOCABULARY_TTL = """\
+@prefix lexvo: <http://lexvo.org/ontology#> .
+@prefix skos: <http://www.w3.org/2004/02/skos/core#> .
+@prefix spdx: <http://spdx.org/rdf/terms#> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+
+<http://lexvo.org/id/iso639-3/deu> lexvo:iso639P1Code "de"^^xsd:string ;
+    lexvo:iso6392BCode "ger"^^xsd:string ;
+    lexvo:iso6392TCode "deu"^^xsd:string .
+
+<http://spdx.org/licenses/CC-BY-4.0> spdx:licenseId "CC-BY-4.0" .
+
+<https://w3id.org/kim/hochschulfaechersystematik/n0> a skos:Concept ;
+    skos:prefLabel "Fächerübergreifend"@de, "Interdisciplinary"@en .
+<https://w3id.org/kim/hochschulfaechersystematik/n1> a skos:Concept ;
+    skos:prefLabel "Geisteswissenschaften"@de ;
+    skos:broader <https://w3id.org/kim/hochschulfaechersystematik/n0> .
+"""
+
+
+@pytest.fixture
+def graph() -> Graph:
+    return Graph().parse(data=VOCABULARY_TTL, format="turtle")
+
+
+def test_build_language_index(graph: Graph) -> None:
+    index = _build_language_index(graph)
+    assert index == {
+        "de": "http://lexvo.org/id/iso639-3/deu",
+        "ger": "http://lexvo.org/id/iso639-3/deu",
+        "deu": "http://lexvo.org/id/iso639-3/deu",
+    }
+
+
+def test_build_license_index(graph: Graph) -> None:
+    assert _build_license_index(graph) == {"CC-BY-4.0": "http://spdx.org/licenses/CC-BY-4.0"}
+
+
+def test_build_discipline_index(graph: Graph) -> None:
+    assert _build_discipline_index(graph) == {
+        "https://w3id.org/kim/hochschulfaechersystematik/n0": "Interdisciplinary",
+        "https://w3id.org/kim/hochschulfaechersystematik/n1": None,
+    }
+    assert _build_resource_type_index(graph) == [
+        "https://w3id.org/kim/hochschulfaechersystematik/n0",
+        "https://w3id.org/kim/hochschulfaechersystematik/n1",
+    ]
+
+
+def test_add_referenced_triples(graph: Graph) -> None:
+    """Test only the triples for referenced terms and the terms above them are added."""
+    index = _build_background_index(graph)
+    assert "http://lexvo.org/id/iso639-3/deu" not in index, "codes aren't indexed"
+    assert index["https://w3id.org/kim/hochschulfaechersystematik/n1"] == [
+        (str(RDF.type), SKOS.Concept.n3()),
+        (str(SKOS.prefLabel), Literal("Geisteswissenschaften", lang="de").n3()),
+        (str(SKOS.broader), "<https://w3id.org/kim/hochschulfaechersystematik/n0>"),
+    ]
+
+    oer = URIRef("https://id.dalia.education/learning-resource/1")
+    n0 = URIRef("https://w3id.org/kim/hochschulfaechersystematik/n0")
+    n1 = URIRef("https://w3id.org/kim/hochschulfaechersystematik/n1")
+    enriched = Graph()
+    enriched.add((oer, DISCIPLINE_PREDICATE, n1))
+    _add_referenced_triples(enriched, [index, _build_background_index(Graph())])
+    assert (n1, SKOS.broader, n0) in enriched
+    assert (n0, SKOS.prefLabel, Literal("Interdisciplinary", lang="en")) in enriched
+    assert len(enriched) == 1 + 3 + 3
+
+
+def test_ensure_index(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("DALIA_HOME", tmp_path.as_posix())
+    calls = []
+
+    def _build() -> dict[str, str]:
+        calls.append(1)
+        return {"a": "b"}
+
+    assert _ensure_index("test", "https://example.org/v1", _build) == {"a": "b"}
+    assert _ensure_index("test", "https://example.org/v1", _build) == {"a": "b"}
+    assert len(calls) == 1, "the compiled index should be loaded from disk"
+    assert tmp_path.joinpath("indexes", "test.json").is_file()
+
+    # changing the pinned version triggers a rebuild
+    _ensure_index("test", "https://example.org/v2", _build)
+    assert len(calls) == 2
+
+    # corrupt or incomplete files are rebuilt
+    path = tmp_path.joinpath("indexes", "test.json")
+    for text in [
+        '{"source": "https://example.org/v2", "da',
+        '{"source": "https://example.org/v2"}',
+    ]:
+        path.write_text(text)
+        assert _ensure_index("test", "https://example.org/v2", _build) == {"a": "b"}
+    assert len(calls) == 4
+    assert [p.name for p in path.parent.iterdir()] == ["test.json"]
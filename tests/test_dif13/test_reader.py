@@ -0,0 +1,51 @@
+"""Tests for the DIF v1.3 reader."""
+
+import types
+from pathlib import Path
+
+from dalia_dif.dif13 import (
+    iter_dif13,
+    iter_dif13_jsonl,
+    read_dif13,
+    read_dif13_jsonl,
+    write_dif13_jsonl,
+)
+from tests.util import EXAMPLE_CSV, INVALID_CSV
+
+
+def test_iter_dif13_is_lazy() -> None:
+    errors: list[str] = []
+    it = iter_dif13(INVALID_CSV, error_accumulator=errors)
+    assert isinstance(it, types.GeneratorType)
+    assert not errors, "nothing should be parsed before iterating"
+
+    first = next(it)
+    assert str(first.uuid) == "4d7e5a62-1c2b-4f3e-8a9d-6b5c4d3e2f10"
+    assert errors == ["[invalid.csv line:2] unable to lookup target group: astronaut"]
+
+    assert list(it) == []
+    assert errors[-1] == "[invalid.csv line:3] no UUID given"
+
+
+def test_iter_dif13_matches_read_dif13() -> None:
+    assert list(iter_dif13(EXAMPLE_CSV)) == read_dif13(EXAMPLE_CSV)
+
+
+def test_write_jsonl_from_iterator(tmp_path: Path) -> None:
+    path = tmp_path.joinpath("out.jsonl")
+    write_dif13_jsonl(iter_dif13(EXAMPLE_CSV), path=path)
+    lines = path.read_text().splitlines()
+    assert len(lines) == 2
+    assert '"uuid":"b3763080-15a4-4de4-b99b-c9b337644904"' in lines[0]
+
+
+def test_read_jsonl(tmp_path: Path) -> None:
+    path = tmp_path.joinpath("out.jsonl")
+    oers = read_dif13(EXAMPLE_CSV)
+    write_dif13_jsonl(oers, path=path)
+    assert read_dif13_jsonl(path) == oers
+    assert read_dif13_jsonl(path, trusted=True) == oers
+
+    it = iter_dif13_jsonl(path)
+    assert isinstance(it, types.GeneratorType)
+    assert next(it) == oers[0]
@@ -0,0 +1,70 @@
+"""Tests for finding similar OERs."""
+
+from pathlib import Path
+from uuid import UUID
+
+import pytest
+
+from dalia_dif.dif13 import EducationalResourceDIF13, read_dif13
+from dalia_dif.dif13.export.fti import FTIndex, write_sqlite_fti_from_resources
+from dalia_dif.dif13.export.similarity import (
+    build_tfidf_matrix,
+    get_similar_resources,
+    iter_neighbors,
+    write_similar_resources,
+)
+from tests.util import EXAMPLE_CSV
+
+# numpy and scipy are only needed to build neighbors, so they're imported lazily
+pytest.importorskip("scipy")
+
+UUID_CHEM = "0f5c9ab3-7a3e-4ab0-9b7c-2f0e4d7c9d51"
+UUID_FDM = "b3763080-15a4-4de4-b99b-c9b337644904"
+UUID_CHEM_2 = "9a1b3c5d-1111-4222-8333-444455556666"
+
+
+def _get_oers() -> list[EducationalResourceDIF13]:
+    fdm, chem = read_dif13(EXAMPLE_CSV)
+    chem_2 = chem.model_copy(
+        update={"uuid": UUID(UUID_CHEM_2), "title": "More Python for Chemists", "keywords": []}
+    )
+    return [fdm, chem, chem_2]
+
+
+def test_neighbors() -> None:
+    """Test batched neighbors are the same as brute force cosine similarity."""
+    uuids, matrix = build_tfidf_matrix(_get_oers())
+    dense = (matrix @ matrix.T).toarray()
+
+    for batch_size in [1, 2, 10]:
+        for i, (uuid, neighbors) in enumerate(iter_neighbors(uuids, matrix, batch_size=batch_size)):
+            assert uuid == uuids[i]
+            assert uuid not in {neighbor.uuid for neighbor in neighbors}
+            expected = sorted(
+                ((uuids[j], dense[i, j]) for j in range(len(uuids)) if j != i and dense[i, j] > 0),
+                key=lambda pair: -pair[1],
+            )
+            assert [n.uuid for n in neighbors] == [u for u, _ in expected]
+            assert [n.score for n in neighbors] == pytest.approx([s for _, s in expected])
+
+    neighbors = dict(iter_neighbors(uuids, matrix, k=1))
+    assert [n.uuid for n in neighbors[UUID_CHEM]] == [UUID_CHEM_2]
+
+
+def test_write_similar(tmp_path: Path) -> None:
+    """Test storing neighbors next to the full text index."""
+    oers = _get_oers()
+    path = tmp_path.joinpath("index.db")
+    write_sqlite_fti_from_resources(oers, path)
+    # the German OER has no words in common with the others, so it has no neighbors
+    assert write_similar_resources(oers, path, k=1) == 2
+    assert get_similar_resources(UUID_FDM, path) == []
+
+    neighbors = get_similar_resources(UUID_CHEM, path)
+    assert [neighbor.uuid for neighbor in neighbors] == [UUID_CHEM_2]
+    assert 0 < neighbors[0].score <= 1
+    assert get_similar_resources("nope", path) == []
+
+    with FTIndex(path) as index:
+        assert index.similar(UUID_CHEM_2) == [(UUID_CHEM, neighbors[0].score)]
+        assert index.query("chemists") != []
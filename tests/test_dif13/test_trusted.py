@@ -0,0 +1,58 @@
+"""Tests for constructing resources from pre-validated data."""
+
+import json
+import os
+import timeit
+from collections.abc import Callable
+from typing import Any
+
+import pytest
+
+from dalia_dif.dif13 import EducationalResourceDIF13, read_dif13
+from tests.util import EXAMPLE_CSV
+
+
+def _assert_same(left: EducationalResourceDIF13, right: EducationalResourceDIF13) -> None:
+    assert left == right
+    for field in EducationalResourceDIF13.model_fields:
+        assert type(getattr(left, field)) is type(getattr(right, field)), field
+    assert left.model_dump_json() == right.model_dump_json()
+
+
+def test_trusted_equivalence() -> None:
+    """Test trusted construction gives the same resources as validation."""
+    validated = read_dif13(EXAMPLE_CSV)
+    for left, right in zip(validated, read_dif13(EXAMPLE_CSV, trusted=True), strict=True):
+        _assert_same(left, right)
+
+    for oer in validated:
+        for data in [
+            oer.model_dump(),
+            oer.model_dump(mode="json"),
+            json.loads(oer.model_dump_json(exclude_none=True, exclude_defaults=True)),
+        ]:
+            _assert_same(EducationalResourceDIF13.from_trusted(data), oer)
+
+
+@pytest.mark.slow
+@pytest.mark.skipif(
+    not os.environ.get("DALIA_BENCHMARK"), reason="set DALIA_BENCHMARK=1 to run benchmarks"
+)
+def test_trusted_benchmark() -> None:
+    """Report how long trusted construction takes compared to validation.
+
+    Wall-clock timings are too noisy to assert on, so this only prints the ratio. Run
+    it with ``DALIA_BENCHMARK=1 pytest -s -m slow tests/test_dif13/test_trusted.py``.
+    """
+    records = [
+        json.loads(oer.model_dump_json(exclude_none=True, exclude_defaults=True))
+        for oer in read_dif13(EXAMPLE_CSV)
+    ] * 2_000
+
+    def _time(func: Callable[[dict[str, Any]], EducationalResourceDIF13]) -> float:
+        # take the best of a few runs, so the comparison isn't thrown off by noise
+        return min(timeit.repeat(lambda: [func(record) for record in records], number=1, repeat=5))
+
+    validated = _time(EducationalResourceDIF13.model_validate)
+    trusted = _time(EducationalResourceDIF13.from_trusted)
+    print(f"validated: {validated:.3f}s, trusted: {trusted:.3f}s ({validated / trusted:.1f}x)")  # noqa:T201
@@ -0,0 +1,64 @@
+"""Tests for the import-time budget of the command line interface."""
+
+import json
+import subprocess
+import sys
+import textwrap
+
+#: Modules that are slow to import and should only be loaded when they're used
+HEAVY_MODULES = ["curies", "pandas", "pydantic", "pydantic_extra_types", "rdflib", "tqdm"]
+
+#: The maximum number of modules loaded for the CLI, including the standard library
+MODULE_BUDGET = 200
+
+#: The maximum cold import time, in seconds. This is generous so it isn't flaky on slow
+#: machines, but it's still well under the half second it took to import everything.
+TIME_BUDGET = 0.3
+
+SCRIPT = textwrap.dedent("""\
+    import json
+    import sys
+    import time
+
+    start = time.perf_counter()
+    import dalia_dif.cli
+    import dalia_dif.dif13
+    import dalia_dif.dif13.export.fti
+    elapsed = time.perf_counter() - start
+    modules = sorted(sys.modules)
+
+    from dalia_dif.dif13.community import get_lookup_dict_communities
+
+    print(json.dumps({
+        "elapsed": elapsed,
+        "modules": modules,
+        "communities": get_lookup_dict_communities.cache_info().currsize,
+    }))
+""")
+
+
+def test_import_budget() -> None:
+    """Test importing the CLI doesn't load heavy dependencies or the community table."""
+    # run in a fresh interpreter, since other tests have already imported everything
+    output = subprocess.check_output([sys.executable, "-c", SCRIPT], text=True)  # noqa:S603
+    result = json.loads(output)
+
+    modules = set(result["modules"])
+    loaded = [name for name in HEAVY_MODULES if name in modules]
+    assert not loaded, f"heavy modules were loaded at import time: {loaded}"
+    assert len(modules) <= MODULE_BUDGET
+    assert result["elapsed"] <= TIME_BUDGET
+    # the community table is only read on first use
+    assert result["communities"] == 0
+
+
+def test_lazy_exports() -> None:
+    """Test the lazily imported exports are the same as from their submodules."""
+    import dalia_dif.dif13
+    from dalia_dif.dif13 import community, model, reader
+
+    for name in dalia_dif.dif13.__all__:
+        expected = getattr(model, name, None) or getattr(reader, name)
+        assert getattr(dalia_dif.dif13, name) is expected
+    assert set(dalia_dif.dif13.__all__) <= set(dir(dalia_dif.dif13))
+    assert community.LOOKUP_DICT_COMMUNITIES is community.get_lookup_dict_communities()
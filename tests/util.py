@@ -1,7 +1,14 @@
+from pathlib import Path
+
 from rdflib import Graph
 from rdflib.compare import isomorphic
 
-__all__ = ["same_graphs"]
+__all__ = [
+    "EXAMPLE_CSV",
+    "INVALID_CSV",
+    "RESOURCES",
+    "same_graphs",
+]
 
 
 def same_graphs(g1: Graph, g2: Graph) -> bool:
@@ -14,3 +21,9 @@ def same_graphs(g1: Graph, g2: Graph) -> bool:
             {g2.serialize()}
         """)
     return True
+
+
+HERE = Path(__file__).parent.resolve()
+RESOURCES = HERE.joinpath("resources")
+EXAMPLE_CSV = RESOURCES.joinpath("example.csv")
+INVALID_CSV = RESOURCES.joinpath("invalid.csv")